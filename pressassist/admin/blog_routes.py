@@ -11,7 +11,7 @@ from fastapi.responses import HTMLResponse, JSONResponse
 
 from ..core.i18n import t
 from ..core.models import Role
-from ..core.blog_models import PostStatus, CommentStatus
+from ..core.blog_models import PostStatus, CommentStatus, lowercase_tags, published_timestamp
 from .routes import (
     get_admin_lang_context,
     get_admin_html_attrs,
@@ -2066,9 +2066,11 @@ async def api_create_post(
         "featured_image": data.get("featured_image"),
         "category": data.get("category"),
         "tags": data.get("tags", []),
+        "tags_lower": lowercase_tags(data.get("tags", [])),
         "author": session.user_id,
         "status": data.get("status", "draft"),
         "published_at": data.get("published_at"),
+        "published_ts": published_timestamp(data.get("published_at")),
         "display_pages": data.get("display_pages", []),
         "comments_enabled": data.get("comments_enabled", True),
         "auto_approve_comments": data.get("auto_approve_comments", False),
@@ -2129,8 +2131,10 @@ async def api_update_post(
     post["featured_image"] = data.get("featured_image", post.get("featured_image"))
     post["category"] = data.get("category", post.get("category"))
     post["tags"] = data.get("tags", post.get("tags", []))
+    post["tags_lower"] = lowercase_tags(post["tags"])
     post["status"] = data.get("status", post.get("status", "draft"))
     post["published_at"] = data.get("published_at", post.get("published_at"))
+    post["published_ts"] = published_timestamp(post["published_at"])
     post["display_pages"] = data.get("display_pages", post.get("display_pages", []))
     post["comments_enabled"] = data.get("comments_enabled", post.get("comments_enabled", True))
     post["auto_approve_comments"] = data.get("auto_approve_comments", post.get("auto_approve_comments", False))
@@ -2173,12 +2177,13 @@ async def api_delete_post(
         raise HTTPException(status_code=404, detail="Post not found")
 
     # Delete associated comments
-    comments = storage.get("blog_comments", {})
-    for comment_id, comment in list(comments.items()):
-        if comment.get("post_slug") == slug:
-            storage.delete(f"blog_comments.{comment_id}")
+    with storage.batch():
+        comments = storage.get("blog_comments", {})
+        for comment_id, comment in list(comments.items()):
+            if comment.get("post_slug") == slug:
+                storage.delete(f"blog_comments.{comment_id}")
 
-    storage.delete(f"blog_posts.{slug}")
+        storage.delete(f"blog_posts.{slug}")
 
     audit_logger.log(
         "blog_post_delete",
@@ -2289,13 +2294,14 @@ async def api_delete_category(
         raise HTTPException(status_code=404, detail="Category not found")
 
     # Remove category from posts
-    posts = storage.get("blog_posts", {})
-    for post_slug, post in posts.items():
-        if post.get("category") == slug:
-            post["category"] = None
-            storage.set(f"blog_posts.{post_slug}", post)
-
-    storage.delete(f"blog_categories.{slug}")
+    with storage.batch():
+        posts = storage.get("blog_posts", {})
+        for post_slug, post in posts.items():
+            if post.get("category") == slug:
+                post["category"] = None
+                storage.set(f"blog_posts.{post_slug}", post)
+
+        storage.delete(f"blog_categories.{slug}")
 
     return {"status": "deleted"}
 
@@ -3587,6 +3587,7 @@ async def settings_page(
                             'X-CSRF-Token': csrfToken,
                         }},
                         credentials: 'same-origin',
+                        body: JSON.stringify({{ commit: latestCommit }}),
                     }});
                     const data = await res.json();
 
@@ -5245,9 +5246,14 @@ async def update_settings(
         import secrets as _secrets
         data["login_slug"] = _secrets.token_urlsafe(24)
 
-    for key, value in data.items():
-        if key in allowed_keys:
-            storage.set(f"config.{key}", value)
+    with storage.batch():
+        for key, value in data.items():
+            if key in allowed_keys:
+                storage.set(f"config.{key}", value)
+
+    if "force_https" in data:
+        from ..frontend.auth_routes import clear_force_https_cache
+        clear_force_https_cache()
 
     if "theme" in data and theme_manager:
         theme_manager.set_active_theme(data["theme"])
@@ -5582,7 +5588,17 @@ async def apply_update(
     # Get base path (project root)
     base_path = Path(__file__).parent.parent.parent
 
-    result = await download_and_apply_update(base_path, create_backup)
+    # Commit shown by the last check, so it isn't looked up again; the
+    # updater ignores it unless it is the head of main that check found
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    new_commit = data.get("commit") if isinstance(data, dict) else None
+    if not isinstance(new_commit, str) or not new_commit:
+        new_commit = None
+
+    result = await download_and_apply_update(base_path, create_backup, new_commit=new_commit)
 
     if result["success"]:
         # Save new commit hash
@@ -9,6 +9,7 @@ from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from ..core.auth import AuthManager
 from ..core.i18n import i18n, t
 from ..core.models import ProfileVisibility, Role, User
+from ..core.user_index import delete_user, save_user
 
 router = APIRouter(prefix="/users", tags=["admin-users"])
 
@@ -894,11 +895,12 @@ async def create_user(
         "profile_visibility": "public",
         "reset_token": None,
         "reset_token_expires": None,
+        "reset_token_expires_ts": None,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "last_login": None,
     }
 
-    storage.set(f"users.{username_lower}", user_data)
+    save_user(storage, username_lower, user_data)
 
     return RedirectResponse(url="/admin/users", status_code=303)
 
@@ -1272,6 +1274,8 @@ async def update_user(
     if not can_edit:
         raise HTTPException(status_code=403, detail="No permission to edit this user")
 
+    # Edit a copy, so save_user can drop the old index entries
+    user_data = dict(user_data)
     # Update fields
     if email is not None:
         user_data["email"] = email.strip().lower() if email else None
@@ -1295,7 +1299,7 @@ async def update_user(
     if AuthManager.can_manage_role(session.role, user_role):
         user_data["is_active"] = is_active
 
-    storage.set(f"users.{username}", user_data)
+    save_user(storage, username, user_data)
 
     return RedirectResponse(url="/admin/users", status_code=303)
 
@@ -1392,10 +1396,7 @@ async def delete_user(request: Request, username: str):
         raise HTTPException(status_code=403, detail="No permission to delete this user")
 
     # Delete user
-    users = storage.get("users", {})
-    if username in users:
-        del users[username]
-        storage.set("users", users)
+    delete_user(storage, username)
 
     # Invalidate all sessions
     auth.invalidate_user_sessions(username)
@@ -9,6 +9,7 @@ import click
 from .core.auth import AuthManager
 from .core.config import AppConfig
 from .core.storage import Storage
+from .core.themes import ThemeManager
 
 
 @click.group()
@@ -391,6 +392,48 @@ def new_login_slug(base_dir: Path | None):
     click.echo()
 
 
+@main.command("compile-templates")
+@click.option(
+    "--dir",
+    "-d",
+    "base_dir",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Base directory for the site",
+)
+def compile_templates(base_dir: Path | None):
+    """Precompile the active theme's templates for faster rendering."""
+    if base_dir is None:
+        base_dir = Path.cwd()
+
+    config = AppConfig(base_dir=base_dir)
+    storage = Storage(config.db_path)
+
+    if not storage.exists:
+        click.echo(click.style("Error: ", fg="red") + "Site not initialized.")
+        sys.exit(1)
+
+    theme_manager = ThemeManager(
+        themes_dir=config.themes_dir,
+        fallback_dir=Path(__file__).parent / "public" / "templates",
+        active_theme=storage.get("config.theme", "default"),
+    )
+
+    try:
+        archive = theme_manager.precompile()
+    except Exception as e:
+        click.echo(click.style("Error: ", fg="red") + f"Compilation failed: {e}")
+        sys.exit(1)
+
+    click.echo()
+    click.echo(click.style("Templates compiled!", fg="green"))
+    click.echo(f"  Theme: {theme_manager.active_theme}")
+    click.echo(f"  Archive: {archive}")
+    click.echo()
+    click.echo("Re-run after editing theme templates; stale archives are ignored.")
+    click.echo()
+
+
 @main.command("hash-password")
 @click.option(
     "--password",
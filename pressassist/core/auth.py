@@ -10,6 +10,7 @@ import bcrypt as _bcrypt
 
 from .models import LoginAttempt, Role, Session
 from .session_store import RateLimitStore, SessionStore
+from .session_store_sqlite import SQLiteRateLimitStore, SQLiteSessionStore
 
 
 class AuthError(Exception):
@@ -141,8 +142,8 @@ class AuthManager:
         session_lifetime_hours: int = 4,
         rate_limit_attempts: int = 5,
         rate_limit_window_minutes: int = 15,
-        session_store: SessionStore | None = None,
-        rate_limit_store: RateLimitStore | None = None,
+        session_store: SessionStore | SQLiteSessionStore | None = None,
+        rate_limit_store: RateLimitStore | SQLiteRateLimitStore | None = None,
     ):
         """Initialize auth manager.
 
@@ -1,6 +1,6 @@
 """Blog models for ChelCheleh."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 from pydantic import BaseModel, Field, field_validator
@@ -24,6 +24,53 @@ class CommentStatus(str, Enum):
     SPAM = "spam"
 
 
+def published_timestamp(published_at: str | None) -> int | None:
+    """Convert a post's published_at into epoch seconds.
+
+    Stored with the post as ``published_ts`` so readers compare integers
+    instead of parsing dates. Dates without a timezone are taken as UTC,
+    and a bare date as midnight UTC.
+
+    Args:
+        published_at: ISO date or datetime string from the post.
+
+    Returns:
+        Epoch seconds, or None if there is no usable date.
+    """
+    if not published_at or not isinstance(published_at, str):
+        return None
+    try:
+        # Handle various date formats
+        if "T" in published_at:
+            # ISO format - might be with or without timezone
+            if "+" in published_at or "Z" in published_at:
+                pub_dt = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+            else:
+                # No timezone, assume local and add UTC
+                pub_dt = datetime.fromisoformat(published_at).replace(tzinfo=timezone.utc)
+        else:
+            # Just date
+            pub_dt = datetime.fromisoformat(published_at + "T00:00:00").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return int(pub_dt.timestamp())
+
+
+def lowercase_tags(tags: list[str] | None) -> list[str]:
+    """Get a post's distinct tags in lower case.
+
+    Stored with the post as ``tags_lower`` so tag filters don't lower
+    every tag of every post.
+
+    Args:
+        tags: The post's tags.
+
+    Returns:
+        Distinct lower-cased tags, in first-seen order.
+    """
+    return list(dict.fromkeys(tag.lower() for tag in tags or () if isinstance(tag, str)))
+
+
 class BlogPost(BaseModel):
     """Blog post model."""
 
@@ -35,9 +82,11 @@ class BlogPost(BaseModel):
     featured_image: str | None = None  # UUID of uploaded image
     category: str | None = None  # Category slug
     tags: list[str] = Field(default_factory=list)
+    tags_lower: list[str] = Field(default_factory=list)  # Distinct tags, lower-cased
     author: str = "admin"
     status: PostStatus = PostStatus.DRAFT
     published_at: datetime | None = None
+    published_ts: int | None = None  # published_at as epoch seconds
     display_pages: list[str] = Field(default_factory=list)  # Page slugs where post appears
     comments_enabled: bool = True
     auto_approve_comments: bool = False
@@ -34,6 +34,7 @@ class AppConfig(BaseModel):
     rate_limit_window_minutes: int = 15
     password_min_length: int = 12
     bcrypt_rounds: int = 12
+    session_backend: str = "json"  # "json" or "sqlite"
 
     # Uploads
     max_upload_size_mb: int = 5
@@ -84,6 +85,16 @@ class AppConfig(BaseModel):
         """Path to rate limit storage file."""
         return self.data_dir / "rate_limits.json"
 
+    @property
+    def session_db_file(self) -> Path:
+        """Path to SQLite database for sessions and rate limits."""
+        return self.data_dir / "sessions.db"
+
+    @property
+    def template_cache_dir(self) -> Path:
+        """Directory for compiled Jinja2 template bytecode."""
+        return self.data_dir / "cache" / "templates"
+
     @property
     def max_upload_size_bytes(self) -> int:
         """Maximum upload size in bytes."""
@@ -133,6 +144,12 @@ class AppConfig(BaseModel):
         password_min_length = get_int_env("PRESSASSIST_PASSWORD_MIN_LENGTH", 12, 8, 128)
         max_upload_size_mb = get_int_env("PRESSASSIST_MAX_UPLOAD_MB", 5, 1, 100)
 
+        session_backend = os.getenv("PRESSASSIST_SESSION_BACKEND", "json").lower()
+        if session_backend not in ("json", "sqlite"):
+            raise ValueError(
+                f"PRESSASSIST_SESSION_BACKEND must be 'json' or 'sqlite', got: {session_backend}"
+            )
+
         return cls(
             base_dir=base_dir,
             host=os.getenv("PRESSASSIST_HOST", "127.0.0.1"),
@@ -145,6 +162,7 @@ class AppConfig(BaseModel):
             rate_limit_window_minutes=rate_limit_window_minutes,
             password_min_length=password_min_length,
             max_upload_size_mb=max_upload_size_mb,
+            session_backend=session_backend,
             allow_html_content=os.getenv("PRESSASSIST_ALLOW_HTML", "false").lower() == "true",
         )
 
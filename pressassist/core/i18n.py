@@ -2,7 +2,8 @@
 
 import json
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+from urllib.parse import quote_plus
 
 from .languages import (
     DEFAULT_LANGUAGE,
@@ -39,6 +40,8 @@ class I18n:
         self.default_lang = default_lang
         self._translations: dict[str, dict[str, str]] = {}
         self._current_lang = default_lang
+        self._url_cache: dict[tuple[str, str], str] = {}
+        self._translators: dict[str, Callable[..., str]] = {}
 
     def load_language(self, lang: str) -> bool:
         """Load translations for a language.
@@ -87,11 +90,35 @@ class I18n:
         Returns:
             Translated string or key if not found.
         """
-        # Try current language
-        text = self._get_translation(self._current_lang, key)
+        return self._translate(self._current_lang, key, kwargs)
+
+    def translator(self, lang: str) -> Callable[..., str]:
+        """Get a translate function bound to one language.
+
+        Unlike set_language() + t(), this doesn't touch the shared current
+        language, so it is safe across awaits and concurrent requests.
+
+        Args:
+            lang: Language code. Unknown languages use the default language.
+
+        Returns:
+            Function taking (key, **kwargs) like t().
+        """
+        translate = self._translators.get(lang)
+        if translate is None:
+            def translate(key: str, **kwargs: Any) -> str:
+                return self._translate(lang, key, kwargs)
+
+            self._translators[lang] = translate
+        return translate
+
+    def _translate(self, lang: str, key: str, kwargs: dict[str, Any]) -> str:
+        """Translate a key in a language, falling back to the default one."""
+        # Try requested language
+        text = self._get_translation(lang, key)
 
         # Fallback to default language
-        if text is None and self._current_lang != self.default_lang:
+        if text is None and lang != self.default_lang:
             text = self._get_translation(self.default_lang, key)
 
         # Use key as fallback
@@ -107,6 +134,27 @@ class I18n:
 
         return text
 
+    def t_url(self, key: str, lang: str) -> str:
+        """Translate a key and encode it for a URL query value.
+
+        Used for messages passed in redirect URLs (``?error=...``). Like
+        translator(), this uses the given language rather than the shared
+        current one. The result is cached per language, since translations
+        don't change once loaded.
+
+        Args:
+            key: Translation key.
+            lang: Language code of the request.
+
+        Returns:
+            Translated string, encoded with quote_plus.
+        """
+        cache_key = (lang, key)
+        value = self._url_cache.get(cache_key)
+        if value is None:
+            value = self._url_cache[cache_key] = quote_plus(self.translator(lang)(key))
+        return value
+
     def get(self, key: str, lang: str | None = None, **kwargs: Any) -> str:
         """Get translation for a key in a specific language.
 
@@ -247,3 +295,16 @@ def t(key: str, **kwargs: Any) -> str:
         Translated string.
     """
     return i18n.t(key, **kwargs)
+
+
+def t_url(key: str, lang: str) -> str:
+    """Translate a key for a URL query value using global i18n instance.
+
+    Args:
+        key: Translation key.
+        lang: Language code of the request.
+
+    Returns:
+        Translated, URL-encoded string.
+    """
+    return i18n.t_url(key, lang)
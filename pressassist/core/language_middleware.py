@@ -47,7 +47,8 @@ class LanguageMiddleware(BaseHTTPMiddleware):
         request.state.admin_lang_direction = get_direction(admin_lang)
 
         # Set i18n language based on path
-        if request.url.path.startswith("/admin"):
+        is_admin_path = request.url.path.startswith("/admin")
+        if is_admin_path:
             i18n.set_language(admin_lang)
         else:
             i18n.set_language(lang)
@@ -58,7 +59,7 @@ class LanguageMiddleware(BaseHTTPMiddleware):
         # Set cookie if language was explicitly changed via query param
         lang_param = request.query_params.get("lang")
         if lang_param and is_valid_language(lang_param):
-            if request.url.path.startswith("/admin"):
+            if is_admin_path:
                 response.set_cookie(
                     key=ADMIN_LANGUAGE_COOKIE,
                     value=lang_param,
@@ -89,6 +89,7 @@ class User(BaseModel):
     # Password reset
     reset_token: str | None = None
     reset_token_expires: datetime | None = None
+    reset_token_expires_ts: int | None = None
 
     @field_validator("username")
     @classmethod
@@ -1,11 +1,12 @@
 """Plugin loading and management."""
 
 import importlib.util
-import json
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Callable
 
+import orjson
+
 from .hooks import HookManager, hook_manager
 from .logging import plugins_logger as logger
 
@@ -111,16 +112,11 @@ class PluginManager:
         Returns:
             PluginInfo or None if invalid.
         """
-        json_path = plugin_dir / "plugin.json"
-        if not json_path.exists():
-            return None
-
         try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = orjson.loads((plugin_dir / "plugin.json").read_bytes())
 
             # Validate required fields
-            if "name" not in data:
+            if not isinstance(data, dict) or "name" not in data:
                 return None
 
             # Validate permissions and warn about invalid ones
@@ -142,7 +138,7 @@ class PluginManager:
                 permissions=valid_permissions,
                 directory=plugin_dir.name,
             )
-        except (json.JSONDecodeError, OSError):
+        except (orjson.JSONDecodeError, OSError):
             return None
 
     def load_plugin(self, plugin_name: str) -> bool:
@@ -1,19 +1,90 @@
 """Security headers middleware."""
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+import re
+from types import MappingProxyType
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Baseline CSP directives shared by every policy variant
+_CSP_DEFAULTS = MappingProxyType({
+    "default-src": "'self'",
+    "script-src": "'self'",
+    "style-src": "'self' 'unsafe-inline'",  # Inline styles for Markdown
+    "img-src": "'self' data:",
+    "font-src": "'self'",
+    "connect-src": "'self'",
+    "frame-src": "'self'",
+    "frame-ancestors": "'none'",
+    "base-uri": "'self'",
+    "form-action": "'self'",
+})
+
+_CSP_UPGRADE = MappingProxyType({"upgrade-insecure-requests": ""})
+
+# Embed sources for media embeds (YouTube, Vimeo, etc.)
+_EMBED_SOURCES = (
+    "https://www.youtube.com https://www.youtube-nocookie.com "
+    "https://player.vimeo.com https://www.instagram.com "
+    "https://platform.twitter.com https://www.tiktok.com "
+    "https://open.spotify.com https://w.soundcloud.com "
+    "https://www.aparat.com"
+)
+
+# Headers that never vary per request, pre-encoded for ``raw_headers``
+_STATIC_RAW_HEADERS = (
+    # Prevent MIME type sniffing
+    (b"x-content-type-options", b"nosniff"),
+    # Prevent clickjacking
+    (b"x-frame-options", b"SAMEORIGIN"),
+    # XSS protection (legacy, but still useful)
+    (b"x-xss-protection", b"1; mode=block"),
+    # Control referrer information
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    # Permissions Policy (formerly Feature-Policy)
+    (
+        b"permissions-policy",
+        b"accelerometer=(), camera=(), geolocation=(), "
+        b"gyroscope=(), magnetometer=(), microphone=(), "
+        b"payment=(), usb=()",
+    ),
+)
+
+_HSTS_RAW_HEADER = (b"strict-transport-security", b"max-age=31536000; includeSubDomains")
+
+# Single-pass route classification. Alternatives are tried in priority
+# order so "/admin" anywhere in the path wins over "/blog", which wins
+# over a leading "/page/"; ``lastindex`` identifies the matched route.
+_ROUTE_RE = re.compile(r"(?:.*?(/admin)|.*?(/blog)|(/page/))")
+_ROUTES = (None, "admin", "blog", "blog")
+
+
+class SecurityHeadersMiddleware:
     """Middleware to add security headers to all responses.
 
     Implements recommended security headers for public web applications.
+    Written as a plain ASGI middleware that edits the ``http.response.start``
+    message, avoiding the task group and stream bridge that
+    ``BaseHTTPMiddleware`` adds to every request.
     """
 
+    __slots__ = (
+        "app",
+        "force_https",
+        "csp_base",
+        "csp_https",
+        "blog_csp_base",
+        "blog_csp_https",
+        "admin_csp_base",
+        "admin_csp_https",
+        "_static_raw",
+        "_replaced_names",
+        "_csp_raw",
+    )
+
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         force_https: bool = True,
         csp_directives: dict[str, str] | None = None,
     ):
@@ -24,25 +95,16 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             force_https: Whether to add HSTS header.
             csp_directives: Custom CSP directives.
         """
-        super().__init__(app)
+        self.app = app
         self.force_https = force_https
         self.csp_base = self._build_csp(csp_directives, include_upgrade=False)
         self.csp_https = self._build_csp(csp_directives, include_upgrade=True)
 
-        # Embed sources for media embeds (YouTube, Vimeo, etc.)
-        embed_sources = (
-            "https://www.youtube.com https://www.youtube-nocookie.com "
-            "https://player.vimeo.com https://www.instagram.com "
-            "https://platform.twitter.com https://www.tiktok.com "
-            "https://open.spotify.com https://w.soundcloud.com "
-            "https://www.aparat.com"
-        )
-
         # Blog/frontend CSP with embed support
         blog_csp = dict(csp_directives or {})
         blog_csp.setdefault(
             "frame-src",
-            f"'self' {embed_sources}"
+            f"'self' {_EMBED_SOURCES}"
         )
         blog_csp.setdefault(
             "script-src",
@@ -62,106 +124,101 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         admin_csp.setdefault("connect-src", "'self'")
         admin_csp.setdefault(
             "frame-src",
-            f"'self' {embed_sources}"
+            f"'self' {_EMBED_SOURCES}"
         )
         self.admin_csp_base = self._build_csp(admin_csp, include_upgrade=False)
         self.admin_csp_https = self._build_csp(admin_csp, include_upgrade=True)
 
-    def _build_csp(self, custom: dict[str, str] | None, include_upgrade: bool) -> str:
+        # Precompute the raw header block once; only CSP and the admin
+        # cache-control headers depend on the request.
+        static_raw = list(_STATIC_RAW_HEADERS)
+        if force_https:
+            # HSTS for HTTPS
+            static_raw.append(_HSTS_RAW_HEADER)
+        self._static_raw = tuple(static_raw)
+        # Names of the headers set here, CSP included; a response's own
+        # values for them are dropped so each is sent once
+        self._replaced_names = frozenset(
+            [name for name, _ in static_raw] + [b"content-security-policy"]
+        )
+
+        # CSP values keyed by (route, is_https)
+        self._csp_raw = {
+            ("admin", False): self.admin_csp_base,
+            ("admin", True): self.admin_csp_https,
+            ("blog", False): self.blog_csp_base,
+            ("blog", True): self.blog_csp_https,
+            (None, False): self.csp_base,
+            (None, True): self.csp_https,
+        }
+
+    def _build_csp(self, custom: dict[str, str] | None, include_upgrade: bool) -> bytes:
         """Build Content-Security-Policy header value.
 
         Args:
             custom: Custom directives to override defaults.
+            include_upgrade: Whether to add upgrade-insecure-requests.
 
         Returns:
-            CSP header string.
+            CSP header value, encoded for use in raw ASGI headers.
         """
-        defaults = {
-            "default-src": "'self'",
-            "script-src": "'self'",
-            "style-src": "'self' 'unsafe-inline'",  # Inline styles for Markdown
-            "img-src": "'self' data:",
-            "font-src": "'self'",
-            "connect-src": "'self'",
-            "frame-src": "'self'",
-            "frame-ancestors": "'none'",
-            "base-uri": "'self'",
-            "form-action": "'self'",
-        }
-        if include_upgrade:
-            defaults["upgrade-insecure-requests"] = ""
-
-        if custom:
-            defaults.update(custom)
-
-        parts = []
-        for key, value in defaults.items():
-            if value:
-                parts.append(f"{key} {value}")
-            else:
-                parts.append(key)
+        merged = _CSP_DEFAULTS | (_CSP_UPGRADE if include_upgrade else {}) | (custom or {})
 
-        return "; ".join(parts)
+        return "; ".join(
+            f"{key} {value}" if value else key for key, value in merged.items()
+        ).encode("latin-1")
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        """Add security headers to response.
+    def _select_csp(self, path: str, is_https: bool) -> tuple[str | None, bytes]:
+        """Classify a request path and pick its CSP header value.
 
         Args:
-            request: Incoming request.
-            call_next: Next middleware/handler.
+            path: Request path.
+            is_https: Whether the request arrived over HTTPS.
 
         Returns:
-            Response with security headers.
+            Tuple of (route, encoded CSP value).
         """
-        response = await call_next(request)
-
-        # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
-        # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "SAMEORIGIN"
-
-        # XSS protection (legacy, but still useful)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # Control referrer information
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
-        # Content Security Policy
-        path = request.url.path
-        is_https = request.url.scheme == "https"
-
-        if "/admin" in path:
-            csp = self.admin_csp_https if is_https else self.admin_csp_base
-        elif "/blog" in path or path.startswith("/page/"):
-            # Blog and pages may contain embedded media
-            csp = self.blog_csp_https if is_https else self.blog_csp_base
-        else:
-            csp = self.csp_https if is_https else self.csp_base
-
-        response.headers["Content-Security-Policy"] = csp
-
-        # HSTS for HTTPS
-        if self.force_https:
-            response.headers["Strict-Transport-Security"] = (
-                "max-age=31536000; includeSubDomains"
-            )
-
-        # Prevent caching of sensitive pages
-        if "/admin" in request.url.path:
-            response.headers["Cache-Control"] = (
-                "no-store, no-cache, must-revalidate, private"
-            )
-            response.headers["Pragma"] = "no-cache"
-
-        # Permissions Policy (formerly Feature-Policy)
-        response.headers["Permissions-Policy"] = (
-            "accelerometer=(), camera=(), geolocation=(), "
-            "gyroscope=(), magnetometer=(), microphone=(), "
-            "payment=(), usb=()"
-        )
+        match = _ROUTE_RE.match(path)
+        route = _ROUTES[match.lastindex] if match else None
+        return route, self._csp_raw[(route, is_https)]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Add security headers to HTTP responses.
 
-        return response
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive channel.
+            send: ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Blog and pages may contain embedded media
+        route, csp = self._select_csp(scope["path"], scope.get("scheme") == "https")
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                replaced_names = self._replaced_names
+                raw_headers = [
+                    header for header in message.get("headers", ())
+                    if header[0].lower() not in replaced_names
+                ]
+                raw_headers.extend(self._static_raw)
+                raw_headers.append((b"content-security-policy", csp))
+                message["headers"] = raw_headers
+
+                # Prevent caching of sensitive pages
+                if route == "admin":
+                    headers = MutableHeaders(raw=raw_headers)
+                    headers["Cache-Control"] = (
+                        "no-store, no-cache, must-revalidate, private"
+                    )
+                    headers["Pragma"] = "no-cache"
+
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 
 def get_secure_cookie_settings(force_https: bool = True) -> dict:
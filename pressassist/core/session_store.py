@@ -2,25 +2,189 @@
 
 This module provides thread-safe, file-based storage for sessions and rate limiting
 that works correctly with multiple workers (unlike in-memory storage).
+
+Mutations run as a single read-modify-write under one exclusive lock so
+concurrent workers cannot lose each other's updates; ``SessionStore.batch()``
+groups several session changes into one such pass. The temp-file and
+rename path is only used to create the file initially.
 """
 
 import fcntl
-import json
-import tempfile
-import shutil
-from collections import defaultdict
+import os
+import threading
+import time
+from collections import defaultdict, deque
 from datetime import datetime, timedelta, timezone
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
+
+import orjson
 
 from .models import LoginAttempt, Role, Session
 
 
+_UTC = timezone.utc
+_now = datetime.now
+
+
 class SessionStoreError(Exception):
     """Session store error."""
     pass
 
 
+def _attempt_ts(attempt: dict) -> float:
+    """Get the time of a login attempt as epoch seconds.
+
+    Attempts carry a float ``ts`` next to the ISO ``timestamp``; entries
+    written before ``ts`` existed fall back to parsing the timestamp.
+
+    Args:
+        attempt: Attempt dict.
+
+    Returns:
+        Epoch seconds, or 0.0 if the attempt has no usable time.
+    """
+    ts = attempt.get("ts")
+    if isinstance(ts, (int, float)):
+        return ts
+    try:
+        return datetime.fromisoformat(attempt["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def _stat_key(st: os.stat_result) -> tuple[int, int, int]:
+    """Build a cache key identifying one version of a store file.
+
+    The inode changes when the file is replaced by rename, while the
+    modification time and size change on in-place rewrites.
+    """
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class SessionBatch:
+    """Session changes applied to one locked snapshot of the session file.
+
+    Obtained from ``SessionStore.batch()``; do not keep a reference past
+    the ``with`` block.
+    """
+
+    def __init__(self, data: dict):
+        """Initialize batch.
+
+        Args:
+            data: Indexed session data read under the exclusive lock.
+        """
+        self.data = data
+        self.changed = False
+
+    def save(self, session: Session) -> None:
+        """Add or replace a session.
+
+        Args:
+            session: Session object to save.
+        """
+        self._remove(session.session_id)
+        self.data["sessions"][session.session_id] = {
+            "session_id": session.session_id,
+            "user_id": session.user_id,
+            "role": session.role.value,
+            "ip": session.ip,
+            "user_agent": session.user_agent,
+            "csrf_token": session.csrf_token,
+            "created_at": session.created_at.isoformat(),
+            "expires_at": session.expires_at.isoformat(),
+        }
+        self.data["by_user"].setdefault(session.user_id, []).append(session.session_id)
+        self.changed = True
+
+    def delete(self, session_id: str) -> bool:
+        """Delete a session.
+
+        Args:
+            session_id: Session ID to delete.
+
+        Returns:
+            True if session was found and deleted.
+        """
+        if self._remove(session_id):
+            self.changed = True
+            return True
+        return False
+
+    def delete_user(self, user_id: str) -> int:
+        """Delete all sessions for a user.
+
+        Args:
+            user_id: User ID whose sessions to delete.
+
+        Returns:
+            Number of sessions deleted.
+        """
+        sessions = self.data["sessions"]
+        removed = 0
+        for sid in self.data["by_user"].pop(user_id, ()):
+            if sessions.pop(sid, None) is not None:
+                removed += 1
+
+        if removed:
+            self.changed = True
+        return removed
+
+    def cleanup_expired(self) -> int:
+        """Remove all expired sessions.
+
+        Returns:
+            Number of sessions removed.
+        """
+        parse = datetime.fromisoformat
+        now = _now(_UTC)
+
+        def is_live(record: dict) -> bool:
+            try:
+                return now <= parse(record["expires_at"])
+            except (KeyError, TypeError, ValueError):
+                return False
+
+        sessions = self.data["sessions"]
+        kept = {sid: record for sid, record in sessions.items() if is_live(record)}
+        removed = len(sessions) - len(kept)
+        if not removed:
+            return 0
+
+        by_user = {
+            user_id: [sid for sid in sids if sid in kept]
+            for user_id, sids in self.data["by_user"].items()
+        }
+        self.data["sessions"] = kept
+        self.data["by_user"] = {user_id: sids for user_id, sids in by_user.items() if sids}
+        self.changed = True
+        return removed
+
+    def _remove(self, session_id: str) -> bool:
+        """Remove one session and its index entry.
+
+        Args:
+            session_id: Session ID to remove.
+
+        Returns:
+            True if the session existed.
+        """
+        record = self.data["sessions"].pop(session_id, None)
+        if record is None:
+            return False
+
+        user_id = record.get("user_id")
+        user_sessions = self.data["by_user"].get(user_id)
+        if user_sessions is not None:
+            if session_id in user_sessions:
+                user_sessions.remove(session_id)
+            if not user_sessions:
+                del self.data["by_user"][user_id]
+        return True
+
+
 class SessionStore:
     """File-based session storage with atomic writes and locking.
 
@@ -35,30 +199,46 @@ class SessionStore:
             session_file: Path to the JSON file for storing sessions.
         """
         self.session_file = session_file
+        self._cache: tuple[tuple[int, int, int], dict] | None = None
+        self._dir_ok = False
         self._ensure_file_exists()
 
     def _ensure_file_exists(self) -> None:
         """Ensure the session file exists with valid JSON."""
         self.session_file.parent.mkdir(parents=True, exist_ok=True)
+        self._dir_ok = True
         if not self.session_file.exists():
-            self._atomic_write({})
+            self._atomic_write(self._with_index({}))
 
     def _read(self) -> dict[str, dict]:
         """Read sessions from file with shared lock.
 
         Returns:
-            Dictionary of session_id -> session data.
+            Indexed session data (see ``_with_index``).
         """
         try:
-            with open(self.session_file, "r", encoding="utf-8") as f:
+            key = _stat_key(os.stat(self.session_file))
+        except FileNotFoundError:
+            return self._with_index({})
+
+        # Unchanged since the last read: skip the lock and the parse
+        cache = self._cache
+        if cache is not None and cache[0] == key:
+            return cache[1]
+
+        try:
+            with open(self.session_file, "rb") as f:
                 fcntl.flock(f.fileno(), fcntl.LOCK_SH)
                 try:
-                    data = json.load(f)
+                    key = _stat_key(os.fstat(f.fileno()))
+                    data = self._with_index(orjson.loads(f.read()))
                 finally:
                     fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                return data
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+        except (orjson.JSONDecodeError, FileNotFoundError):
+            return self._with_index({})
+
+        self._cache = (key, data)
+        return data
 
     def _atomic_write(self, data: dict) -> None:
         """Write sessions to file atomically with exclusive lock.
@@ -66,45 +246,104 @@ class SessionStore:
         Args:
             data: Session data to write.
         """
-        self.session_file.parent.mkdir(parents=True, exist_ok=True)
+        if not self._dir_ok:
+            self.session_file.parent.mkdir(parents=True, exist_ok=True)
+            self._dir_ok = True
 
-        # Write to temp file first
-        fd, temp_path = tempfile.mkstemp(
-            dir=self.session_file.parent,
-            suffix=".tmp",
-        )
+        # Write to temp file first (same directory, so the rename is atomic)
+        temp_path = f"{self.session_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
         try:
-            with open(fd, "w", encoding="utf-8") as f:
+            with open(fd, "wb") as f:
                 fcntl.flock(f.fileno(), fcntl.LOCK_EX)
                 try:
-                    json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+                    f.write(orjson.dumps(data))
                 finally:
                     fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
             # Atomic rename
-            shutil.move(temp_path, self.session_file)
+            os.replace(temp_path, self.session_file)
+            self._cache = None
         except Exception:
             Path(temp_path).unlink(missing_ok=True)
             raise
 
+    @contextmanager
+    def batch(self) -> Iterator[SessionBatch]:
+        """Apply several session changes in one locked read-modify-write.
+
+        The file is read once on entry and, if anything changed, written
+        once on exit, all under a single exclusive lock. If the block
+        raises, nothing is written.
+
+        Example:
+            with store.batch() as batch:
+                batch.delete(old_session_id)
+                batch.save(new_session)
+
+        Yields:
+            SessionBatch operating on the locked data.
+        """
+        try:
+            f = open(self.session_file, "r+b")
+        except FileNotFoundError:
+            self._ensure_file_exists()
+            f = open(self.session_file, "r+b")
+
+        with f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    data = orjson.loads(f.read())
+                except orjson.JSONDecodeError:
+                    data = {}
+                batch = SessionBatch(self._with_index(data))
+
+                yield batch
+
+                if batch.changed:
+                    f.seek(0)
+                    f.truncate()
+                    f.write(orjson.dumps(batch.data))
+                    f.flush()
+
+                # Data seen under the exclusive lock is current
+                self._cache = (_stat_key(os.fstat(f.fileno())), batch.data)
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _with_index(data: dict) -> dict:
+        """Return session data in the indexed layout.
+
+        The file holds ``{"sessions": {session_id: record}, "by_user":
+        {user_id: [session_id, ...]}}``. Files in the older flat
+        ``{session_id: record}`` layout are converted in memory and written
+        back in the new layout on the next update.
+
+        Args:
+            data: Parsed file contents.
+
+        Returns:
+            Data with ``sessions`` and ``by_user`` keys.
+        """
+        if isinstance(data.get("sessions"), dict) and isinstance(data.get("by_user"), dict):
+            return data
+
+        by_user: dict[str, list[str]] = {}
+        for session_id, record in data.items():
+            if isinstance(record, dict) and record.get("user_id"):
+                by_user.setdefault(record["user_id"], []).append(session_id)
+        return {"sessions": data, "by_user": by_user}
+
     def save_session(self, session: Session) -> None:
         """Save a session to storage.
 
         Args:
             session: Session object to save.
         """
-        sessions = self._read()
-        sessions[session.session_id] = {
-            "session_id": session.session_id,
-            "user_id": session.user_id,
-            "role": session.role.value,
-            "ip": session.ip,
-            "user_agent": session.user_agent,
-            "csrf_token": session.csrf_token,
-            "created_at": session.created_at.isoformat(),
-            "expires_at": session.expires_at.isoformat(),
-        }
-        self._atomic_write(sessions)
+        with self.batch() as batch:
+            batch.save(session)
 
     def get_session(self, session_id: str) -> Session | None:
         """Get a session by ID.
@@ -115,8 +354,7 @@ class SessionStore:
         Returns:
             Session object if found and valid, None otherwise.
         """
-        sessions = self._read()
-        session_data = sessions.get(session_id)
+        session_data = self._read()["sessions"].get(session_id)
 
         if not session_data:
             return None
@@ -125,7 +363,7 @@ class SessionStore:
             expires_at = datetime.fromisoformat(session_data["expires_at"])
 
             # Check if expired
-            if datetime.now(timezone.utc) > expires_at:
+            if _now(_UTC) > expires_at:
                 self.delete_session(session_id)
                 return None
 
@@ -153,12 +391,8 @@ class SessionStore:
         Returns:
             True if session was found and deleted.
         """
-        sessions = self._read()
-        if session_id in sessions:
-            del sessions[session_id]
-            self._atomic_write(sessions)
-            return True
-        return False
+        with self.batch() as batch:
+            return batch.delete(session_id)
 
     def delete_user_sessions(self, user_id: str) -> int:
         """Delete all sessions for a user.
@@ -169,19 +403,8 @@ class SessionStore:
         Returns:
             Number of sessions deleted.
         """
-        sessions = self._read()
-        to_delete = [
-            sid for sid, data in sessions.items()
-            if data.get("user_id") == user_id
-        ]
-
-        for sid in to_delete:
-            del sessions[sid]
-
-        if to_delete:
-            self._atomic_write(sessions)
-
-        return len(to_delete)
+        with self.batch() as batch:
+            return batch.delete_user(user_id)
 
     def cleanup_expired(self) -> int:
         """Remove all expired sessions.
@@ -189,25 +412,8 @@ class SessionStore:
         Returns:
             Number of sessions removed.
         """
-        sessions = self._read()
-        now = datetime.now(timezone.utc)
-
-        expired = []
-        for session_id, data in sessions.items():
-            try:
-                expires_at = datetime.fromisoformat(data["expires_at"])
-                if now > expires_at:
-                    expired.append(session_id)
-            except (KeyError, ValueError):
-                expired.append(session_id)
-
-        for sid in expired:
-            del sessions[sid]
-
-        if expired:
-            self._atomic_write(sessions)
-
-        return len(expired)
+        with self.batch() as batch:
+            return batch.cleanup_expired()
 
     def get_session_count(self, user_id: str | None = None) -> int:
         """Get count of active sessions.
@@ -218,13 +424,10 @@ class SessionStore:
         Returns:
             Number of active sessions.
         """
-        sessions = self._read()
+        data = self._read()
         if user_id:
-            return sum(
-                1 for data in sessions.values()
-                if data.get("user_id") == user_id
-            )
-        return len(sessions)
+            return len(data["by_user"].get(user_id, ()))
+        return len(data["sessions"])
 
 
 class RateLimitStore:
@@ -232,6 +435,18 @@ class RateLimitStore:
 
     Provides persistent rate limiting that works correctly with multiple
     uvicorn workers.
+
+    Attempts are buffered in memory and written to disk in batches, at most
+    ``flush_interval`` seconds or ``max_pending`` attempts apart. A batch is
+    written when this process records or checks an attempt, or when
+    ``flush()`` is called; the application calls it every
+    ``flush_interval`` seconds, from ``cleanup_old_attempts()`` and at
+    shutdown, so attempts reach the file even if the worker goes idle.
+
+    Checks in this process always include the buffered attempts. Other
+    workers see them at most ``flush_interval`` plus ``recheck_interval``
+    seconds after they are recorded. Attempts still buffered when a worker
+    is killed without a clean shutdown are lost.
     """
 
     def __init__(
@@ -239,6 +454,9 @@ class RateLimitStore:
         rate_limit_file: Path,
         max_attempts: int = 5,
         window_minutes: int = 15,
+        flush_interval: float = 2.0,
+        max_pending: int = 32,
+        recheck_interval: float = 0.0,
     ):
         """Initialize rate limit store.
 
@@ -246,15 +464,35 @@ class RateLimitStore:
             rate_limit_file: Path to the JSON file for storing rate limit data.
             max_attempts: Maximum failed attempts allowed in window.
             window_minutes: Time window in minutes.
+            flush_interval: Maximum seconds buffered attempts wait for a flush.
+            max_pending: Number of buffered attempts that forces a flush.
+            recheck_interval: Seconds a read of the file is trusted before
+                it is stat-ed again for changes by other workers.
         """
         self.rate_limit_file = rate_limit_file
         self.max_attempts = max_attempts
         self.window = timedelta(minutes=window_minutes)
+        self._window_seconds = self.window.total_seconds()
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.recheck_interval = recheck_interval
+        self._checked_at = 0.0
+        self._pending: dict[str, list[dict]] = defaultdict(list)
+        self._pending_count = 0
+        self._pending_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._cache: tuple[tuple[int, int, int], dict] | None = None
+        self._dir_ok = False
+        # Per-IP failed-attempt timestamps, oldest first, valid for the
+        # snapshot identified by _failures_key
+        self._failures: dict[str, deque[float]] = {}
+        self._failures_key: tuple[int, int, int] | None = None
         self._ensure_file_exists()
 
     def _ensure_file_exists(self) -> None:
         """Ensure the rate limit file exists with valid JSON."""
         self.rate_limit_file.parent.mkdir(parents=True, exist_ok=True)
+        self._dir_ok = True
         if not self.rate_limit_file.exists():
             self._atomic_write({})
 
@@ -264,42 +502,102 @@ class RateLimitStore:
         Returns:
             Dictionary of IP -> list of attempts.
         """
+        # Read recently enough: skip even the stat
+        cache = self._cache
+        now = time.monotonic()
+        if cache is not None and now - self._checked_at < self.recheck_interval:
+            return cache[1]
+
         try:
-            with open(self.rate_limit_file, "r", encoding="utf-8") as f:
+            key = _stat_key(os.stat(self.rate_limit_file))
+        except FileNotFoundError:
+            return {}
+        self._checked_at = now
+
+        # Unchanged since the last read: skip the lock and the parse
+        if cache is not None and cache[0] == key:
+            return cache[1]
+
+        try:
+            with open(self.rate_limit_file, "rb") as f:
                 fcntl.flock(f.fileno(), fcntl.LOCK_SH)
                 try:
-                    data = json.load(f)
+                    key = _stat_key(os.fstat(f.fileno()))
+                    data = orjson.loads(f.read())
                 finally:
                     fcntl.flock(f.fileno(), fcntl.LOCK_UN)
-                return data
-        except (json.JSONDecodeError, FileNotFoundError):
+        except (orjson.JSONDecodeError, FileNotFoundError):
             return {}
 
+        self._cache = (key, data)
+        return data
+
     def _atomic_write(self, data: dict) -> None:
         """Write rate limit data to file atomically.
 
         Args:
             data: Rate limit data to write.
         """
-        self.rate_limit_file.parent.mkdir(parents=True, exist_ok=True)
+        if not self._dir_ok:
+            self.rate_limit_file.parent.mkdir(parents=True, exist_ok=True)
+            self._dir_ok = True
 
-        fd, temp_path = tempfile.mkstemp(
-            dir=self.rate_limit_file.parent,
-            suffix=".tmp",
-        )
+        temp_path = f"{self.rate_limit_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
         try:
-            with open(fd, "w", encoding="utf-8") as f:
+            with open(fd, "wb") as f:
                 fcntl.flock(f.fileno(), fcntl.LOCK_EX)
                 try:
-                    json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+                    f.write(orjson.dumps(data))
                 finally:
                     fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
-            shutil.move(temp_path, self.rate_limit_file)
+            os.replace(temp_path, self.rate_limit_file)
+            self._cache = None
         except Exception:
             Path(temp_path).unlink(missing_ok=True)
             raise
 
+    def _update(self, mutator: Callable[[dict], Any]) -> Any:
+        """Read, modify and write rate limit data under a single exclusive lock.
+
+        The file is rewritten in place only when the mutator returns a
+        truthy value.
+
+        Args:
+            mutator: Callable that modifies the rate limit dict in place.
+
+        Returns:
+            Whatever the mutator returned.
+        """
+        try:
+            f = open(self.rate_limit_file, "r+b")
+        except FileNotFoundError:
+            self._ensure_file_exists()
+            f = open(self.rate_limit_file, "r+b")
+
+        with f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                try:
+                    data = orjson.loads(f.read())
+                except orjson.JSONDecodeError:
+                    data = {}
+
+                result = mutator(data)
+
+                if result:
+                    f.seek(0)
+                    f.truncate()
+                    f.write(orjson.dumps(data))
+                    f.flush()
+
+                # Data seen under the exclusive lock is current
+                self._cache = (_stat_key(os.fstat(f.fileno())), data)
+                return result
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
     def record_attempt(
         self,
         ip: str,
@@ -313,21 +611,93 @@ class RateLimitStore:
             success: Whether login succeeded.
             user_agent: Optional user agent string.
         """
-        data = self._read()
-
-        if ip not in data:
-            data[ip] = []
-
-        data[ip].append({
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+        now_ts = time.time()
+        attempt = {
+            "timestamp": datetime.fromtimestamp(now_ts, _UTC).isoformat(),
+            "ts": now_ts,
             "success": success,
             "user_agent": user_agent,
-        })
+        }
+
+        with self._pending_lock:
+            self._pending[ip].append(attempt)
+            self._pending_count += 1
+
+            failures = self._failures.get(ip)
+            if failures is not None and not success:
+                failures.append(now_ts)
+
+            self._maybe_flush_locked()
+
+    def flush(self) -> None:
+        """Write all buffered attempts to disk."""
+        with self._pending_lock:
+            self._flush_locked()
+
+    def _maybe_flush_locked(self) -> None:
+        """Flush buffered attempts if the batch is full or old enough.
 
-        # Clean old attempts while we're here
-        self._cleanup_ip(data, ip)
+        Must be called with ``_pending_lock`` held.
+        """
+        if self._pending_count and (
+            self._pending_count >= self.max_pending
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """Merge buffered attempts into the file in one locked update.
+
+        Must be called with ``_pending_lock`` held.
+        """
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+
+        pending = self._pending
 
-        self._atomic_write(data)
+        def mutate(data: dict) -> bool:
+            for ip, attempts in pending.items():
+                # Clean old attempts while we're here
+                self._cleanup_ip(data, ip)
+                data.setdefault(ip, []).extend(attempts)
+            return True
+
+        self._update(mutate)
+        self._pending = defaultdict(list)
+        self._pending_count = 0
+
+    def _failures_for(self, ip: str) -> deque[float]:
+        """Get the failed-attempt window for an IP.
+
+        The window is built from the stored and buffered attempts the first
+        time an IP is checked against a given file snapshot, then kept up
+        to date by ``record_attempt``. Any change to the file, including
+        our own flushes, invalidates all windows.
+
+        Must be called with ``_pending_lock`` held.
+
+        Args:
+            ip: Client IP address.
+
+        Returns:
+            Deque of failed-attempt times (epoch seconds), oldest first.
+        """
+        data = self._read()
+        key = self._cache[0] if self._cache is not None else None
+        if key != self._failures_key:
+            self._failures = {}
+            self._failures_key = key
+
+        failures = self._failures.get(ip)
+        if failures is None:
+            failures = deque(sorted(
+                _attempt_ts(attempt)
+                for attempt in data.get(ip, []) + self._pending.get(ip, [])
+                if not attempt.get("success", False)
+            ))
+            self._failures[ip] = failures
+        return failures
 
     def check_rate_limit(self, ip: str) -> bool:
         """Check if IP has exceeded rate limit.
@@ -338,23 +708,15 @@ class RateLimitStore:
         Returns:
             True if under limit (allowed), False if exceeded (blocked).
         """
-        data = self._read()
-        attempts = data.get(ip, [])
-
-        now = datetime.now(timezone.utc)
-        window_start = now - self.window
+        return self.get_failed_count(ip) < self.max_attempts
 
-        # Count failed attempts in window
-        failed_count = 0
-        for attempt in attempts:
-            try:
-                timestamp = datetime.fromisoformat(attempt["timestamp"])
-                if timestamp > window_start and not attempt.get("success", False):
-                    failed_count += 1
-            except (KeyError, ValueError):
-                continue
+    def _window_start(self) -> float:
+        """Get the start of the rate limit window.
 
-        return failed_count < self.max_attempts
+        Returns:
+            Window start as epoch seconds.
+        """
+        return time.time() - self._window_seconds
 
     def _cleanup_ip(self, data: dict, ip: str) -> None:
         """Remove old attempts for an IP.
@@ -366,7 +728,7 @@ class RateLimitStore:
         if ip not in data:
             return
 
-        window_start = datetime.now(timezone.utc) - self.window
+        window_start = self._window_start()
 
         data[ip] = [
             attempt for attempt in data[ip]
@@ -377,21 +739,17 @@ class RateLimitStore:
         if not data[ip]:
             del data[ip]
 
-    def _is_recent(self, attempt: dict, window_start: datetime) -> bool:
+    def _is_recent(self, attempt: dict, window_start: float) -> bool:
         """Check if attempt is within the rate limit window.
 
         Args:
             attempt: Attempt dict.
-            window_start: Start of rate limit window.
+            window_start: Start of rate limit window as epoch seconds.
 
         Returns:
             True if attempt is recent.
         """
-        try:
-            timestamp = datetime.fromisoformat(attempt["timestamp"])
-            return timestamp > window_start
-        except (KeyError, ValueError):
-            return False
+        return _attempt_ts(attempt) > window_start
 
     def cleanup_old_attempts(self) -> int:
         """Remove all old attempts outside the rate limit window.
@@ -399,31 +757,29 @@ class RateLimitStore:
         Returns:
             Number of IPs cleaned.
         """
-        data = self._read()
-        window_start = datetime.now(timezone.utc) - self.window
+        self.flush()
 
+        window_start = self._window_start()
         cleaned = 0
-        ips_to_remove = []
-
-        for ip in list(data.keys()):
-            original_count = len(data[ip])
-            data[ip] = [
-                attempt for attempt in data[ip]
-                if self._is_recent(attempt, window_start)
-            ]
-
-            if len(data[ip]) < original_count:
-                cleaned += 1
-
-            if not data[ip]:
-                ips_to_remove.append(ip)
 
-        for ip in ips_to_remove:
-            del data[ip]
+        def mutate(data: dict) -> bool:
+            nonlocal cleaned
+            is_recent = self._is_recent
+            recent = {
+                ip: [attempt for attempt in attempts if is_recent(attempt, window_start)]
+                for ip, attempts in data.items()
+            }
+            cleaned = sum(
+                1 for ip, attempts in data.items() if len(recent[ip]) < len(attempts)
+            )
+            kept = {ip: attempts for ip, attempts in recent.items() if attempts}
 
-        if cleaned or ips_to_remove:
-            self._atomic_write(data)
+            changed = bool(cleaned) or len(kept) < len(data)
+            data.clear()
+            data.update(kept)
+            return changed
 
+        self._update(mutate)
         return cleaned
 
     def get_failed_count(self, ip: str) -> int:
@@ -435,13 +791,14 @@ class RateLimitStore:
         Returns:
             Number of failed attempts.
         """
-        data = self._read()
-        attempts = data.get(ip, [])
+        window_start = self._window_start()
 
-        window_start = datetime.now(timezone.utc) - self.window
+        with self._pending_lock:
+            self._maybe_flush_locked()
+            failures = self._failures_for(ip)
 
-        return sum(
-            1 for attempt in attempts
-            if self._is_recent(attempt, window_start)
-            and not attempt.get("success", False)
-        )
+            # Expire old failures from the front; each is dropped once
+            while failures and failures[0] <= window_start:
+                failures.popleft()
+
+            return len(failures)
@@ -0,0 +1,379 @@
+"""Persistent session and rate limit storage with a SQLite backend.
+
+Drop-in alternative to the JSON stores in ``session_store``. SQLite in WAL
+mode lets readers proceed while a single writer commits, and indexed point
+lookups replace re-parsing the whole store on every request.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+from .models import Role, Session
+
+_SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    ip TEXT NOT NULL,
+    user_agent TEXT NOT NULL,
+    csrf_token TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    expires_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_sessions_user ON sessions(user_id);
+CREATE INDEX IF NOT EXISTS ix_sessions_expires ON sessions(expires_at);
+"""
+
+_RATE_LIMIT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    ip TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    user_agent TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_attempts_ip_ts ON attempts(ip, ts);
+"""
+
+
+def _iso(value: datetime) -> str:
+    """Format a datetime as canonical UTC ISO-8601.
+
+    A fixed offset and fixed microsecond precision keep the text
+    representation ordered the same way as the datetimes, so range
+    queries can compare the stored strings directly.
+    """
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+class SQLiteSessionBatch:
+    """Session changes applied inside one SQLite transaction.
+
+    Obtained from ``SQLiteSessionStore.batch()``; mirrors ``SessionBatch``.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        """Initialize batch.
+
+        Args:
+            conn: Connection with an open write transaction.
+        """
+        self._conn = conn
+
+    def save(self, session: Session) -> None:
+        """Add or replace a session.
+
+        Args:
+            session: Session object to save.
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                session.session_id,
+                session.user_id,
+                session.role.value,
+                session.ip,
+                session.user_agent,
+                session.csrf_token,
+                _iso(session.created_at),
+                _iso(session.expires_at),
+            ),
+        )
+
+    def delete(self, session_id: str) -> bool:
+        """Delete a session.
+
+        Args:
+            session_id: Session ID to delete.
+
+        Returns:
+            True if session was found and deleted.
+        """
+        cursor = self._conn.execute(
+            "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+        )
+        return cursor.rowcount > 0
+
+    def delete_user(self, user_id: str) -> int:
+        """Delete all sessions for a user.
+
+        Args:
+            user_id: User ID whose sessions to delete.
+
+        Returns:
+            Number of sessions deleted.
+        """
+        cursor = self._conn.execute(
+            "DELETE FROM sessions WHERE user_id = ?", (user_id,)
+        )
+        return cursor.rowcount
+
+    def cleanup_expired(self) -> int:
+        """Remove all expired sessions.
+
+        Returns:
+            Number of sessions removed.
+        """
+        cursor = self._conn.execute(
+            "DELETE FROM sessions WHERE expires_at < ?",
+            (_iso(datetime.now(timezone.utc)),),
+        )
+        return cursor.rowcount
+
+
+class _SQLiteStore:
+    """Shared connection handling for the SQLite-backed stores.
+
+    Each thread gets its own connection; WAL mode allows concurrent readers
+    across threads and worker processes alongside one writer.
+    """
+
+    def __init__(self, db_file: Path, schema: str):
+        """Initialize the database and schema.
+
+        Args:
+            db_file: Path to the SQLite database file.
+            schema: DDL script creating tables and indexes.
+        """
+        self.db_file = db_file
+        self._local = threading.local()
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(schema)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class SQLiteSessionStore(_SQLiteStore):
+    """SQLite-based session storage.
+
+    Provides the same interface as ``SessionStore``.
+    """
+
+    def __init__(self, db_file: Path):
+        """Initialize session store.
+
+        Args:
+            db_file: Path to the SQLite database file.
+        """
+        super().__init__(db_file, _SESSION_SCHEMA)
+
+    @contextmanager
+    def batch(self) -> Iterator[SQLiteSessionBatch]:
+        """Apply several session changes in one transaction.
+
+        Yields:
+            SQLiteSessionBatch bound to the open transaction.
+        """
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield SQLiteSessionBatch(conn)
+
+    def save_session(self, session: Session) -> None:
+        """Save a session to storage.
+
+        Args:
+            session: Session object to save.
+        """
+        with self.batch() as batch:
+            batch.save(session)
+
+    def get_session(self, session_id: str) -> Session | None:
+        """Get a session by ID.
+
+        Args:
+            session_id: Session ID to look up.
+
+        Returns:
+            Session object if found and valid, None otherwise.
+        """
+        row = self._conn().execute(
+            "SELECT session_id, user_id, role, ip, user_agent, csrf_token, "
+            "created_at, expires_at FROM sessions WHERE session_id = ?",
+            (session_id,),
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        try:
+            expires_at = datetime.fromisoformat(row[7])
+
+            # Check if expired
+            if datetime.now(timezone.utc) > expires_at:
+                self.delete_session(session_id)
+                return None
+
+            return Session(
+                session_id=row[0],
+                user_id=row[1],
+                role=Role(row[2]),
+                ip=row[3],
+                user_agent=row[4],
+                csrf_token=row[5],
+                created_at=datetime.fromisoformat(row[6]),
+                expires_at=expires_at,
+            )
+        except ValueError:
+            # Invalid session data
+            self.delete_session(session_id)
+            return None
+
+    def delete_session(self, session_id: str) -> bool:
+        """Delete a session.
+
+        Args:
+            session_id: Session ID to delete.
+
+        Returns:
+            True if session was found and deleted.
+        """
+        with self.batch() as batch:
+            return batch.delete(session_id)
+
+    def delete_user_sessions(self, user_id: str) -> int:
+        """Delete all sessions for a user.
+
+        Args:
+            user_id: User ID whose sessions to delete.
+
+        Returns:
+            Number of sessions deleted.
+        """
+        with self.batch() as batch:
+            return batch.delete_user(user_id)
+
+    def cleanup_expired(self) -> int:
+        """Remove all expired sessions.
+
+        Returns:
+            Number of sessions removed.
+        """
+        with self.batch() as batch:
+            return batch.cleanup_expired()
+
+    def get_session_count(self, user_id: str | None = None) -> int:
+        """Get count of active sessions.
+
+        Args:
+            user_id: Optional user to filter by.
+
+        Returns:
+            Number of active sessions.
+        """
+        if user_id:
+            row = self._conn().execute(
+                "SELECT COUNT(*) FROM sessions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        else:
+            row = self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return row[0]
+
+
+class SQLiteRateLimitStore(_SQLiteStore):
+    """SQLite-based rate limit storage.
+
+    Provides the same interface as ``RateLimitStore``.
+    """
+
+    def __init__(
+        self,
+        db_file: Path,
+        max_attempts: int = 5,
+        window_minutes: int = 15,
+    ):
+        """Initialize rate limit store.
+
+        Args:
+            db_file: Path to the SQLite database file.
+            max_attempts: Maximum failed attempts allowed in window.
+            window_minutes: Time window in minutes.
+        """
+        super().__init__(db_file, _RATE_LIMIT_SCHEMA)
+        self.max_attempts = max_attempts
+        self.window = timedelta(minutes=window_minutes)
+
+    def _window_start(self) -> str:
+        """Get the start of the current rate limit window as ISO text."""
+        return _iso(datetime.now(timezone.utc) - self.window)
+
+    def record_attempt(
+        self,
+        ip: str,
+        success: bool,
+        user_agent: str | None = None
+    ) -> None:
+        """Record a login attempt.
+
+        Args:
+            ip: Client IP address.
+            success: Whether login succeeded.
+            user_agent: Optional user agent string.
+        """
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO attempts VALUES (?, ?, ?, ?)",
+                (ip, _iso(datetime.now(timezone.utc)), int(success), user_agent),
+            )
+            # Clean old attempts while we're here
+            conn.execute(
+                "DELETE FROM attempts WHERE ip = ? AND ts <= ?",
+                (ip, self._window_start()),
+            )
+
+    def check_rate_limit(self, ip: str) -> bool:
+        """Check if IP has exceeded rate limit.
+
+        Args:
+            ip: Client IP address.
+
+        Returns:
+            True if under limit (allowed), False if exceeded (blocked).
+        """
+        return self.get_failed_count(ip) < self.max_attempts
+
+    def cleanup_old_attempts(self) -> int:
+        """Remove all old attempts outside the rate limit window.
+
+        Returns:
+            Number of IPs cleaned.
+        """
+        window_start = self._window_start()
+        conn = self._conn()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cleaned = conn.execute(
+                "SELECT COUNT(DISTINCT ip) FROM attempts WHERE ts <= ?",
+                (window_start,),
+            ).fetchone()[0]
+            conn.execute("DELETE FROM attempts WHERE ts <= ?", (window_start,))
+        return cleaned
+
+    def get_failed_count(self, ip: str) -> int:
+        """Get count of failed attempts for an IP in the current window.
+
+        Args:
+            ip: Client IP address.
+
+        Returns:
+            Number of failed attempts.
+        """
+        row = self._conn().execute(
+            "SELECT COUNT(*) FROM attempts WHERE ip = ? AND ts > ? AND success = 0",
+            (ip, self._window_start()),
+        ).fetchone()
+        return row[0]
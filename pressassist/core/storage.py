@@ -1,12 +1,16 @@
 """JSON flat-file storage with atomic writes and locking."""
 
 import fcntl
-import json
-import shutil
+import mmap
+import os
 import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
+
+import orjson
 
 from .models import (
     Block,
@@ -20,6 +24,54 @@ from .models import (
 )
 
 
+# Datetimes go through ``default=str`` like the rest of the non-JSON
+# values, so the file format matches what stdlib json produced.
+_DUMP_OPTIONS = (
+    orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+)
+
+# Databases at least this large are parsed straight from a memory map
+# instead of being read into a bytes copy first.
+_MMAP_THRESHOLD = 256 * 1024
+
+
+def _dumps(data: dict) -> bytes:
+    """Serialize database contents as indented UTF-8 JSON.
+
+    Args:
+        data: Database contents.
+
+    Returns:
+        Encoded JSON document.
+    """
+    return orjson.dumps(data, default=str, option=_DUMP_OPTIONS)
+
+
+@lru_cache(maxsize=256)
+def _split_path(path: str) -> tuple[str, ...]:
+    """Split a dot-separated path into its keys.
+
+    The same handful of paths is looked up over and over, so the split
+    is cached instead of being redone on every access.
+
+    Args:
+        path: Dot-separated path (e.g., "config.site_title")
+
+    Returns:
+        Tuple of keys.
+    """
+    return tuple(path.split("."))
+
+
+def _stat_key(st: os.stat_result) -> tuple[int, int, int]:
+    """Build a key identifying one version of the database file.
+
+    The inode changes when the file is replaced by rename, while the
+    modification time and size change on in-place rewrites.
+    """
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
 class StorageError(Exception):
     """Base exception for storage errors."""
 
@@ -29,8 +81,9 @@ class StorageError(Exception):
 class Storage:
     """Thread-safe JSON database with atomic writes.
 
-    Uses file locking to prevent corruption from concurrent access.
-    Writes are atomic: write to temp file, then rename.
+    Writes are atomic: write to temp file, then rename. A reader that opens
+    the database therefore always sees a complete old or new version, so
+    loading takes no lock; writers still lock the file they write.
     """
 
     def __init__(self, db_path: Path):
@@ -41,36 +94,65 @@ class Storage:
         """
         self.db_path = db_path
         self._data: dict | None = None
+        self._file_key: tuple[int, int, int] | None = None
+        self._in_batch = False
+        self._dirty = False
         self._lock_path = db_path.with_suffix(".lock")
+        self._generation = 0
 
     @property
     def exists(self) -> bool:
         """Check if database file exists."""
         return self.db_path.exists()
 
+    @property
+    def generation(self) -> int:
+        """Counter bumped whenever the data is saved or reloaded from disk.
+
+        Lets callers cache values derived from the database and rebuild
+        them only after it changed. Changes inside a batch count once the
+        batch is saved.
+        """
+        return self._generation
+
     def load(self) -> dict:
         """Load database from file.
 
+        No lock is taken: once the file exists it is only ever replaced by
+        rename, never rewritten in place (see ``save()``). The one in-place
+        write is the very first save, before there is anything to read.
+
         Returns:
             Database contents as dictionary.
 
         Raises:
             StorageError: If file cannot be read or parsed.
         """
-        if not self.db_path.exists():
+        try:
+            key = _stat_key(os.stat(self.db_path))
+        except FileNotFoundError:
             raise StorageError(f"Database file not found: {self.db_path}")
+        except OSError as e:
+            raise StorageError(f"Cannot read database: {e}")
+
+        # File unchanged since we last read or wrote it
+        if self._data is not None and key == self._file_key:
+            return self._data
 
         try:
-            with open(self.db_path, "r", encoding="utf-8") as f:
-                # Acquire shared lock for reading
-                fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-                try:
-                    self._data = json.load(f)
-                finally:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            with open(self.db_path, "rb") as f:
+                st = os.fstat(f.fileno())
+                if st.st_size >= _MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        with memoryview(mm) as view:
+                            self._data = orjson.loads(view)
+                else:
+                    self._data = orjson.loads(f.read())
+                self._file_key = _stat_key(st)
+                self._generation += 1
 
             return self._data
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise StorageError(f"Invalid JSON in database: {e}")
         except OSError as e:
             raise StorageError(f"Cannot read database: {e}")
@@ -88,37 +170,45 @@ class Storage:
             self._data = data
         elif self._data is None:
             raise StorageError("No data to save")
+        self._generation += 1
 
         # Update last modified timestamp
         if "config" in self._data:
             self._data["config"]["last_modified"] = datetime.now(timezone.utc).isoformat()
 
+        payload = _dumps(self._data)
+        # Until the write succeeds the file no longer matches self._data
+        self._file_key = None
+
         try:
             # Ensure parent directory exists
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+            # Nothing to replace yet: write the new file in place
+            if not self.db_path.exists() and self._create(payload):
+                return
+
             # Write to temporary file first (atomic write pattern)
             fd, temp_path = tempfile.mkstemp(
                 dir=self.db_path.parent,
                 suffix=".tmp",
             )
             try:
-                with open(fd, "w", encoding="utf-8") as f:
+                with open(fd, "wb") as f:
                     # Acquire exclusive lock
                     fcntl.flock(f.fileno(), fcntl.LOCK_EX)
                     try:
-                        json.dump(
-                            self._data,
-                            f,
-                            indent=2,
-                            ensure_ascii=False,
-                            default=str,
-                        )
+                        f.write(payload)
+                        f.flush()
+                        # Make the contents durable before the rename exposes them
+                        os.fsync(f.fileno())
+                        key = _stat_key(os.fstat(f.fileno()))
                     finally:
                         fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
                 # Atomic rename
-                shutil.move(temp_path, self.db_path)
+                os.replace(temp_path, self.db_path)
+                self._file_key = key
             except Exception:
                 # Clean up temp file on error
                 Path(temp_path).unlink(missing_ok=True)
@@ -126,6 +216,74 @@ class Storage:
         except OSError as e:
             raise StorageError(f"Cannot save database: {e}")
 
+    def _create(self, payload: bytes) -> bool:
+        """Write a database file that does not exist yet.
+
+        The file is created exclusively, so there is no previous version to
+        protect and the temp-file-and-rename step can be skipped.
+
+        Args:
+            payload: Encoded database contents.
+
+        Returns:
+            True if the file was created, False if it appeared meanwhile
+            and must be replaced atomically instead.
+        """
+        try:
+            # Same permissions mkstemp would give the file
+            fd = os.open(self.db_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+        except FileExistsError:
+            return False
+
+        try:
+            with open(fd, "wb") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self._file_key = _stat_key(os.fstat(f.fileno()))
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        except Exception:
+            # Do not leave a truncated database behind
+            self._file_key = None
+            self.db_path.unlink(missing_ok=True)
+            raise
+        return True
+
+    @contextmanager
+    def batch(self) -> Iterator["Storage"]:
+        """Group several set()/delete() calls into one save.
+
+        Every set() or delete() normally rewrites the whole database; use a
+        batch for bulk edits so the file is written once when the block
+        exits. If the block raises, nothing is written and the unsaved
+        changes are dropped. Nested batches join the outer one.
+
+        Yields:
+            This storage instance.
+        """
+        if self._in_batch:
+            yield self
+            return
+
+        self._in_batch = True
+        self._dirty = False
+        try:
+            yield self
+        except BaseException:
+            # Reload from disk on next access instead of keeping half a batch
+            self._data = None
+            self._file_key = None
+            raise
+        finally:
+            self._in_batch = False
+
+        if self._dirty:
+            self._dirty = False
+            self.save()
+
     def get(self, path: str, default: Any = None) -> Any:
         """Get value from database using dot notation.
 
@@ -139,15 +297,35 @@ class Storage:
         if self._data is None:
             self.load()
 
-        keys = path.split(".")
         value = self._data
-        for key in keys:
+        for key in _split_path(path):
             if isinstance(value, dict) and key in value:
                 value = value[key]
             else:
                 return default
         return value
 
+    def has(self, path: str) -> bool:
+        """Check whether a value is stored at path.
+
+        Unlike ``get(path) is not None``, a stored None counts as present.
+
+        Args:
+            path: Dot-separated path (e.g., "users.admin")
+
+        Returns:
+            True if every key along the path exists.
+        """
+        if self._data is None:
+            self.load()
+
+        value = self._data
+        for key in _split_path(path):
+            if not isinstance(value, dict) or key not in value:
+                return False
+            value = value[key]
+        return True
+
     def set(self, path: str, value: Any) -> None:
         """Set value in database using dot notation.
 
@@ -158,14 +336,43 @@ class Storage:
         if self._data is None:
             self.load()
 
-        keys = path.split(".")
+        *parents, last = _split_path(path)
         target = self._data
-        for key in keys[:-1]:
-            if key not in target:
-                target[key] = {}
-            target = target[key]
-        target[keys[-1]] = value
-        self.save()
+        # One dict lookup per existing level; only missing levels are created
+        for key in parents:
+            try:
+                target = target[key]
+            except KeyError:
+                target[key] = target = {}
+        target[last] = value
+        if self._in_batch:
+            self._dirty = True
+        else:
+            self.save()
+
+    def update(self, path: str, fields: dict) -> bool:
+        """Merge fields into the dict at path and save once.
+
+        Unlike get() + set(), the record is changed in place and only the
+        given keys are touched.
+
+        Args:
+            path: Dot-separated path to an existing dict (e.g., "users.ali").
+            fields: Keys and values to set on it.
+
+        Returns:
+            True if updated, False if path does not point to a dict.
+        """
+        target = self.get(path)
+        if not isinstance(target, dict):
+            return False
+
+        target.update(fields)
+        if self._in_batch:
+            self._dirty = True
+        else:
+            self.save()
+        return True
 
     def delete(self, path: str) -> bool:
         """Delete value from database using dot notation.
@@ -179,18 +386,24 @@ class Storage:
         if self._data is None:
             self.load()
 
-        keys = path.split(".")
+        *parents, last = _split_path(path)
         target = self._data
-        for key in keys[:-1]:
-            if key not in target:
+        for key in parents:
+            try:
+                target = target[key]
+            except KeyError:
                 return False
-            target = target[key]
 
-        if keys[-1] in target:
-            del target[keys[-1]]
+        try:
+            del target[last]
+        except KeyError:
+            return False
+
+        if self._in_batch:
+            self._dirty = True
+        else:
             self.save()
-            return True
-        return False
+        return True
 
     def initialize(self, login_slug: str, admin_password_hash: str) -> dict:
         """Initialize a new database with default content.
@@ -202,7 +415,8 @@ class Storage:
         Returns:
             The initialized database.
         """
-        now = datetime.now(timezone.utc).isoformat()
+        now_dt = datetime.now(timezone.utc)
+        now = now_dt.isoformat()
 
         self._data = {
             "config": {
@@ -281,7 +495,7 @@ class Storage:
                 },
                 "footer": {
                     "name": "footer",
-                    "content": f"Copyright {datetime.now(timezone.utc).year}",
+                    "content": f"Copyright {now_dt.year}",
                     "content_format": "markdown",
                 },
                 "sidebar": {
@@ -317,8 +531,7 @@ class Storage:
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         backup_path = backup_dir / f"db_backup_{timestamp}.json"
 
-        with open(backup_path, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, indent=2, ensure_ascii=False, default=str)
+        backup_path.write_bytes(_dumps(self._data))
 
         return backup_path
 
@@ -332,8 +545,7 @@ class Storage:
             StorageError: If backup file is invalid.
         """
         try:
-            with open(backup_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = orjson.loads(backup_path.read_bytes())
 
             # Basic validation
             required_keys = {"config", "pages", "blocks"}
@@ -342,7 +554,7 @@ class Storage:
 
             self._data = data
             self.save()
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             raise StorageError(f"Invalid backup JSON: {e}")
         except OSError as e:
             raise StorageError(f"Cannot read backup: {e}")
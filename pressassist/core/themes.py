@@ -1,17 +1,103 @@
 """Theme loading and management."""
 
-import json
+import os
+import sys
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
-
-import jdatetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateNotFound
+from types import MappingProxyType
+from typing import Any, Mapping
+
+import orjson
+from jinja2 import (
+    BaseLoader,
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    ModuleLoader,
+    select_autoescape,
+    TemplateNotFound,
+)
 
 from .sanitize import Sanitizer
 
 
+# Parsed theme.json files keyed by path, with the (mtime, size) they were read at
+_theme_json_cache: dict[Path, tuple[tuple[int, int], dict | None]] = {}
+
+
+def _load_theme_json(path: Path) -> dict | None:
+    """Load a theme.json file, reusing the parsed result while it is unchanged.
+
+    String values are interned, since the same few names and versions are
+    read again every time themes are listed or resolved. The returned dict
+    is shared between callers and must not be modified.
+
+    Args:
+        path: Path to theme.json.
+
+    Returns:
+        Parsed metadata, or None if the file is missing or invalid.
+    """
+    try:
+        st = path.stat()
+    except OSError:
+        _theme_json_cache.pop(path, None)
+        return None
+
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _theme_json_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    try:
+        data = orjson.loads(path.read_bytes())
+    except (orjson.JSONDecodeError, OSError):
+        data = None
+
+    if isinstance(data, dict):
+        data = {
+            sys.intern(k): sys.intern(v) if isinstance(v, str) else v
+            for k, v in data.items()
+        }
+    else:
+        data = None
+
+    _theme_json_cache[path] = (key, data)
+    return data
+
+
+# Markdown filter state is the same for every theme, so one instance is shared
+_SHARED_SANITIZER = Sanitizer()
+
+
+@lru_cache(maxsize=512)
+def _render_markdown(content: str) -> str:
+    """Render Markdown for templates, caching output per source text.
+
+    Args:
+        content: Markdown content.
+
+    Returns:
+        Sanitized HTML string.
+    """
+    return _SHARED_SANITIZER.render_markdown(content)
+
+
+# Upper bound on remembered page -> template resolutions per theme
+_PAGE_TEMPLATE_CACHE_SIZE = 1024
+
+# Seconds a precompiled archive is trusted before the templates are
+# checked again for edits made after it was built
+_COMPILED_RECHECK_INTERVAL = 1.0
+
+# ASCII and Arabic-Indic digits to their Persian forms
+_PERSIAN_DIGITS = str.maketrans("0123456789٠١٢٣٤٥٦٧٨٩", "۰۱۲۳۴۵۶۷۸۹" * 2)
+
+
 def to_persian_numerals(text: str) -> str:
     """Convert English numerals to Persian numerals.
 
@@ -21,19 +107,22 @@ def to_persian_numerals(text: str) -> str:
     Returns:
         String with Persian numerals.
     """
-    persian_digits = "۰۱۲۳۴۵۶۷۸۹"
-    result = ""
-    for char in str(text):
-        if char.isdigit():
-            result += persian_digits[int(char)]
-        else:
-            result += char
-    return result
+    return str(text).translate(_PERSIAN_DIGITS)
+
+# Persian month names, indexed by Jalali month number
+_JALALI_MONTHS = (
+    "", "فروردین", "اردیبهشت", "خرداد", "تیر", "مرداد", "شهریور",
+    "مهر", "آبان", "آذر", "دی", "بهمن", "اسفند",
+)
 
 
+@lru_cache(maxsize=2048)
 def jalali_date(value: str, lang: str = "en") -> str:
     """Convert a date string to Jalali (Persian) calendar format.
 
+    Results are cached, since listings format the same dates on every
+    render.
+
     Args:
         value: Date string in ISO format (e.g., "2026-01-05" or "2026-01-05T12:00:00")
         lang: Language code ("fa" for Persian/Jalali, otherwise Gregorian)
@@ -45,33 +134,35 @@ def jalali_date(value: str, lang: str = "en") -> str:
         return ""
 
     try:
-        # Parse the date string
-        if "T" in value:
-            dt = datetime.fromisoformat(value.replace("Z", "+00:00").split("+")[0])
+        # Only the calendar date is shown, so parse just that part: bare
+        # dates directly, timestamps up to the seconds (dropping any
+        # fraction or UTC offset, as the date is shown as written)
+        if len(value) == 10:
+            day_value = date.fromisoformat(value)
+        elif "T" in value:
+            day_value = datetime.fromisoformat(value[:19]).date()
         else:
-            dt = datetime.fromisoformat(value)
+            day_value = datetime.fromisoformat(value).date()
 
         if lang == "fa":
+            # Only Persian sites need jdatetime, so import it on first use
+            import jdatetime
+
             # Convert to Jalali
-            jd = jdatetime.date.fromgregorian(date=dt.date())
-            # Persian month names
-            months = [
-                "", "فروردین", "اردیبهشت", "خرداد", "تیر", "مرداد", "شهریور",
-                "مهر", "آبان", "آذر", "دی", "بهمن", "اسفند"
-            ]
+            jd = jdatetime.date.fromgregorian(date=day_value)
             # Convert numbers to Persian numerals
             day = to_persian_numerals(jd.day)
             year = to_persian_numerals(jd.year)
-            return f"{day} {months[jd.month]} {year}"
+            return f"{day} {_JALALI_MONTHS[jd.month]} {year}"
         else:
             # Return Gregorian format
-            return dt.strftime("%Y-%m-%d")
+            return day_value.strftime("%Y-%m-%d")
     except (ValueError, TypeError, AttributeError):
         # If parsing fails, return original value
         return value[:10] if len(value) >= 10 else value
 
 
-@dataclass
+@dataclass(slots=True)
 class ThemeInfo:
     """Theme metadata from theme.json."""
 
@@ -83,7 +174,46 @@ class ThemeInfo:
     screenshot: str = ""
 
 
-@dataclass
+# ThemeInfo built for each theme directory, with the parsed theme.json it came from
+_theme_info_cache: dict[Path, tuple[dict | None, ThemeInfo]] = {}
+
+
+def _load_theme_info(theme_dir: Path) -> ThemeInfo:
+    """Get metadata for a theme directory.
+
+    The ThemeInfo is rebuilt only when _load_theme_json returns a different
+    parse, i.e. when theme.json changed on disk. The returned object is
+    shared between callers and must not be modified.
+
+    Args:
+        theme_dir: Theme directory.
+
+    Returns:
+        ThemeInfo from theme.json, or named after the directory if the file
+        is missing or invalid.
+    """
+    data = _load_theme_json(theme_dir / "theme.json")
+    cached = _theme_info_cache.get(theme_dir)
+    if cached is not None and cached[0] is data:
+        return cached[1]
+
+    if data is not None:
+        info = ThemeInfo(
+            name=data.get("name", theme_dir.name),
+            version=data.get("version", "1.0.0"),
+            description=data.get("description", ""),
+            author=data.get("author", ""),
+            homepage=data.get("homepage", ""),
+            screenshot=data.get("screenshot", ""),
+        )
+    else:
+        info = ThemeInfo(name=theme_dir.name)
+
+    _theme_info_cache[theme_dir] = (data, info)
+    return info
+
+
+@dataclass(slots=True)
 class CMSContext:
     """Context passed to theme templates.
 
@@ -192,6 +322,7 @@ class ThemeManager:
         themes_dir: Path,
         fallback_dir: Path | None = None,
         active_theme: str = "default",
+        bytecode_cache_dir: Path | None = None,
     ):
         """Initialize theme manager.
 
@@ -199,13 +330,27 @@ class ThemeManager:
             themes_dir: Path to themes directory.
             fallback_dir: Path to fallback templates (optional).
             active_theme: Name of active theme.
+            bytecode_cache_dir: Directory to persist compiled templates in,
+                so new processes skip recompiling them (optional).
         """
         self.themes_dir = themes_dir
         self.fallback_dir = fallback_dir
+        self._bytecode_cache: FileSystemBytecodeCache | None = None
+        if bytecode_cache_dir is not None:
+            bytecode_cache_dir.mkdir(parents=True, exist_ok=True)
+            self._bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
+        self._theme_index: dict[str, str] | None = None
+        self._theme_index_mtime: int | None = None
         self.active_theme = self._resolve_theme_dir(active_theme)
         self._env: Environment | None = None
-        self._theme_info: ThemeInfo | None = None
-        self.sanitizer = Sanitizer()
+        # mtime of the precompiled archive the environment loads from, and
+        # when the templates were last checked against it
+        self._compiled_mtime: int | None = None
+        self._compiled_checked_at = 0.0
+        self._page_templates: dict[tuple[str, str], str] = {}
+        self._404_template: str | None = None
+        self._site_vars: tuple[tuple[str, str, str], Mapping[str, str]] | None = None
+        self.sanitizer = _SHARED_SANITIZER
 
     @property
     def theme_path(self) -> Path:
@@ -222,6 +367,47 @@ class ThemeManager:
         """Get path to active theme's static files."""
         return self.theme_path / "static"
 
+    def _build_theme_index(self) -> dict[str, str]:
+        """Map lowercase theme names to their directories.
+
+        Directory names take precedence over theme.json display names. The
+        index is kept until the themes directory changes or
+        ``refresh_themes()`` is called.
+
+        Returns:
+            Dict of lowercase directory or display name to directory name.
+        """
+        try:
+            mtime = self.themes_dir.stat().st_mtime_ns
+        except OSError:
+            return {}
+
+        if self._theme_index is not None and mtime == self._theme_index_mtime:
+            return self._theme_index
+
+        index: dict[str, str] = {}
+        display_names: list[tuple[str, str]] = []
+        with os.scandir(self.themes_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                index.setdefault(entry.name.lower(), entry.name)
+                data = _load_theme_json(Path(entry.path, "theme.json"))
+                if data is not None:
+                    display_names.append((str(data.get("name", "")).lower(), entry.name))
+
+        for name, dir_name in display_names:
+            index.setdefault(name, dir_name)
+
+        self._theme_index = index
+        self._theme_index_mtime = mtime
+        return index
+
+    def refresh_themes(self) -> None:
+        """Forget the theme name index so it is rebuilt on next lookup."""
+        self._theme_index = None
+        self._theme_index_mtime = None
+
     def _resolve_theme_dir(self, theme: str) -> str:
         """Resolve a theme name to its directory.
 
@@ -236,24 +422,9 @@ class ThemeManager:
         if direct_path.exists():
             return theme
 
-        if self.themes_dir.exists():
-            for entry in self.themes_dir.iterdir():
-                if entry.is_dir() and entry.name.lower() == theme.lower():
-                    return entry.name
-
-            for entry in self.themes_dir.iterdir():
-                if not entry.is_dir():
-                    continue
-                json_path = entry / "theme.json"
-                if not json_path.exists():
-                    continue
-                try:
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    if str(data.get("name", "")).lower() == theme.lower():
-                        return entry.name
-                except (json.JSONDecodeError, OSError):
-                    continue
+        dir_name = self._build_theme_index().get(theme.lower())
+        if dir_name is not None:
+            return dir_name
 
         if (self.themes_dir / "default").exists():
             return "default"
@@ -266,38 +437,19 @@ class ThemeManager:
         Returns:
             ThemeInfo with theme metadata.
         """
-        if self._theme_info is not None:
-            return self._theme_info
+        return _load_theme_info(self.theme_path)
 
-        json_path = self.theme_path / "theme.json"
-        if json_path.exists():
-            try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self._theme_info = ThemeInfo(
-                    name=data.get("name", self.active_theme),
-                    version=data.get("version", "1.0.0"),
-                    description=data.get("description", ""),
-                    author=data.get("author", ""),
-                    homepage=data.get("homepage", ""),
-                    screenshot=data.get("screenshot", ""),
-                )
-            except (json.JSONDecodeError, OSError):
-                self._theme_info = ThemeInfo(name=self.active_theme)
-        else:
-            self._theme_info = ThemeInfo(name=self.active_theme)
+    @property
+    def compiled_templates_path(self) -> Path:
+        """Get path to the active theme's precompiled template archive."""
+        return self.theme_path / "compiled.zip"
 
-        return self._theme_info
+    def _loader_paths(self) -> list[str]:
+        """Get template directories in lookup order.
 
-    def get_env(self) -> Environment:
-        """Get or create Jinja2 environment.
-
-        Returns:
-            Configured Jinja2 Environment.
+        Raises:
+            RuntimeError: If neither the theme nor the fallback has templates.
         """
-        if self._env is not None:
-            return self._env
-
         # Build loader paths
         loader_paths = []
 
@@ -312,19 +464,107 @@ class ThemeManager:
         if not loader_paths:
             raise RuntimeError(f"No template directories found for theme: {self.active_theme}")
 
-        self._env = Environment(
-            loader=FileSystemLoader(loader_paths),
+        return loader_paths
+
+    def _make_env(self, loader: BaseLoader, bytecode_cache: FileSystemBytecodeCache | None) -> Environment:
+        """Create a Jinja2 environment with the theme settings and filters."""
+        env = Environment(
+            loader=loader,
             autoescape=select_autoescape(["html", "htm", "xml"]),
             trim_blocks=True,
             lstrip_blocks=True,
+            bytecode_cache=bytecode_cache,
+            # A theme has a small, fixed set of templates: keep them all loaded
+            cache_size=-1,
         )
 
         # Add custom filters
-        self._env.filters["render_markdown"] = self.sanitizer.render_markdown
-        self._env.filters["jalali_date"] = jalali_date
+        env.filters["render_markdown"] = _render_markdown
+        env.filters["jalali_date"] = jalali_date
 
+        return env
+
+    def _fresh_compiled_mtime(self, loader_paths: list[str]) -> int | None:
+        """Get the precompiled archive's mtime if it is newer than every template.
+
+        Compiled modules never check their source, so a stale archive
+        would hide template edits; in that case it is ignored.
+
+        Returns:
+            The archive's mtime in nanoseconds, or None if it is missing
+            or stale.
+        """
+        try:
+            compiled_mtime = self.compiled_templates_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+        for path in loader_paths:
+            for dirpath, _, filenames in os.walk(path):
+                for filename in filenames:
+                    if os.stat(os.path.join(dirpath, filename)).st_mtime_ns > compiled_mtime:
+                        return None
+        return compiled_mtime
+
+    def get_env(self) -> Environment:
+        """Get or create Jinja2 environment.
+
+        Templates precompiled by ``precompile()`` are loaded as Python
+        modules when the archive is up to date; anything missing from it
+        is still loaded from the template directories. While the archive
+        is in use, the templates are checked against it at most every
+        ``_COMPILED_RECHECK_INTERVAL`` seconds, and the environment is
+        rebuilt once a template is edited or the archive is replaced.
+
+        Returns:
+            Configured Jinja2 Environment.
+        """
+        if self._env is not None:
+            if self._compiled_mtime is None:
+                return self._env
+            now = time.monotonic()
+            if now - self._compiled_checked_at < _COMPILED_RECHECK_INTERVAL:
+                return self._env
+            self._compiled_checked_at = now
+            if self._fresh_compiled_mtime(self._loader_paths()) == self._compiled_mtime:
+                return self._env
+            self._env = None
+
+        loader_paths = self._loader_paths()
+        loader: BaseLoader = FileSystemLoader(loader_paths)
+        self._compiled_mtime = self._fresh_compiled_mtime(loader_paths)
+        self._compiled_checked_at = time.monotonic()
+        if self._compiled_mtime is not None:
+            loader = ChoiceLoader([ModuleLoader(str(self.compiled_templates_path)), loader])
+
+        self._env = self._make_env(loader, self._bytecode_cache)
         return self._env
 
+    def precompile(self, target: Path | None = None) -> Path:
+        """Compile the active theme's templates to an importable archive.
+
+        Args:
+            target: Archive path (defaults to ``compiled_templates_path``).
+
+        Returns:
+            Path to the written archive.
+        """
+        target = target or self.compiled_templates_path
+        env = self._make_env(FileSystemLoader(self._loader_paths()), None)
+
+        # Build next to the target and swap it in, so a running worker
+        # never picks up a half-written archive
+        temp_path = target.with_name(f".{target.name}.tmp")
+        try:
+            env.compile_templates(str(temp_path), zip="deflated", ignore_errors=False)
+            os.replace(temp_path, target)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        self._env = None
+        return target
+
     def set_active_theme(self, theme: str) -> None:
         """Change active theme.
 
@@ -333,7 +573,8 @@ class ThemeManager:
         """
         self.active_theme = self._resolve_theme_dir(theme)
         self._env = None
-        self._theme_info = None
+        self._page_templates.clear()
+        self._404_template = None
 
     def render(
         self,
@@ -365,11 +606,7 @@ class ThemeManager:
         # Build template context
         ctx = {
             "cms": context,
-            "site": {
-                "title": context.site_title,
-                "lang": context.site_lang,
-                "theme": context.theme,
-            },
+            "site": self._get_site_vars(context),
             "page": {
                 "title": context.page_title,
                 "slug": context.page_slug,
@@ -390,10 +627,32 @@ class ThemeManager:
             "user": context.user,
             "csrf_token": context.csrf_token,
             "alerts": context.alerts,
-            **extra,
         }
+        if extra:
+            ctx.update(extra)
 
-        return template.render(**ctx)
+        # Pass the dict itself; unpacking it as keywords would copy it twice more
+        return template.render(ctx)
+
+    def _get_site_vars(self, context: CMSContext) -> Mapping[str, str]:
+        """Get the ``site`` template variable, reused while it is unchanged.
+
+        Site title, language and theme are the same across most requests,
+        so the mapping is only rebuilt when one of them differs. It is
+        read-only because every render shares it.
+
+        Args:
+            context: CMSContext being rendered.
+
+        Returns:
+            Read-only mapping with title, lang and theme.
+        """
+        key = (context.site_title, context.site_lang, context.theme)
+        cached = self._site_vars
+        if cached is None or cached[0] != key:
+            cached = (key, MappingProxyType({"title": key[0], "lang": key[1], "theme": key[2]}))
+            self._site_vars = cached
+        return cached[1]
 
     def render_page(self, context: CMSContext) -> str:
         """Render a page using the page template.
@@ -418,25 +677,30 @@ class ThemeManager:
             template = "default"
         context.page_template = template
 
-        # Build list of templates to try
-        templates_to_try = [
-            f"{context.page_slug}.html",
-        ]
+        # Template names are resolved once per (slug, template) pair
+        key = (context.page_slug, template)
+        template_name = self._page_templates.get(key)
+        if template_name is None:
+            # Build list of templates to try
+            templates_to_try = [f"{context.page_slug}.html"]
 
-        # Add selected template if not default
-        if context.page_template != "default":
-            templates_to_try.append(f"page-{context.page_template}.html")
+            # Add selected template if not default
+            if template != "default":
+                templates_to_try.append(f"page-{template}.html")
 
-        # Always try page.html and base.html as fallbacks
-        templates_to_try.extend(["page.html", "base.html"])
+            # Always try page.html and base.html as fallbacks
+            templates_to_try.extend(["page.html", "base.html"])
 
-        for template_name in templates_to_try:
             try:
-                return self.render(template_name, context, allow_fallback=False)
+                template_name = env.select_template(templates_to_try).name
             except TemplateNotFound:
-                continue
+                raise RuntimeError("No valid template found")
 
-        raise RuntimeError("No valid template found")
+            if len(self._page_templates) >= _PAGE_TEMPLATE_CACHE_SIZE:
+                self._page_templates.clear()
+            self._page_templates[key] = template_name
+
+        return self.render(template_name, context, allow_fallback=False)
 
     def render_404(self, context: CMSContext) -> str:
         """Render 404 error page.
@@ -447,10 +711,15 @@ class ThemeManager:
         Returns:
             Rendered HTML.
         """
-        try:
-            return self.render("404.html", context, allow_fallback=False)
-        except TemplateNotFound:
-            return self.render("page.html", context, allow_fallback=True)
+        # Resolved once, so themes without 404.html don't raise on every miss
+        template_name = self._404_template
+        if template_name is None:
+            template_name = self.get_env().select_template(
+                ["404.html", "page.html", "base.html"]
+            ).name
+            self._404_template = template_name
+
+        return self.render(template_name, context, allow_fallback=False)
 
     def list_themes(self) -> list[ThemeInfo]:
         """List all available themes.
@@ -460,35 +729,22 @@ class ThemeManager:
         """
         themes = []
 
-        if not self.themes_dir.exists():
+        try:
+            entries = os.scandir(self.themes_dir)
+        except OSError:
             return themes
 
-        for theme_dir in self.themes_dir.iterdir():
-            if not theme_dir.is_dir():
-                continue
-
-            # Check for required files
-            templates = theme_dir / "templates"
-            if not templates.exists():
-                continue
-
-            # Load theme info
-            json_path = theme_dir / "theme.json"
-            if json_path.exists():
-                try:
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                    themes.append(
-                        ThemeInfo(
-                            name=data.get("name", theme_dir.name),
-                            version=data.get("version", "1.0.0"),
-                            description=data.get("description", ""),
-                            author=data.get("author", ""),
-                        )
-                    )
-                except (json.JSONDecodeError, OSError):
-                    themes.append(ThemeInfo(name=theme_dir.name))
-            else:
-                themes.append(ThemeInfo(name=theme_dir.name))
+        # DirEntry caches the file type from the directory read, so only
+        # theme directories cost further stat calls
+        with entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+
+                # Check for required files
+                if not os.path.isdir(os.path.join(entry.path, "templates")):
+                    continue
+
+                themes.append(_load_theme_info(Path(entry.path)))
 
         return themes
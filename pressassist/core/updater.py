@@ -6,20 +6,29 @@ Handles checking and applying updates from GitHub repository.
 from __future__ import annotations
 
 import asyncio
+import os
 import shutil
 import tempfile
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Callable
 
 import httpx
+import orjson
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency (httpx[http2])
+    HTTP2_AVAILABLE = False
 
 # GitHub repository configuration
 REPO_OWNER = "ahmadbatebi"
 REPO_NAME = "pycms"
 GITHUB_API_URL = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}"
-GITHUB_ZIP_URL = f"https://github.com/{REPO_OWNER}/{REPO_NAME}/archive/refs/heads/main.zip"
+GITHUB_COMMIT_ZIP_URL = f"https://github.com/{REPO_OWNER}/{REPO_NAME}/archive/{{sha}}.zip"
 
 # Directories/files to preserve during update (user data)
 PRESERVE_PATHS = [
@@ -31,6 +40,16 @@ PRESERVE_PATHS = [
 
 # Request timeout in seconds
 REQUEST_TIMEOUT = 30.0
+DOWNLOAD_TIMEOUT = 60.0
+
+# Threads used to copy top-level entries when applying an update
+COPY_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# Bytes read from the network per write while downloading an update
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Buffer used to inflate each archive member to disk
+EXTRACT_BUFFER_SIZE = 1024 * 1024
 
 
 class UpdateError(Exception):
@@ -38,6 +57,50 @@ class UpdateError(Exception):
     pass
 
 
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+# Validators and parsed fields of the last commits/main response, used for
+# conditional requests (a 304 reply carries no body and is not rate limited)
+_commit_cache: dict | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for GitHub requests.
+
+    Reusing one client keeps the connection (and its TLS session) alive
+    between update checks. A new client is created if the previous one was
+    closed or belongs to another event loop.
+
+    Returns:
+        The shared AsyncClient.
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True,
+            http2=HTTP2_AVAILABLE,
+            headers={"User-Agent": "ChelCheleh-CMS-Updater"},
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client, if one was opened."""
+    global _client, _client_loop
+
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
 async def check_for_updates(current_commit: str | None) -> dict:
     """
     Check GitHub for available updates.
@@ -56,57 +119,74 @@ async def check_for_updates(current_commit: str | None) -> dict:
             "error": str | None
         }
     """
-    try:
-        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
-            # Get the latest commit from main branch
-            response = await client.get(
-                f"{GITHUB_API_URL}/commits/main",
-                headers={
-                    "Accept": "application/vnd.github.v3+json",
-                    "User-Agent": "ChelCheleh-CMS-Updater",
-                },
-            )
+    global _commit_cache
 
-            if response.status_code == 404:
-                return {
-                    "update_available": False,
-                    "latest_commit": None,
-                    "commit_date": None,
-                    "commit_message": None,
-                    "current_commit": current_commit,
-                    "error": "Repository not found",
-                }
+    try:
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if _commit_cache is not None:
+            if _commit_cache["etag"]:
+                headers["If-None-Match"] = _commit_cache["etag"]
+            if _commit_cache["last_modified"]:
+                headers["If-Modified-Since"] = _commit_cache["last_modified"]
+
+        client = get_client()
+        # Get the latest commit from main branch
+        response = await client.get(f"{GITHUB_API_URL}/commits/main", headers=headers)
+
+        if response.status_code == 404:
+            return {
+                "update_available": False,
+                "latest_commit": None,
+                "commit_date": None,
+                "commit_message": None,
+                "current_commit": current_commit,
+                "error": "Repository not found",
+            }
 
-            if response.status_code == 403:
-                # Rate limit exceeded
-                return {
-                    "update_available": False,
-                    "latest_commit": None,
-                    "commit_date": None,
-                    "commit_message": None,
-                    "current_commit": current_commit,
-                    "error": "GitHub API rate limit exceeded. Please try again later.",
-                }
+        if response.status_code == 403:
+            # Rate limit exceeded
+            return {
+                "update_available": False,
+                "latest_commit": None,
+                "commit_date": None,
+                "commit_message": None,
+                "current_commit": current_commit,
+                "error": "GitHub API rate limit exceeded. Please try again later.",
+            }
 
+        if response.status_code == 304 and _commit_cache is not None:
+            # Unchanged since the last check
+            latest_commit = _commit_cache["latest_commit"]
+            commit_date = _commit_cache["commit_date"]
+            commit_message = _commit_cache["commit_message"]
+        else:
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
             latest_commit = data["sha"]
             commit_date = data["commit"]["committer"]["date"]
             commit_message = data["commit"]["message"].split("\n")[0]  # First line only
 
-            # Check if update is available
-            update_available = current_commit is None or current_commit != latest_commit
-
-            return {
-                "update_available": update_available,
+            _commit_cache = {
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
                 "latest_commit": latest_commit,
                 "commit_date": commit_date,
                 "commit_message": commit_message,
-                "current_commit": current_commit,
-                "error": None,
             }
 
+        # Check if update is available
+        update_available = current_commit is None or current_commit != latest_commit
+
+        return {
+            "update_available": update_available,
+            "latest_commit": latest_commit,
+            "commit_date": commit_date,
+            "commit_message": commit_message,
+            "current_commit": current_commit,
+            "error": None,
+        }
+
     except httpx.TimeoutException:
         return {
             "update_available": False,
@@ -139,6 +219,7 @@ async def check_for_updates(current_commit: str | None) -> dict:
 async def download_and_apply_update(
     base_path: Path,
     backup_callback: Callable[[], str] | None = None,
+    new_commit: str | None = None,
 ) -> dict:
     """
     Download and apply the latest update from GitHub.
@@ -147,6 +228,12 @@ async def download_and_apply_update(
         base_path: The base installation path of the CMS.
         backup_callback: Optional callback function to create a backup before update.
                         Should return the backup file path.
+        new_commit: Commit to install, the latest_commit reported by
+                    check_for_updates. Its archive is downloaded directly, so
+                    the installed files always match the recorded commit.
+                    It is only used if it is the head of main found by the
+                    last check; otherwise (or if None) the current head of
+                    main is looked up first.
 
     Returns:
         Dictionary with update result:
@@ -173,44 +260,37 @@ async def download_and_apply_update(
                     "error": f"Backup failed: {str(e)}",
                 }
 
-        # Step 2: Get latest commit hash
-        async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+        # Step 2: Get latest commit hash, unless the last check found it.
+        # GitHub serves archives of fork commits under this repository's
+        # URL, so no other commit is downloaded.
+        client = get_client()
+        if _commit_cache is None or new_commit != _commit_cache["latest_commit"]:
             commit_response = await client.get(
                 f"{GITHUB_API_URL}/commits/main",
-                headers={
-                    "Accept": "application/vnd.github.v3+json",
-                    "User-Agent": "ChelCheleh-CMS-Updater",
-                },
+                headers={"Accept": "application/vnd.github.v3+json"},
             )
             commit_response.raise_for_status()
-            new_commit = commit_response.json()["sha"]
+            new_commit = orjson.loads(commit_response.content)["sha"]
 
         # Step 3: Download ZIP file
         temp_dir = Path(tempfile.mkdtemp(prefix="chelcheleh_update_"))
         zip_path = temp_dir / "update.zip"
 
-        async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-            response = await client.get(
-                GITHUB_ZIP_URL,
-                headers={"User-Agent": "ChelCheleh-CMS-Updater"},
-            )
+        zip_url = GITHUB_COMMIT_ZIP_URL.format(sha=new_commit)
+        async with client.stream("GET", zip_url, timeout=DOWNLOAD_TIMEOUT) as response:
             response.raise_for_status()
 
-            zip_path.write_bytes(response.content)
+            # Write chunks as they arrive instead of holding the whole archive
+            with open(zip_path, "wb") as f:
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
 
         # Step 4: Extract ZIP file
         extract_dir = temp_dir / "extracted"
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(extract_dir)
-
-        # Find the extracted directory (usually named {repo}-{branch})
-        extracted_contents = list(extract_dir.iterdir())
-        if not extracted_contents:
-            raise UpdateError("Empty update archive")
-
-        source_dir = extracted_contents[0]
-        if not source_dir.is_dir():
-            raise UpdateError("Invalid update archive structure")
+        loop = asyncio.get_event_loop()
+        source_dir = await loop.run_in_executor(
+            None, _sync_extract_update, zip_path, extract_dir
+        )
 
         # Step 5: Apply update (copy files, preserving user data)
         await _apply_update_files(source_dir, base_path)
@@ -259,6 +339,52 @@ async def download_and_apply_update(
                 pass
 
 
+def _sync_extract_update(zip_path: Path, extract_dir: Path) -> Path:
+    """
+    Extract the parts of an update archive that will be applied.
+
+    Members under preserved paths are never copied into the installation,
+    so they are skipped here instead of being inflated and thrown away.
+
+    Args:
+        zip_path: The downloaded branch archive.
+        extract_dir: Directory to extract into.
+
+    Returns:
+        The archive's top-level directory (usually named {repo}-{branch}).
+
+    Raises:
+        UpdateError: If the archive is empty or not laid out as expected.
+    """
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        entries = zip_ref.infolist()
+        if not entries:
+            raise UpdateError("Empty update archive")
+
+        root = entries[0].filename.split("/", 1)[0]
+        for entry in entries:
+            parts = entry.filename.split("/")
+            if parts[0] != root or ".." in parts or not root:
+                raise UpdateError("Invalid update archive structure")
+
+            if len(parts) > 1 and parts[1] in PRESERVE_PATHS:
+                continue
+
+            target = extract_dir.joinpath(*parts)
+            if entry.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with zip_ref.open(entry) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, EXTRACT_BUFFER_SIZE)
+
+    source_dir = extract_dir / root
+    if not source_dir.is_dir():
+        raise UpdateError("Invalid update archive structure")
+    return source_dir
+
+
 async def _apply_update_files(source_dir: Path, target_dir: Path) -> None:
     """
     Copy update files from source to target, preserving user data directories.
@@ -272,25 +398,60 @@ async def _apply_update_files(source_dir: Path, target_dir: Path) -> None:
     await loop.run_in_executor(None, _sync_apply_update_files, source_dir, target_dir)
 
 
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hard-link src to dst, copying it if a link cannot be made (e.g. dst exists)."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _copy_update_item(item: Path, target_item: Path, link: bool = False) -> None:
+    """
+    Replace one top-level file or directory with its updated version.
+
+    Args:
+        item: Path in the extracted update.
+        target_item: Corresponding path in the installation.
+        link: Hard-link files instead of copying them. Only useful when both
+              paths are on the same filesystem; the extracted update is
+              deleted afterwards, so the links become the only copy.
+    """
+    copy_function = _link_or_copy if link else shutil.copy2
+    if item.is_dir():
+        # Remove existing directory and copy new one
+        if target_item.exists():
+            shutil.rmtree(target_item)
+        shutil.copytree(item, target_item, copy_function=copy_function)
+    else:
+        # Copy file
+        copy_function(str(item), str(target_item))
+
+
 def _sync_apply_update_files(source_dir: Path, target_dir: Path) -> None:
     """
     Synchronous implementation of file update logic.
+
+    Top-level entries are independent of each other, so they are copied
+    in parallel; the work is syscall-bound and releases the GIL. When the
+    update was extracted on the installation's filesystem, files are
+    hard-linked rather than copied.
     """
-    for item in source_dir.iterdir():
-        target_item = target_dir / item.name
+    link = os.stat(source_dir).st_dev == os.stat(target_dir).st_dev
 
+    items = []
+    targets = []
+    for item in source_dir.iterdir():
         # Skip preserved paths
         if item.name in PRESERVE_PATHS:
             continue
+        items.append(item)
+        targets.append(target_dir / item.name)
 
-        if item.is_dir():
-            # Remove existing directory and copy new one
-            if target_item.exists():
-                shutil.rmtree(target_item)
-            shutil.copytree(item, target_item)
-        else:
-            # Copy file
-            shutil.copy2(item, target_item)
+    max_workers = min(COPY_WORKERS, len(items)) or 1
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Consume the results so the first copy error is raised here
+        list(pool.map(_copy_update_item, items, targets, [link] * len(items)))
 
 
 def get_cms_version() -> str:
@@ -298,7 +459,7 @@ def get_cms_version() -> str:
     return "0.1.0"
 
 
-def format_commit_date(iso_date: str) -> str:
+def format_commit_date(iso_date: str | None) -> str | None:
     """
     Format ISO date string to a more readable format.
 
@@ -308,6 +469,19 @@ def format_commit_date(iso_date: str) -> str:
     Returns:
         Formatted date string (e.g., "2026-01-05 10:30")
     """
+    if not isinstance(iso_date, str):
+        # e.g. the None commit_date check_for_updates reports on errors
+        return iso_date
+
+    # GitHub always sends "YYYY-MM-DDTHH:MM:SSZ": validate it and slice out
+    # the fields instead of parsing and reformatting
+    if len(iso_date) == 20 and iso_date[10] == "T" and iso_date[19] == "Z":
+        try:
+            datetime.fromisoformat(iso_date[:19])
+        except ValueError:
+            return iso_date
+        return f"{iso_date[:10]} {iso_date[11:16]}"
+
     try:
         dt = datetime.fromisoformat(iso_date.replace("Z", "+00:00"))
         return dt.strftime("%Y-%m-%d %H:%M")
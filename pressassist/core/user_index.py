@@ -0,0 +1,219 @@
+"""Secondary indices over the users table.
+
+Login, registration and password reset look users up by email or reset
+token. The indices map those values to usernames so a lookup is a dict
+get instead of a scan over every user. They are stored in the database
+under ``indices`` next to the data they describe:
+
+    "indices": {
+        "users_by_email": {"ali@example.com": "ali"},
+        "users_by_reset_token_hash": {"<sha256 of token>": "ali"}
+    }
+
+Reset tokens are keyed by their SHA-256 digest rather than the token
+itself, so the dict lookup compares fixed-length digests and the index
+holds no usable tokens.
+
+Writers keep them current by saving users through save_user() and
+delete_user(). The stored record is read before it is replaced to find
+the entries to drop, so writers should pass an edited copy rather than
+the live record from storage.get(); entries left behind by in-place
+edits are caught when a lookup checks them against the user record.
+Databases written before the indices existed (or restored from such a
+backup) get them rebuilt on first lookup.
+"""
+
+import hashlib
+import hmac
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .storage import Storage
+
+# Index name -> user field it is keyed by
+_INDEXED_FIELDS = {
+    "users_by_email": "email",
+    "users_by_reset_token_hash": "reset_token",
+}
+
+# Indices whose keys are hashed values
+_HASHED_INDICES = frozenset({"users_by_reset_token_hash"})
+
+# Earlier index layouts, dropped when the indices are rebuilt
+_RETIRED_INDICES = frozenset({"users_by_reset_token"})
+
+
+def _index_key(name: str, value: str) -> str:
+    """Get the key a field value is stored under in an index."""
+    if name in _HASHED_INDICES:
+        return hashlib.sha256(value.encode("utf-8")).hexdigest()
+    return value
+
+
+def _matches(name: str, stored: str | None, key: str) -> bool:
+    """Check a user's field value against an index key."""
+    if not stored:
+        return False
+    if name in _HASHED_INDICES:
+        return hmac.compare_digest(_index_key(name, stored), key)
+    return stored == key
+
+
+def _build_indices(users: dict) -> dict:
+    """Build all user indices from the users table.
+
+    Args:
+        users: Mapping of username to user data.
+
+    Returns:
+        Mapping of index name to {value: username}.
+    """
+    indices = {name: {} for name in _INDEXED_FIELDS}
+    for username, user_data in users.items():
+        for name, field in _INDEXED_FIELDS.items():
+            value = user_data.get(field)
+            if value:
+                indices[name][_index_key(name, value)] = username
+    return indices
+
+
+def rebuild_user_indices(storage: "Storage") -> dict:
+    """Rebuild and save all user indices.
+
+    Args:
+        storage: Storage instance.
+
+    Returns:
+        The rebuilt indices.
+    """
+    indices = _build_indices(storage.get("users", {}))
+    others = {
+        name: index
+        for name, index in storage.get("indices", {}).items()
+        if name not in _RETIRED_INDICES
+    }
+    storage.set("indices", {**others, **indices})
+    return indices
+
+
+def _lookup(storage: "Storage", name: str, value: str) -> tuple[str, dict] | tuple[None, None]:
+    """Find the user whose indexed field equals value.
+
+    A hit is checked against the user record; if they disagree the index
+    is rebuilt once and consulted again.
+    """
+    if not value:
+        return None, None
+
+    field = _INDEXED_FIELDS[name]
+    users = storage.get("users", {})
+    index = storage.get(f"indices.{name}")
+    if index is None:
+        index = rebuild_user_indices(storage)[name]
+
+    key = _index_key(name, value)
+    username = index.get(key)
+    if username is None:
+        return None, None
+
+    user_data = users.get(username)
+    if user_data is None or not _matches(name, user_data.get(field), key):
+        username = rebuild_user_indices(storage)[name].get(key)
+        user_data = users.get(username) if username is not None else None
+        if user_data is None:
+            return None, None
+
+    return username, user_data
+
+
+def find_user_by_email(storage: "Storage", email: str) -> tuple[str, dict] | tuple[None, None]:
+    """Find a user by (lower-cased) email address.
+
+    Args:
+        storage: Storage instance.
+        email: Normalized email address.
+
+    Returns:
+        Tuple of (username, user data), or (None, None) if not found.
+    """
+    return _lookup(storage, "users_by_email", email)
+
+
+def find_user_by_reset_token(storage: "Storage", token: str) -> tuple[str, dict] | tuple[None, None]:
+    """Find the user a password reset token was issued to.
+
+    Only the owner is located; the caller still has to check the token
+    and its expiry.
+
+    Args:
+        storage: Storage instance.
+        token: Reset token from the reset link.
+
+    Returns:
+        Tuple of (username, user data), or (None, None) if not found.
+    """
+    return _lookup(storage, "users_by_reset_token_hash", token)
+
+
+def _reindex(
+    storage: "Storage", username: str, previous: dict | None, user_data: dict | None
+) -> None:
+    """Move username's index entries from its previous values to its current ones.
+
+    Args:
+        storage: Storage instance.
+        username: Username (the users table key).
+        previous: User record before the change, or None for a new user.
+        user_data: User record after the change, or None if deleted.
+    """
+    indices = storage.get("indices")
+    if indices is None or any(name not in indices for name in _INDEXED_FIELDS):
+        # Rebuilt from the users table, which already holds the change
+        rebuild_user_indices(storage)
+        return
+
+    for name, field in _INDEXED_FIELDS.items():
+        index = indices[name]
+        old_value = previous.get(field) if previous else None
+        if old_value:
+            old_key = _index_key(name, old_value)
+            if index.get(old_key) == username:
+                del index[old_key]
+        value = user_data.get(field) if user_data else None
+        if value:
+            index[_index_key(name, value)] = username
+    storage.set("indices", indices)
+
+
+def save_user(storage: "Storage", username: str, user_data: dict) -> None:
+    """Save a user and update the indices in one write.
+
+    Args:
+        storage: Storage instance.
+        username: Username (the users table key).
+        user_data: Complete user record; an edited copy of the stored one.
+    """
+    with storage.batch():
+        previous = storage.get(f"users.{username}")
+        storage.set(f"users.{username}", user_data)
+        _reindex(storage, username, previous, user_data)
+
+
+def delete_user(storage: "Storage", username: str) -> bool:
+    """Delete a user and their index entries in one write.
+
+    Args:
+        storage: Storage instance.
+        username: Username to delete.
+
+    Returns:
+        True if the user existed.
+    """
+    with storage.batch():
+        users = storage.get("users", {})
+        if username not in users:
+            return False
+        previous = users.pop(username)
+        storage.set("users", users)
+        _reindex(storage, username, previous, None)
+    return True
@@ -3,26 +3,52 @@
 Handles public user login, registration, password reset, and logout.
 """
 
+import asyncio
+import re
 import secrets
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
+from urllib.parse import quote
 
-from fastapi import APIRouter, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, BackgroundTasks, Form, HTTPException, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 
-from ..core.i18n import i18n, t
+from ..core.email_service import EmailService
+from ..core.i18n import i18n, t_url
+from ..core.logging import auth_logger as logger
 from ..core.models import ProfileVisibility, Role
+from ..core.user_index import find_user_by_email, find_user_by_reset_token, save_user
 
 router = APIRouter(tags=["auth"])
 
+# Letters, digits and underscores, with at least one letter or digit
+_USERNAME_RE = re.compile(r"_*[^\W_]\w*")
+
+# Basic shape only; the address is confirmed by the mail it receives
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+_common_imports: dict = {}
+
 
 def _get_common_imports():
-    """Lazy import to avoid circular imports."""
-    from ..main import auth, storage
+    """Lazy import to avoid circular imports.
 
-    return {
-        "auth": auth,
-        "storage": storage,
-    }
+    The dict is built once and only rebuilt when the application lifespan
+    replaces the globals in main.
+    """
+    global _common_imports
+
+    from .. import main
+
+    common = _common_imports
+    if common.get("auth") is not main.auth or common.get("storage") is not main.storage:
+        common = _common_imports = {
+            "auth": main.auth,
+            "storage": main.storage,
+        }
+    return common
 
 
 def _should_use_secure_cookie(request: Request, force_https: bool) -> bool:
@@ -35,19 +61,91 @@ def _should_use_secure_cookie(request: Request, force_https: bool) -> bool:
     return request.url.scheme == "https"
 
 
+def _redirect(url: str) -> Response:
+    """Build a 303 redirect to an already URL-safe location.
+
+    RedirectResponse re-quotes its URL on every call; the locations built
+    here come from fixed paths and t_url(), so that work is skipped.
+    """
+    return Response(status_code=303, headers={"location": url})
+
+
 def _get_or_create_csrf_token(request: Request) -> tuple[str, bool]:
-    """Get CSRF token from cookie or create a new one."""
+    """Get CSRF token from cookie or create a new one.
+
+    A cookie too short to have come from token_urlsafe(32) is replaced
+    rather than reused.
+    """
     token = request.cookies.get("csrf_token")
-    if token:
+    if token and len(token) >= 32:
         return token, False
     return secrets.token_urlsafe(32), True
 
 
+# Seconds a force_https value read from storage is reused
+FORCE_HTTPS_TTL = 30.0
+
+# (storage, monotonic read time, value)
+_force_https_cache: tuple = (None, 0.0, True)
+
+
+def _get_force_https(storage) -> bool:
+    """Get config.force_https, re-reading storage at most every FORCE_HTTPS_TTL seconds."""
+    global _force_https_cache
+
+    if storage is None:
+        return True
+
+    cached_storage, read_at, value = _force_https_cache
+    now = time.monotonic()
+    if cached_storage is not storage or now - read_at > FORCE_HTTPS_TTL:
+        value = storage.get("config.force_https", True)
+        _force_https_cache = (storage, now, value)
+    return value
+
+
+def clear_force_https_cache() -> None:
+    """Forget the cached force_https value after the setting changes."""
+    global _force_https_cache
+
+    _force_https_cache = (None, 0.0, True)
+
+
+# (storage, service)
+_email_service: tuple = (None, None)
+
+
+def _get_email_service(storage) -> EmailService:
+    """Get the shared EmailService, recreated only when storage is replaced.
+
+    The service keeps no SMTP state of its own; it reads the settings from
+    storage on each use, so changes in the admin panel apply immediately.
+    """
+    global _email_service
+
+    cached_storage, service = _email_service
+    if service is None or cached_storage is not storage:
+        service = EmailService(storage)
+        _email_service = (storage, service)
+    return service
+
+
+async def _send_email_in_background(send, *args) -> None:
+    """Run a blocking EmailService send in a worker thread.
+
+    Scheduled as a background task, so it runs after the response has
+    been sent; failures are logged since there is no one left to tell.
+    """
+    try:
+        await asyncio.to_thread(send, *args)
+    except Exception as e:
+        logger.warning(f"Could not send email: {e}")
+
+
 def _set_csrf_cookie(request: Request, response: HTMLResponse, token: str) -> None:
     """Set CSRF cookie with environment-appropriate settings."""
     imports = _get_common_imports()
-    storage = imports["storage"]
-    force_https = storage.get("config.force_https", True) if storage else True
+    force_https = _get_force_https(imports["storage"])
 
     response.set_cookie(
         key="csrf_token",
@@ -60,10 +158,31 @@ def _set_csrf_cookie(request: Request, response: HTMLResponse, token: str) -> No
     )
 
 
-def get_auth_page_styles() -> str:
-    """Get styles for auth pages."""
-    return '''
+# Shared stylesheet for all auth pages
+_AUTH_PAGE_STYLES = '''
     <style>
+        /* Vazirmatn is served locally, same files as the admin panel */
+        @font-face {
+            font-family: 'Vazirmatn';
+            src: url('/admin/static/fonts/vazirmatn/Vazirmatn-Regular.ttf') format('truetype');
+            font-weight: 400;
+            font-style: normal;
+            font-display: swap;
+        }
+        @font-face {
+            font-family: 'Vazirmatn';
+            src: url('/admin/static/fonts/vazirmatn/Vazirmatn-Medium.ttf') format('truetype');
+            font-weight: 500;
+            font-style: normal;
+            font-display: swap;
+        }
+        @font-face {
+            font-family: 'Vazirmatn';
+            src: url('/admin/static/fonts/vazirmatn/Vazirmatn-Bold.ttf') format('truetype');
+            font-weight: 700;
+            font-style: normal;
+            font-display: swap;
+        }
         * { box-sizing: border-box; }
         body {
             font-family: 'Vazirmatn', Tahoma, Arial, sans-serif;
@@ -178,32 +297,34 @@ def get_auth_page_styles() -> str:
     '''
 
 
-# ============================================================================
-# Login
-# ============================================================================
+def get_auth_page_styles() -> str:
+    """Get styles for auth pages."""
+    return _AUTH_PAGE_STYLES
 
-@router.get("/login", response_class=HTMLResponse)
-async def login_page(request: Request, error: str | None = None, success: str | None = None):
-    """Render public login page."""
-    # Note: maintenance_mode and require_login are handled by AccessMiddleware
-    # /login is always allowed to enable users to log in
 
-    imports = _get_common_imports()
-    storage = imports["storage"]
+# Marks where per-request values go in the cached auth page parts
+_SLOT = "\x00"
 
-    site_title = storage.get("config.site_title", "Website")
-    # Use language from middleware (respects user's cookie/query param)
-    site_lang = getattr(request.state, "language", storage.get("config.site_lang", "en"))
-    direction = getattr(request.state, "lang_direction", "rtl" if site_lang == "fa" else "ltr")
 
-    # Set i18n language for translations
-    i18n.set_language(site_lang)
+def _fill_slots(parts: tuple[bytes, ...], *values: str) -> bytes:
+    """Join cached, pre-encoded page parts with the per-request values between them."""
+    out = [parts[0]]
+    for value, part in zip(values, parts[1:]):
+        out.append(value.encode("utf-8"))
+        out.append(part)
+    return b"".join(out)
 
-    # Generate CSRF token (reuse existing if present)
-    csrf_token, needs_cookie = _get_or_create_csrf_token(request)
 
-    error_html = f'<div class="error-message">{error}</div>' if error else ""
-    success_html = f'<div class="success-message">{success}</div>' if success else ""
+# ============================================================================
+# Login
+# ============================================================================
+
+@lru_cache(maxsize=64)
+def _login_page_parts(site_lang: str, direction: str, site_title: str) -> tuple[bytes, ...]:
+    """Build the static parts of the login page, split where per-request values go."""
+    # Translate in the page's language without touching the global one
+    t = i18n.translator(site_lang)
+    site_title = site_title.replace(_SLOT, "")
 
     html = f'''
     <!DOCTYPE html>
@@ -212,9 +333,7 @@ async def login_page(request: Request, error: str | None = None, success: str |
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1">
         <title>{t('auth.login')} - {site_title}</title>
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link href="https://fonts.googleapis.com/css2?family=Vazirmatn:wght@400;500;700&display=swap" rel="stylesheet">
-        {get_auth_page_styles()}
+        {_AUTH_PAGE_STYLES}
     </head>
     <body>
         <div class="auth-container">
@@ -223,11 +342,11 @@ async def login_page(request: Request, error: str | None = None, success: str |
                 <p>{t('auth.login_subtitle')}</p>
             </div>
 
-            {error_html}
-            {success_html}
+            {_SLOT}
+            {_SLOT}
 
             <form method="POST" action="/login">
-                <input type="hidden" name="csrf_token" value="{csrf_token}">
+                <input type="hidden" name="csrf_token" value="{_SLOT}">
 
                 <div class="form-group">
                     <label for="username">{t('auth.username_or_email')}</label>
@@ -251,6 +370,33 @@ async def login_page(request: Request, error: str | None = None, success: str |
     </body>
     </html>
     '''
+    return tuple(part.encode("utf-8") for part in html.split(_SLOT))
+
+
+@router.get("/login", response_class=HTMLResponse)
+async def login_page(request: Request, error: str | None = None, success: str | None = None):
+    """Render public login page."""
+    # Note: maintenance_mode and require_login are handled by AccessMiddleware
+    # /login is always allowed to enable users to log in
+
+    imports = _get_common_imports()
+    storage = imports["storage"]
+
+    site_title = storage.get("config.site_title", "Website")
+    # Use language from middleware (respects user's cookie/query param)
+    site_lang = getattr(request.state, "language", storage.get("config.site_lang", "en"))
+    direction = getattr(request.state, "lang_direction", "rtl" if site_lang == "fa" else "ltr")
+
+    # Generate CSRF token (reuse existing if present)
+    csrf_token, needs_cookie = _get_or_create_csrf_token(request)
+
+    error_html = f'<div class="error-message">{error}</div>' if error else ""
+    success_html = f'<div class="success-message">{success}</div>' if success else ""
+
+    html = _fill_slots(
+        _login_page_parts(site_lang, direction, site_title),
+        error_html, success_html, csrf_token,
+    )
 
     response = HTMLResponse(content=html)
     if needs_cookie:
@@ -269,11 +415,12 @@ async def login_submit(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    site_lang = getattr(request.state, "language", "en")
 
     # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
     if not csrf_token or not secrets.compare_digest(csrf_token, csrf_cookie):
-        return RedirectResponse(url="/login?error=Invalid+request", status_code=303)
+        return _redirect("/login?error=Invalid+request")
 
     # Get client info
     client_ip = request.client.host if request.client else "unknown"
@@ -281,45 +428,29 @@ async def login_submit(
 
     # Check rate limit
     if not auth.check_rate_limit(client_ip):
-        return RedirectResponse(
-            url="/login?error=" + t("auth.rate_limit_exceeded").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect("/login?error=" + t_url("auth.rate_limit_exceeded", site_lang))
 
-    # Find user by username or email
+    # Find user by username, then by email; usernames never contain "@"
     username_lower = username.lower().strip()
-    users = storage.get("users", {})
-    user_data = None
-    found_username = None
-
-    for uname, data in users.items():
-        if uname == username_lower or data.get("email") == username_lower:
-            user_data = data
-            found_username = uname
-            break
+    found_username = username_lower
+    user_data = storage.get("users", {}).get(username_lower)
+    if user_data is None and "@" in username_lower:
+        found_username, user_data = find_user_by_email(storage, username_lower)
 
     if not user_data:
         auth.record_login_attempt(client_ip, False, user_agent)
-        return RedirectResponse(
-            url="/login?error=" + t("auth.invalid_credentials").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect("/login?error=" + t_url("auth.invalid_credentials", site_lang))
 
     # Check if account is active
     if not user_data.get("is_active", True):
         auth.record_login_attempt(client_ip, False, user_agent)
-        return RedirectResponse(
-            url="/login?error=" + t("auth.account_disabled").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect("/login?error=" + t_url("auth.account_disabled", site_lang))
 
     # Verify password
-    if not auth.verify_password(password, user_data.get("password_hash", "")):
+    # bcrypt is slow by design; keep it off the event loop
+    if not await asyncio.to_thread(auth.verify_password, password, user_data.get("password_hash", "")):
         auth.record_login_attempt(client_ip, False, user_agent)
-        return RedirectResponse(
-            url="/login?error=" + t("auth.invalid_credentials").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect("/login?error=" + t_url("auth.invalid_credentials", site_lang))
 
     # Successful login
     auth.record_login_attempt(client_ip, True, user_agent)
@@ -334,8 +465,7 @@ async def login_submit(
     session = auth.create_session(found_username, role, client_ip, user_agent)
 
     # Update last login
-    user_data["last_login"] = datetime.now(timezone.utc).isoformat()
-    storage.set(f"users.{found_username}", user_data)
+    storage.update(f"users.{found_username}", {"last_login": datetime.now(timezone.utc).isoformat()})
 
     # Determine redirect based on role
     if role in (Role.SUPER_ADMIN, Role.ADMIN, Role.EDITOR):
@@ -378,26 +508,12 @@ async def logout(request: Request):
 # Registration
 # ============================================================================
 
-@router.get("/register", response_class=HTMLResponse)
-async def register_page(request: Request, error: str | None = None):
-    """Render registration page."""
-    imports = _get_common_imports()
-    storage = imports["storage"]
-
-    # Check if registration is enabled
-    if not storage.get("config.enable_registration", True):
-        raise HTTPException(status_code=403, detail=t("auth.registration_disabled"))
-
-    site_title = storage.get("config.site_title", "Website")
-    # Use language from middleware (respects user's cookie/query param)
-    site_lang = getattr(request.state, "language", storage.get("config.site_lang", "en"))
-    direction = getattr(request.state, "lang_direction", "rtl" if site_lang == "fa" else "ltr")
-
-    # Set i18n language for translations
-    i18n.set_language(site_lang)
-
-    csrf_token, needs_cookie = _get_or_create_csrf_token(request)
-    error_html = f'<div class="error-message">{error}</div>' if error else ""
+@lru_cache(maxsize=64)
+def _register_page_parts(site_lang: str, direction: str, site_title: str) -> tuple[bytes, ...]:
+    """Build the static parts of the registration page, split where per-request values go."""
+    # Translate in the page's language without touching the global one
+    t = i18n.translator(site_lang)
+    site_title = site_title.replace(_SLOT, "")
 
     html = f'''
     <!DOCTYPE html>
@@ -406,9 +522,7 @@ async def register_page(request: Request, error: str | None = None):
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1">
         <title>{t('auth.register')} - {site_title}</title>
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link href="https://fonts.googleapis.com/css2?family=Vazirmatn:wght@400;500;700&display=swap" rel="stylesheet">
-        {get_auth_page_styles()}
+        {_AUTH_PAGE_STYLES}
     </head>
     <body>
         <div class="auth-container">
@@ -417,10 +531,10 @@ async def register_page(request: Request, error: str | None = None):
                 <p>{t('auth.register_subtitle')}</p>
             </div>
 
-            {error_html}
+            {_SLOT}
 
             <form method="POST" action="/register">
-                <input type="hidden" name="csrf_token" value="{csrf_token}">
+                <input type="hidden" name="csrf_token" value="{_SLOT}">
 
                 <div class="form-group">
                     <label for="username">{t('auth.username')} *</label>
@@ -460,6 +574,31 @@ async def register_page(request: Request, error: str | None = None):
     </body>
     </html>
     '''
+    return tuple(part.encode("utf-8") for part in html.split(_SLOT))
+
+
+@router.get("/register", response_class=HTMLResponse)
+async def register_page(request: Request, error: str | None = None):
+    """Render registration page."""
+    imports = _get_common_imports()
+    storage = imports["storage"]
+
+    site_title = storage.get("config.site_title", "Website")
+    # Use language from middleware (respects user's cookie/query param)
+    site_lang = getattr(request.state, "language", storage.get("config.site_lang", "en"))
+
+    # Check if registration is enabled
+    if not storage.get("config.enable_registration", True):
+        raise HTTPException(status_code=403, detail=i18n.translator(site_lang)("auth.registration_disabled"))
+    direction = getattr(request.state, "lang_direction", "rtl" if site_lang == "fa" else "ltr")
+
+    csrf_token, needs_cookie = _get_or_create_csrf_token(request)
+    error_html = f'<div class="error-message">{error}</div>' if error else ""
+
+    html = _fill_slots(
+        _register_page_parts(site_lang, direction, site_title),
+        error_html, csrf_token,
+    )
 
     response = HTMLResponse(content=html)
     if needs_cookie:
@@ -470,6 +609,7 @@ async def register_page(request: Request, error: str | None = None):
 @router.post("/register")
 async def register_submit(
     request: Request,
+    background_tasks: BackgroundTasks,
     username: str = Form(...),
     email: str = Form(...),
     display_name: str = Form(None),
@@ -481,74 +621,58 @@ async def register_submit(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    site_lang = getattr(request.state, "language", "en")
 
     # Check if registration is enabled
     if not storage.get("config.enable_registration", True):
-        raise HTTPException(status_code=403, detail=t("auth.registration_disabled"))
+        raise HTTPException(status_code=403, detail=i18n.translator(site_lang)("auth.registration_disabled"))
 
-    # Verify CSRF - debug info
+    # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
-    print(f"DEBUG CSRF - Form token: {csrf_token[:20] if csrf_token else 'None'}...")
-    print(f"DEBUG CSRF - Cookie token: {csrf_cookie[:20] if csrf_cookie else 'None'}...")
-    print(f"DEBUG CSRF - All cookies: {list(request.cookies.keys())}")
-
     if not csrf_token or not csrf_cookie or not secrets.compare_digest(csrf_token, csrf_cookie):
-        # Set i18n language for error message
-        site_lang = getattr(request.state, "language", "en")
-        i18n.set_language(site_lang)
-        return RedirectResponse(url="/register?error=" + t("errors.csrf_invalid").replace(" ", "+"), status_code=303)
+        logger.debug(
+            "Registration CSRF check failed (form token: %s, cookie token: %s)",
+            bool(csrf_token),
+            bool(csrf_cookie),
+        )
+        return _redirect("/register?error=" + t_url("errors.csrf_invalid", site_lang))
 
     # Rate limiting
     client_ip = request.client.host if request.client else "unknown"
     if not auth.check_rate_limit(client_ip):
-        return RedirectResponse(
-            url="/register?error=" + t("auth.rate_limit_exceeded").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect("/register?error=" + t_url("auth.rate_limit_exceeded", site_lang))
 
     # Validate passwords match
     if password != password_confirm:
-        return RedirectResponse(
-            url="/register?error=" + t("auth.passwords_mismatch").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect("/register?error=" + t_url("auth.passwords_mismatch", site_lang))
 
     # Validate password length
     if len(password) < 12:
-        return RedirectResponse(
-            url="/register?error=" + t("auth.password_too_short").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect("/register?error=" + t_url("auth.password_too_short", site_lang))
 
-    # Validate username format
+    # Validate username and email format before touching storage
     username_lower = username.lower().strip()
-    if not username_lower.replace("_", "").isalnum():
-        return RedirectResponse(
-            url="/register?error=" + t("auth.invalid_username").replace(" ", "+"),
-            status_code=303
-        )
+    if not _USERNAME_RE.fullmatch(username_lower):
+        return _redirect("/register?error=" + t_url("auth.invalid_username", site_lang))
+
+    email_lower = email.lower().strip()
+    if not _EMAIL_RE.fullmatch(email_lower):
+        return _redirect("/register?error=" + t_url("auth.invalid_email", site_lang))
 
     # Check if username exists
-    users = storage.get("users", {})
-    if username_lower in users:
-        return RedirectResponse(
-            url="/register?error=" + t("auth.username_exists").replace(" ", "+"),
-            status_code=303
-        )
+    # Safe as a path: the username was checked to be alphanumeric above
+    if storage.has(f"users.{username_lower}"):
+        return _redirect("/register?error=" + t_url("auth.username_exists", site_lang))
 
     # Check if email exists
-    email_lower = email.lower().strip()
-    for user_data in users.values():
-        if user_data.get("email") == email_lower:
-            return RedirectResponse(
-                url="/register?error=" + t("auth.email_exists").replace(" ", "+"),
-                status_code=303
-            )
+    if find_user_by_email(storage, email_lower)[0] is not None:
+        return _redirect("/register?error=" + t_url("auth.email_exists", site_lang))
 
-    # Create user
+    # Create user (hashing runs in a thread so it doesn't block the event loop)
+    password_hash = await asyncio.to_thread(auth.hash_password, password)
     user_data = {
         "username": username_lower,
-        "password_hash": auth.hash_password(password),
+        "password_hash": password_hash,
         "role": Role.USER.value,
         "email": email_lower,
         "display_name": display_name.strip() if display_name else None,
@@ -564,19 +688,21 @@ async def register_submit(
         "profile_visibility": ProfileVisibility.PUBLIC.value,
         "reset_token": None,
         "reset_token_expires": None,
+        "reset_token_expires_ts": None,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "last_login": None,
     }
 
-    storage.set(f"users.{username_lower}", user_data)
+    save_user(storage, username_lower, user_data)
 
     # Try to send welcome email
     try:
-        from ..core.email_service import EmailService
-        email_service = EmailService(storage)
+        email_service = _get_email_service(storage)
         if email_service.is_configured():
             site_title = storage.get("config.site_title", "Website")
-            email_service.send_welcome_email(
+            background_tasks.add_task(
+                _send_email_in_background,
+                email_service.send_welcome_email,
                 email_lower,
                 username_lower,
                 site_title,
@@ -585,33 +711,19 @@ async def register_submit(
     except Exception:
         pass  # Email is optional
 
-    return RedirectResponse(
-        url="/login?success=" + t("auth.registration_success").replace(" ", "+"),
-        status_code=303
-    )
+    return _redirect("/login?success=" + t_url("auth.registration_success", site_lang))
 
 
 # ============================================================================
 # Password Reset
 # ============================================================================
 
-@router.get("/forgot-password", response_class=HTMLResponse)
-async def forgot_password_page(request: Request, error: str | None = None, success: str | None = None):
-    """Render forgot password page."""
-    imports = _get_common_imports()
-    storage = imports["storage"]
-
-    site_title = storage.get("config.site_title", "Website")
-    # Use language from middleware (respects user's cookie/query param)
-    site_lang = getattr(request.state, "language", storage.get("config.site_lang", "en"))
-    direction = getattr(request.state, "lang_direction", "rtl" if site_lang == "fa" else "ltr")
-
-    # Set i18n language for translations
-    i18n.set_language(site_lang)
-
-    csrf_token, needs_cookie = _get_or_create_csrf_token(request)
-    error_html = f'<div class="error-message">{error}</div>' if error else ""
-    success_html = f'<div class="success-message">{success}</div>' if success else ""
+@lru_cache(maxsize=64)
+def _forgot_password_page_parts(site_lang: str, direction: str, site_title: str) -> tuple[bytes, ...]:
+    """Build the static parts of the forgot password page, split where per-request values go."""
+    # Translate in the page's language without touching the global one
+    t = i18n.translator(site_lang)
+    site_title = site_title.replace(_SLOT, "")
 
     html = f'''
     <!DOCTYPE html>
@@ -620,9 +732,7 @@ async def forgot_password_page(request: Request, error: str | None = None, succe
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1">
         <title>{t('auth.forgot_password')} - {site_title}</title>
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link href="https://fonts.googleapis.com/css2?family=Vazirmatn:wght@400;500;700&display=swap" rel="stylesheet">
-        {get_auth_page_styles()}
+        {_AUTH_PAGE_STYLES}
     </head>
     <body>
         <div class="auth-container">
@@ -631,11 +741,11 @@ async def forgot_password_page(request: Request, error: str | None = None, succe
                 <p>{t('auth.forgot_password_subtitle')}</p>
             </div>
 
-            {error_html}
-            {success_html}
+            {_SLOT}
+            {_SLOT}
 
             <form method="POST" action="/forgot-password">
-                <input type="hidden" name="csrf_token" value="{csrf_token}">
+                <input type="hidden" name="csrf_token" value="{_SLOT}">
 
                 <div class="form-group">
                     <label for="email">{t('auth.email')}</label>
@@ -652,6 +762,28 @@ async def forgot_password_page(request: Request, error: str | None = None, succe
     </body>
     </html>
     '''
+    return tuple(part.encode("utf-8") for part in html.split(_SLOT))
+
+
+@router.get("/forgot-password", response_class=HTMLResponse)
+async def forgot_password_page(request: Request, error: str | None = None, success: str | None = None):
+    """Render forgot password page."""
+    imports = _get_common_imports()
+    storage = imports["storage"]
+
+    site_title = storage.get("config.site_title", "Website")
+    # Use language from middleware (respects user's cookie/query param)
+    site_lang = getattr(request.state, "language", storage.get("config.site_lang", "en"))
+    direction = getattr(request.state, "lang_direction", "rtl" if site_lang == "fa" else "ltr")
+
+    csrf_token, needs_cookie = _get_or_create_csrf_token(request)
+    error_html = f'<div class="error-message">{error}</div>' if error else ""
+    success_html = f'<div class="success-message">{success}</div>' if success else ""
+
+    html = _fill_slots(
+        _forgot_password_page_parts(site_lang, direction, site_title),
+        error_html, success_html, csrf_token,
+    )
 
     response = HTMLResponse(content=html)
     if needs_cookie:
@@ -662,6 +794,7 @@ async def forgot_password_page(request: Request, error: str | None = None, succe
 @router.post("/forgot-password")
 async def forgot_password_submit(
     request: Request,
+    background_tasks: BackgroundTasks,
     email: str = Form(...),
     csrf_token: str = Form(...),
 ):
@@ -669,51 +802,43 @@ async def forgot_password_submit(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    site_lang = getattr(request.state, "language", "en")
 
     # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
     if not csrf_token or not secrets.compare_digest(csrf_token, csrf_cookie):
-        return RedirectResponse(url="/forgot-password?error=Invalid+request", status_code=303)
+        return _redirect("/forgot-password?error=Invalid+request")
 
     # Rate limiting
     client_ip = request.client.host if request.client else "unknown"
     if not auth.check_rate_limit(client_ip):
-        return RedirectResponse(
-            url="/forgot-password?error=" + t("auth.rate_limit_exceeded").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect("/forgot-password?error=" + t_url("auth.rate_limit_exceeded", site_lang))
 
     # Find user by email
     email_lower = email.lower().strip()
-    users = storage.get("users", {})
-    found_username = None
-    user_data = None
-
-    for uname, data in users.items():
-        if data.get("email") == email_lower:
-            found_username = uname
-            user_data = data
-            break
+    found_username, user_data = find_user_by_email(storage, email_lower)
 
     # Always show success (don't reveal if email exists)
     if user_data and found_username:
         # Generate reset token
         reset_token, expires_at = auth.generate_reset_token()
 
-        # Save token to user
+        # Save token to a copy of the user, so save_user can drop the old one
+        user_data = dict(user_data)
         user_data["reset_token"] = reset_token
         user_data["reset_token_expires"] = expires_at.isoformat()
-        storage.set(f"users.{found_username}", user_data)
+        user_data["reset_token_expires_ts"] = int(expires_at.timestamp())
+        save_user(storage, found_username, user_data)
 
         # Try to send email
         try:
-            from ..core.email_service import EmailService
-            email_service = EmailService(storage)
-
+            email_service = _get_email_service(storage)
             if email_service.is_configured():
                 site_title = storage.get("config.site_title", "Website")
                 reset_url = f"{request.url.scheme}://{request.url.netloc}/reset-password/{reset_token}"
-                email_service.send_password_reset_email(
+                background_tasks.add_task(
+                    _send_email_in_background,
+                    email_service.send_password_reset_email,
                     email_lower,
                     found_username,
                     reset_url,
@@ -726,52 +851,54 @@ async def forgot_password_submit(
         except Exception:
             pass
 
-    return RedirectResponse(
-        url="/forgot-password?success=" + t("auth.reset_email_sent").replace(" ", "+"),
-        status_code=303
-    )
-
+    return _redirect("/forgot-password?success=" + t_url("auth.reset_email_sent", site_lang))
 
-@router.get("/reset-password/{token}", response_class=HTMLResponse)
-async def reset_password_page(request: Request, token: str, error: str | None = None):
-    """Render reset password page."""
-    imports = _get_common_imports()
-    storage = imports["storage"]
-    auth = imports["auth"]
 
-    site_title = storage.get("config.site_title", "Website")
-    # Use language from middleware (respects user's cookie/query param)
-    site_lang = getattr(request.state, "language", storage.get("config.site_lang", "en"))
-    direction = getattr(request.state, "lang_direction", "rtl" if site_lang == "fa" else "ltr")
+def _find_reset_token_user(storage, auth, token: str) -> tuple[str, dict] | tuple[None, None]:
+    """Find the user a valid, unexpired reset token belongs to.
 
-    # Set i18n language for translations
-    i18n.set_language(site_lang)
+    The token index narrows the search to one candidate, so the token is
+    compared (in constant time) and its expiry checked exactly once. The
+    expiry is an epoch-seconds integer; tokens issued before that field
+    existed fall back to parsing the ISO timestamp.
 
-    # Find user with this token
-    users = storage.get("users", {})
-    valid_token = False
+    Returns:
+        Tuple of (username, user data), or (None, None) if the token is
+        unknown, mismatched or expired.
+    """
+    username, user_data = find_user_by_reset_token(storage, token)
+    if not user_data:
+        return None, None
 
-    for user_data in users.values():
+    expires_ts = user_data.get("reset_token_expires_ts")
+    if expires_ts is not None:
         stored_token = user_data.get("reset_token")
-        stored_expires = user_data.get("reset_token_expires")
-
-        if stored_token and stored_expires:
-            try:
-                expires_dt = datetime.fromisoformat(stored_expires)
-                if auth.verify_reset_token(stored_token, expires_dt, token):
-                    valid_token = True
-                    break
-            except (ValueError, TypeError):
-                continue
-
-    if not valid_token:
-        return RedirectResponse(
-            url="/forgot-password?error=" + t("auth.invalid_reset_token").replace(" ", "+"),
-            status_code=303
-        )
+        if not stored_token or time.time() >= expires_ts:
+            return None, None
+        if not secrets.compare_digest(stored_token, token):
+            return None, None
+        return username, user_data
 
-    csrf_token, needs_cookie = _get_or_create_csrf_token(request)
-    error_html = f'<div class="error-message">{error}</div>' if error else ""
+    stored_expires = user_data.get("reset_token_expires")
+    if not stored_expires:
+        return None, None
+
+    try:
+        expires_dt = datetime.fromisoformat(stored_expires)
+    except (ValueError, TypeError):
+        return None, None
+
+    if not auth.verify_reset_token(user_data.get("reset_token"), expires_dt, token):
+        return None, None
+    return username, user_data
+
+
+@lru_cache(maxsize=64)
+def _reset_password_page_parts(site_lang: str, direction: str, site_title: str) -> tuple[bytes, ...]:
+    """Build the static parts of the reset password page, split where per-request values go."""
+    # Translate in the page's language without touching the global one
+    t = i18n.translator(site_lang)
+    site_title = site_title.replace(_SLOT, "")
 
     html = f'''
     <!DOCTYPE html>
@@ -780,9 +907,7 @@ async def reset_password_page(request: Request, token: str, error: str | None =
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1">
         <title>{t('auth.reset_password')} - {site_title}</title>
-        <link rel="preconnect" href="https://fonts.googleapis.com">
-        <link href="https://fonts.googleapis.com/css2?family=Vazirmatn:wght@400;500;700&display=swap" rel="stylesheet">
-        {get_auth_page_styles()}
+        {_AUTH_PAGE_STYLES}
     </head>
     <body>
         <div class="auth-container">
@@ -791,10 +916,10 @@ async def reset_password_page(request: Request, token: str, error: str | None =
                 <p>{t('auth.reset_password_subtitle')}</p>
             </div>
 
-            {error_html}
+            {_SLOT}
 
-            <form method="POST" action="/reset-password/{token}">
-                <input type="hidden" name="csrf_token" value="{csrf_token}">
+            <form method="POST" action="/reset-password/{_SLOT}">
+                <input type="hidden" name="csrf_token" value="{_SLOT}">
 
                 <div class="form-group">
                     <label for="password">{t('auth.new_password')}</label>
@@ -813,6 +938,34 @@ async def reset_password_page(request: Request, token: str, error: str | None =
     </body>
     </html>
     '''
+    return tuple(part.encode("utf-8") for part in html.split(_SLOT))
+
+
+@router.get("/reset-password/{token}", response_class=HTMLResponse)
+async def reset_password_page(request: Request, token: str, error: str | None = None):
+    """Render reset password page."""
+    imports = _get_common_imports()
+    storage = imports["storage"]
+    auth = imports["auth"]
+
+    site_title = storage.get("config.site_title", "Website")
+    # Use language from middleware (respects user's cookie/query param)
+    site_lang = getattr(request.state, "language", storage.get("config.site_lang", "en"))
+    direction = getattr(request.state, "lang_direction", "rtl" if site_lang == "fa" else "ltr")
+
+    # Find user with this token
+    found_username, _ = _find_reset_token_user(storage, auth, token)
+
+    if not found_username:
+        return _redirect("/forgot-password?error=" + t_url("auth.invalid_reset_token", site_lang))
+
+    csrf_token, needs_cookie = _get_or_create_csrf_token(request)
+    error_html = f'<div class="error-message">{error}</div>' if error else ""
+
+    html = _fill_slots(
+        _reset_password_page_parts(site_lang, direction, site_title),
+        error_html, token, csrf_token,
+    )
 
     response = HTMLResponse(content=html)
     if needs_cookie:
@@ -832,60 +985,37 @@ async def reset_password_submit(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    site_lang = getattr(request.state, "language", "en")
+    # The token comes from the request path, so it is quoted for the redirects
+    form_url = f"/reset-password/{quote(token, safe='')}"
 
     # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
     if not csrf_token or not secrets.compare_digest(csrf_token, csrf_cookie):
-        return RedirectResponse(url=f"/reset-password/{token}?error=Invalid+request", status_code=303)
+        return _redirect(form_url + "?error=Invalid+request")
 
     # Validate passwords
     if password != password_confirm:
-        return RedirectResponse(
-            url=f"/reset-password/{token}?error=" + t("auth.passwords_mismatch").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect(form_url + "?error=" + t_url("auth.passwords_mismatch", site_lang))
 
     if len(password) < 12:
-        return RedirectResponse(
-            url=f"/reset-password/{token}?error=" + t("auth.password_too_short").replace(" ", "+"),
-            status_code=303
-        )
+        return _redirect(form_url + "?error=" + t_url("auth.password_too_short", site_lang))
 
     # Find user with this token
-    users = storage.get("users", {})
-    found_username = None
-    user_data = None
-
-    for uname, data in users.items():
-        stored_token = data.get("reset_token")
-        stored_expires = data.get("reset_token_expires")
-
-        if stored_token and stored_expires:
-            try:
-                expires_dt = datetime.fromisoformat(stored_expires)
-                if auth.verify_reset_token(stored_token, expires_dt, token):
-                    found_username = uname
-                    user_data = data
-                    break
-            except (ValueError, TypeError):
-                continue
-
-    if not user_data or not found_username:
-        return RedirectResponse(
-            url="/forgot-password?error=" + t("auth.invalid_reset_token").replace(" ", "+"),
-            status_code=303
-        )
+    found_username, user_data = _find_reset_token_user(storage, auth, token)
+
+    if not found_username:
+        return _redirect("/forgot-password?error=" + t_url("auth.invalid_reset_token", site_lang))
 
-    # Update password
-    user_data["password_hash"] = auth.hash_password(password)
+    # Update password, on a copy so save_user can drop the token's index entry
+    user_data = dict(user_data)
+    user_data["password_hash"] = await asyncio.to_thread(auth.hash_password, password)
     user_data["reset_token"] = None
     user_data["reset_token_expires"] = None
-    storage.set(f"users.{found_username}", user_data)
+    user_data["reset_token_expires_ts"] = None
+    save_user(storage, found_username, user_data)
 
     # Invalidate all sessions
     auth.invalidate_user_sessions(found_username)
 
-    return RedirectResponse(
-        url="/login?success=" + t("auth.password_reset_success").replace(" ", "+"),
-        status_code=303
-    )
+    return _redirect("/login?success=" + t_url("auth.password_reset_success", site_lang))
@@ -1,12 +1,17 @@
 """Blog frontend routes for ChelCheleh."""
 
+import re
 import secrets
+import time
 import uuid
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 
+from ..core.blog_models import lowercase_tags, published_timestamp
 from ..core.csrf import get_csrf_token
 from ..core.i18n import t
 from ..core.language_middleware import (
@@ -19,9 +24,49 @@ from ..core.themes import jalali_date
 blog_frontend_router = APIRouter(prefix="/blog", tags=["blog"])
 
 
+# (storage, storage generation, CMSContext site settings)
+_site_settings: tuple = (None, -1, None)
+
+
+def _get_site_settings(storage) -> dict:
+    """Get the CMSContext fields taken from site config.
+
+    Read once per database version instead of key by key on every request.
+
+    Returns:
+        Keyword arguments for CMSContext.
+    """
+    global _site_settings
+
+    config = storage.get("config", {})
+    cached_storage, generation, settings = _site_settings
+    if settings is None or cached_storage is not storage or generation != storage.generation:
+        theme = config.get("theme", "default")
+        settings = {
+            "site_title": config.get("site_title", "My Website"),
+            "site_lang": config.get("site_lang", "en"),
+            "theme": theme,
+            "page_template": config.get("default_template", "default"),
+            "_asset_prefix": f"/themes/{theme.lower()}/static",
+        }
+        _site_settings = (storage, storage.generation, settings)
+    return settings
+
+
+# Most distinct (language, logged in) menus kept per database version
+MENU_CACHE_SIZE = 32
+
+# (storage, storage generation, {(current_lang, logged_in): menu})
+_menu_cache: tuple = (None, -1, {})
+
+
 def get_filtered_menu(storage, current_lang: str, session) -> list:
     """Get menu items filtered by visibility and language.
 
+    The result only depends on the menu, the linked pages, the language
+    and whether someone is logged in, so it is cached per database
+    version.
+
     Args:
         storage: Storage instance.
         current_lang: Current language code.
@@ -30,7 +75,25 @@ def get_filtered_menu(storage, current_lang: str, session) -> list:
     Returns:
         List of visible menu items for the current language.
     """
+    global _menu_cache
+
     menu_items = storage.get("menu_items", [])
+    cached_storage, generation, menus = _menu_cache
+    if cached_storage is not storage or generation != storage.generation:
+        menus = {}
+        _menu_cache = (storage, storage.generation, menus)
+
+    key = (current_lang, bool(session))
+    visible_menu = menus.get(key)
+    if visible_menu is None:
+        visible_menu = _filter_menu(storage, menu_items, current_lang, session)
+        if len(menus) < MENU_CACHE_SIZE:
+            menus[key] = visible_menu
+    return list(visible_menu)
+
+
+def _filter_menu(storage, menu_items: list, current_lang: str, session) -> list:
+    """Filter menu items by visibility and language."""
     visible_menu = []
     for item in menu_items:
         # Check visibility
@@ -52,6 +115,228 @@ def get_filtered_menu(storage, current_lang: str, session) -> list:
     return visible_menu
 
 
+@dataclass(slots=True)
+class _PublishedIndex:
+    """Published posts, newest first, bucketed the ways the blog filters them.
+
+    Each entry is (published_ts, post); posts without a usable date have
+    None and are never treated as scheduled. Built from one version of the
+    database and thrown away when it changes.
+    """
+
+    posts: list[tuple[int | None, dict]]
+    by_page: dict[str, list[tuple[int | None, dict]]]
+    by_category: dict[str, list[tuple[int | None, dict]]]
+    by_tag: dict[str, list[tuple[int | None, dict]]]
+    # Latest publish time, to tell whether any post is still scheduled
+    max_ts: int | None
+    # (bucket, language) -> entries visible in that language
+    by_lang: dict[tuple, list[tuple[int | None, dict]]] = field(default_factory=dict)
+    # (bucket, language) -> (time the next scheduled post goes live, entries
+    # visible until then), used while some posts are still scheduled
+    by_time: dict[tuple, tuple[float, list[tuple[int | None, dict]]]] = field(default_factory=dict)
+
+
+def _build_published_index(posts: dict) -> _PublishedIndex:
+    """Build the published-post index from the blog_posts table.
+
+    Args:
+        posts: Mapping of slug to post data.
+
+    Returns:
+        The index.
+    """
+    published = [post for post in posts.values() if post.get("status") == "published"]
+    # Sort by published_at descending
+    published.sort(key=lambda p: p.get("published_at") or p.get("created_at") or "", reverse=True)
+
+    index = _PublishedIndex(posts=[], by_page={}, by_category={}, by_tag={}, max_ts=None)
+    for post in published:
+        if "published_ts" in post:
+            published_ts = post["published_ts"]
+        else:
+            # Saved before published_ts existed; only the date string is there
+            published_ts = published_timestamp(post.get("published_at"))
+        entry = (published_ts, post)
+        index.posts.append(entry)
+        if entry[0] is not None and (index.max_ts is None or entry[0] > index.max_ts):
+            index.max_ts = entry[0]
+
+        for page_slug in set(post.get("display_pages") or ()):
+            index.by_page.setdefault(page_slug, []).append(entry)
+        category = post.get("category")
+        if category:
+            index.by_category.setdefault(category, []).append(entry)
+        tags_lower = post.get("tags_lower")
+        if tags_lower is None:
+            # Saved before tags_lower existed
+            tags_lower = lowercase_tags(post.get("tags"))
+        for tag in tags_lower:
+            index.by_tag.setdefault(tag, []).append(entry)
+    return index
+
+
+# (storage, storage generation, index)
+_published_index: tuple = (None, -1, None)
+
+
+def _get_published_index(storage) -> _PublishedIndex:
+    """Get the published-post index, rebuilding it after storage changed."""
+    global _published_index
+
+    posts = storage.get("blog_posts", {})
+    cached_storage, generation, index = _published_index
+    if index is None or cached_storage is not storage or generation != storage.generation:
+        index = _build_published_index(posts)
+        _published_index = (storage, storage.generation, index)
+    return index
+
+
+def _visible_posts(index: _PublishedIndex, bucket: tuple, current_lang: str | None) -> list:
+    """Get the entries of one index bucket that are visible right now.
+
+    Args:
+        index: Published-post index.
+        bucket: ("all",) or (kind, key) naming a bucket of the index.
+        current_lang: Language to filter by, or None for all.
+
+    Returns:
+        Index entries, newest first.
+    """
+    if bucket[0] == "all":
+        entries = index.posts
+    else:
+        entries = getattr(index, f"by_{bucket[0]}").get(bucket[1])
+        if not entries:
+            return []
+
+    # Language filter, kept per bucket until the index is rebuilt
+    lang_key = (bucket, current_lang)
+    if current_lang:
+        filtered = index.by_lang.get(lang_key)
+        if filtered is None:
+            filtered = index.by_lang[lang_key] = [
+                entry for entry in entries
+                if entry[1].get("language", "both") in ("both", current_lang)
+            ]
+        entries = filtered
+
+    # Hide posts scheduled for the future, if there are any. The result
+    # holds until the next of them goes live, so it is kept until then.
+    now_ts = time.time()
+    if index.max_ts is not None and index.max_ts > now_ts:
+        cached = index.by_time.get(lang_key)
+        if cached is not None and now_ts < cached[0]:
+            return cached[1]
+        visible = []
+        next_ts = float("inf")
+        for entry in entries:
+            if entry[0] is None or entry[0] <= now_ts:
+                visible.append(entry)
+            elif entry[0] < next_ts:
+                next_ts = entry[0]
+        index.by_time[lang_key] = (next_ts, visible)
+        entries = visible
+    return entries
+
+
+# (storage, storage generation, sanitizer, rendered blocks)
+_rendered_blocks: tuple = (None, -1, None, None)
+
+
+def get_rendered_blocks(storage, sanitizer) -> dict:
+    """Get all blocks rendered to HTML, disabled ones as empty strings.
+
+    Rendering is redone only after the database changed, so requests in
+    between share one Markdown/sanitizer pass.
+
+    Args:
+        storage: Storage instance.
+        sanitizer: Sanitizer used to render block content.
+
+    Returns:
+        Mapping of block name to HTML (a copy the caller may change).
+    """
+    global _rendered_blocks
+
+    blocks_data = storage.get("blocks", {})
+    cached_storage, generation, cached_sanitizer, rendered = _rendered_blocks
+    if (
+        rendered is None
+        or cached_storage is not storage
+        or generation != storage.generation
+        or cached_sanitizer is not sanitizer
+    ):
+        rendered = {}
+        for name, block in blocks_data.items():
+            # Skip disabled blocks
+            if block.get("enabled") is False:
+                rendered[name] = ""
+                continue
+            content = block.get("content", "")
+            fmt = block.get("content_format", "markdown")
+            rendered[name] = sanitizer.render_content(content, fmt)
+        _rendered_blocks = (storage, storage.generation, sanitizer, rendered)
+    return dict(rendered)
+
+
+def _build_context(
+    request: Request,
+    storage,
+    session,
+    *,
+    current_lang: str,
+    lang_direction: str,
+    page_title: str,
+    page_slug: str,
+    page_content: str,
+    page_description: str = "",
+    page_keywords: str = "",
+    menu_items: list,
+    blocks: dict,
+):
+    """Build the theme context shared by the blog pages.
+
+    Args:
+        request: Current request, for the CSRF token.
+        storage: Storage instance.
+        session: Current session, or None for visitors.
+        current_lang: Current language code.
+        lang_direction: Text direction of the current language.
+        page_title: Page title.
+        page_slug: Page slug.
+        page_content: Rendered page body.
+        page_description: Meta description.
+        page_keywords: Meta keywords.
+        menu_items: Menu items visible on the page.
+        blocks: Rendered blocks.
+
+    Returns:
+        CMSContext for theme_manager.render_page().
+    """
+    from ..core.themes import CMSContext
+
+    role_value = session.role.value if session else None
+    return CMSContext(
+        **_get_site_settings(storage),
+        lang_direction=lang_direction,
+        current_language=current_lang,
+        available_languages=get_available_languages(),
+        page_title=page_title,
+        page_slug=page_slug,
+        page_content=page_content,
+        page_description=page_description,
+        page_keywords=page_keywords,
+        menu_items=menu_items,
+        blocks=blocks,
+        is_admin=role_value == "admin",
+        is_editor=role_value in ("admin", "editor"),
+        user=session.user_id if session else None,
+        user_display_name=storage.get(f"users.{session.user_id}.display_name") if session else None,
+        csrf_token=get_csrf_token(request),
+    )
+
+
 def get_blog_posts_for_page(
     storage, page_slug: str, limit: int = 10, offset: int = 0, current_lang: str = None
 ) -> tuple[list, int]:
@@ -67,59 +352,17 @@ def get_blog_posts_for_page(
     Returns:
         Tuple of (list of posts for current page, total count of matching posts).
     """
-    posts = storage.get("blog_posts", {})
-    now = datetime.now(timezone.utc)
-
-    # Filter published posts that include this page
-    filtered = []
-    for post in posts.values():
-        if post.get("status") != "published":
-            continue
-
-        # Check if scheduled for future
-        published_at = post.get("published_at")
-        if published_at:
-            try:
-                # Handle various date formats
-                if "T" in published_at:
-                    # ISO format - might be with or without timezone
-                    if "+" in published_at or "Z" in published_at:
-                        pub_dt = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
-                    else:
-                        # No timezone, assume local and add UTC
-                        pub_dt = datetime.fromisoformat(published_at).replace(tzinfo=timezone.utc)
-                else:
-                    # Just date
-                    pub_dt = datetime.fromisoformat(published_at + "T00:00:00").replace(tzinfo=timezone.utc)
-
-                if pub_dt > now:
-                    continue  # Scheduled for future
-            except (ValueError, TypeError):
-                pass  # Invalid date format, include the post
-
-        # Check if this page is in display_pages
-        display_pages = post.get("display_pages", [])
-        if page_slug not in display_pages:
-            continue
-
-        # Check language visibility
-        if current_lang:
-            post_lang = post.get("language", "both")
-            if post_lang != "both" and post_lang != current_lang:
-                continue
-
-        filtered.append(post)
-
-    # Sort by published_at descending
-    filtered.sort(key=lambda p: p.get("published_at") or p.get("created_at") or "", reverse=True)
-
-    total = len(filtered)
-    return filtered[offset:offset + limit], total
+    entries = _visible_posts(_get_published_index(storage), ("page", page_slug), current_lang)
+    return [post for _, post in entries[offset:offset + limit]], len(entries)
 
 
 def get_all_published_posts(storage, limit: int = 100, offset: int = 0, category: str = None, tag: str = None, current_lang: str = None) -> tuple:
     """Get all published blog posts with optional filtering.
 
+    Posts come from an index built once per database version, so a
+    request only slices the matching bucket instead of scanning, parsing
+    and sorting every post.
+
     Args:
         storage: Storage instance.
         limit: Maximum number of posts.
@@ -131,39 +374,139 @@ def get_all_published_posts(storage, limit: int = 100, offset: int = 0, category
     Returns:
         Tuple of (posts list, total count).
     """
-    posts = storage.get("blog_posts", {})
-    now = datetime.now(timezone.utc).isoformat()
+    index = _get_published_index(storage)
+    if category:
+        entries = _visible_posts(index, ("category", category), current_lang)
+        if tag:
+            # Intersect with the tag bucket instead of lowering every post's tags
+            tagged = {id(post) for _, post in index.by_tag.get(tag.lower(), ())}
+            entries = [entry for entry in entries if id(entry[1]) in tagged]
+    elif tag:
+        entries = _visible_posts(index, ("tag", tag.lower()), current_lang)
+    else:
+        entries = _visible_posts(index, ("all",), current_lang)
 
-    # Filter published posts
-    filtered = []
-    for post in posts.values():
-        if post.get("status") != "published":
-            continue
-        published_at = post.get("published_at")
-        if published_at and published_at > now:
-            continue
+    return [post for _, post in entries[offset:offset + limit]], len(entries)
 
-        # Category filter
-        if category and post.get("category") != category:
-            continue
 
-        # Tag filter
-        if tag and tag.lower() not in [t.lower() for t in post.get("tags", [])]:
-            continue
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_COMMENT_EMAIL_RE = re.compile(r"^[^@]+@[^@]+\.[^@]+$")
 
-        # Language filter
-        if current_lang:
-            post_lang = post.get("language", "both")
-            if post_lang != "both" and post_lang != current_lang:
-                continue
 
-        filtered.append(post)
+@lru_cache(maxsize=512)
+def _auto_excerpt(content: str) -> str:
+    """Strip HTML from post content and truncate it to an excerpt."""
+    text = _HTML_TAG_RE.sub("", content)
+    return text[:200] + "..." if len(text) > 200 else text
 
-    # Sort by published_at descending
-    filtered.sort(key=lambda p: p.get("published_at") or p.get("created_at") or "", reverse=True)
 
-    total = len(filtered)
-    return filtered[offset:offset + limit], total
+def get_post_excerpt(post: dict) -> str:
+    """Get the excerpt shown for a post in listings.
+
+    Falls back to the start of the content when the post has no excerpt;
+    that is cached per content, so unchanged posts are stripped once.
+
+    Args:
+        post: Post data.
+
+    Returns:
+        Excerpt text, at most 200 characters plus an ellipsis.
+    """
+    excerpt = post.get("excerpt", "")[:200]
+    if not excerpt and post.get("content"):
+        excerpt = _auto_excerpt(post["content"])
+    return excerpt
+
+
+def _image_url(uploads: dict, uuid_str: str | None) -> str | None:
+    """Get the URL of an uploaded image, or None if it doesn't exist."""
+    if not uuid_str or not uploads.get(uuid_str):
+        return None
+    return f"/uploads/{uuid_str}"
+
+
+def _post_cards_html(
+    posts: list,
+    uploads: dict,
+    current_lang: str,
+    categories: dict | None = None,
+    show_author: bool = False,
+) -> str:
+    """Build the post cards for a blog listing.
+
+    Args:
+        posts: Posts to show, in order.
+        uploads: Uploads table, for featured images.
+        current_lang: Current language code, for dates.
+        categories: Categories table; if given, each card names its category.
+        show_author: Whether to show each post's author.
+
+    Returns:
+        HTML for the cards.
+    """
+    cards = []
+    for post in posts:
+        image_url = _image_url(uploads, post.get("featured_image"))
+        category_html = ""
+        if categories is not None and post.get("category"):
+            cat_name = categories.get(post["category"], {}).get("name", "")
+            if cat_name:
+                category_html = f'<span class="post-category">{cat_name}</span>'
+        author_html = f'<span class="post-author">{post.get("author", "")}</span>' if show_author else ""
+
+        cards.append(f'''
+        <article class="blog-post-card">
+            {f'<img src="{image_url}" alt="" class="post-thumbnail">' if image_url else ''}
+            <div class="post-content">
+                {category_html}
+                <h2><a href="/blog/{post.get("slug", "")}">{post.get("title", "")}</a></h2>
+                <p class="post-excerpt">{get_post_excerpt(post)}</p>
+                <div class="post-meta">
+                    <span class="post-date">{jalali_date(post.get("published_at") or post.get("created_at") or "", current_lang)}</span>
+                    {author_html}
+                </div>
+            </div>
+        </article>
+        ''')
+    return "".join(cards)
+
+
+def _pagination_html(
+    base_url: str, page: int, total_pages: int, prev_label: str = "&laquo;", next_label: str = "&raquo;"
+) -> str:
+    """Build the pagination links for a blog listing.
+
+    Args:
+        base_url: Listing URL the page number is added to.
+        page: Current page number.
+        total_pages: Number of pages.
+        prev_label: HTML for the previous-page link.
+        next_label: HTML for the next-page link.
+
+    Returns:
+        HTML for the links, or "" if there is only one page.
+    """
+    if total_pages <= 1:
+        return ""
+
+    parts = ['<div class="pagination">']
+    if page > 1:
+        parts.append(f'<a href="{base_url}?page={page - 1}">{prev_label}</a>')
+    for p in range(1, total_pages + 1):
+        if p == page:
+            parts.append(f'<span class="current">{p}</span>')
+        else:
+            parts.append(f'<a href="{base_url}?page={p}">{p}</a>')
+    if page < total_pages:
+        parts.append(f'<a href="{base_url}?page={page + 1}">{next_label}</a>')
+    parts.append('</div>')
+    return "".join(parts)
+
+
+@lru_cache(maxsize=128)
+def _render_post_content(sanitizer, content: str, fmt: str) -> str:
+    """Render a post body, cached per sanitizer, content and format."""
+    return sanitizer.render_content(content, fmt)
 
 
 def get_approved_comments(storage, post_slug: str) -> list:
@@ -211,80 +554,26 @@ async def blog_archive(
     # Get menu items (filtered by language)
     visible_menu = get_filtered_menu(storage, current_lang, session)
 
-    # Build post cards
-    def get_image_url(uuid_str):
-        if not uuid_str:
-            return None
-        upload = uploads.get(uuid_str)
-        if upload:
-            ext = upload.get("mime_type", "").split("/")[-1]
-            return f"/uploads/{uuid_str}"
-        return None
-
-    def get_category_name(cat_slug):
-        cat = categories.get(cat_slug, {})
-        return cat.get("name", "") if cat_slug else ""
-
     total_pages = (total + per_page - 1) // per_page
 
     # Get blocks
-    blocks_data = storage.get("blocks", {})
-    rendered_blocks = {}
-    for name, block in blocks_data.items():
-        # Skip disabled blocks
-        if block.get("enabled") is False:
-            rendered_blocks[name] = ""
-            continue
-        content = block.get("content", "")
-        fmt = block.get("content_format", "markdown")
-        rendered_blocks[name] = sanitizer.render_content(content, fmt)
+    rendered_blocks = get_rendered_blocks(storage, sanitizer)
 
     # Build HTML for blog archive
-    posts_html = ""
-    for post in posts:
-        image_url = get_image_url(post.get("featured_image"))
-        cat_name = get_category_name(post.get("category"))
-        excerpt = post.get("excerpt", "")[:200]
-        if not excerpt and post.get("content"):
-            # Strip HTML and truncate
-            import re
-            text = re.sub(r"<[^>]+>", "", post.get("content", ""))
-            excerpt = text[:200] + "..." if len(text) > 200 else text
-
-        posts_html += f'''
-        <article class="blog-post-card">
-            {f'<img src="{image_url}" alt="" class="post-thumbnail">' if image_url else ''}
-            <div class="post-content">
-                {f'<span class="post-category">{cat_name}</span>' if cat_name else ''}
-                <h2><a href="/blog/{post.get("slug", "")}">{post.get("title", "")}</a></h2>
-                <p class="post-excerpt">{excerpt}</p>
-                <div class="post-meta">
-                    <span class="post-date">{jalali_date(post.get("published_at") or post.get("created_at") or "", current_lang)}</span>
-                    <span class="post-author">{post.get("author", "")}</span>
-                </div>
-            </div>
-        </article>
-        '''
+    posts_html = _post_cards_html(posts, uploads, current_lang, categories=categories, show_author=True)
 
     # Pagination
-    pagination_html = ""
-    if total_pages > 1:
-        pagination_html = '<div class="pagination">'
-        if page > 1:
-            pagination_html += f'<a href="/blog?page={page - 1}">&laquo; {t("frontend.blog.prev")}</a>'
-        for p in range(1, total_pages + 1):
-            if p == page:
-                pagination_html += f'<span class="current">{p}</span>'
-            else:
-                pagination_html += f'<a href="/blog?page={p}">{p}</a>'
-        if page < total_pages:
-            pagination_html += f'<a href="/blog?page={page + 1}">{t("frontend.blog.next")} &raquo;</a>'
-        pagination_html += '</div>'
+    pagination_html = _pagination_html(
+        "/blog", page, total_pages,
+        prev_label=f'&laquo; {t("frontend.blog.prev")}',
+        next_label=f'{t("frontend.blog.next")} &raquo;',
+    )
 
     # Categories sidebar
-    cat_list_html = ""
-    for cat in sorted(categories.values(), key=lambda c: c.get("order", 0)):
-        cat_list_html += f'<li><a href="/blog/category/{cat.get("slug", "")}">{cat.get("name", "")}</a></li>'
+    cat_list_html = "".join(
+        f'<li><a href="/blog/category/{cat.get("slug", "")}">{cat.get("name", "")}</a></li>'
+        for cat in sorted(categories.values(), key=lambda c: c.get("order", 0))
+    )
 
     content_html = f'''
     <div class="blog-archive">
@@ -304,29 +593,19 @@ async def blog_archive(
     </div>
     '''
 
-    from ..core.themes import CMSContext
-
-    context = CMSContext(
-        site_title=storage.get("config.site_title", "My Website"),
-        site_lang=storage.get("config.site_lang", "en"),
-        theme=storage.get("config.theme", "default"),
+    context = _build_context(
+        request,
+        storage,
+        session,
+        current_lang=current_lang,
         lang_direction=lang_direction,
-        current_language=current_lang,
-        available_languages=get_available_languages(),
         page_title=t("frontend.blog.title"),
         page_slug="blog",
         page_content=content_html,
         page_description=t("frontend.blog.description"),
         page_keywords="blog",
-        page_template=storage.get("config.default_template", "default"),
         menu_items=visible_menu,
         blocks=rendered_blocks,
-        is_admin=session and session.role.value == "admin" if session else False,
-        is_editor=session and session.role.value in ("admin", "editor") if session else False,
-        user=session.user_id if session else None,
-        user_display_name=storage.get(f"users.{session.user_id}.display_name") if session else None,
-        csrf_token=get_csrf_token(request),
-        _asset_prefix=f"/themes/{storage.get('config.theme', 'default').lower()}/static",
     )
 
     html = theme_manager.render_page(context)
@@ -368,59 +647,13 @@ async def blog_category(
     # Get menu items (filtered by language)
     visible_menu = get_filtered_menu(storage, current_lang, session)
 
-    def get_image_url(uuid_str):
-        if not uuid_str:
-            return None
-        upload = uploads.get(uuid_str)
-        return f"/uploads/{uuid_str}" if upload else None
-
     total_pages = (total + per_page - 1) // per_page
 
-    blocks_data = storage.get("blocks", {})
-    rendered_blocks = {}
-    for name, block in blocks_data.items():
-        if block.get("enabled") is False:
-            rendered_blocks[name] = ""
-            continue
-        content = block.get("content", "")
-        fmt = block.get("content_format", "markdown")
-        rendered_blocks[name] = sanitizer.render_content(content, fmt)
+    rendered_blocks = get_rendered_blocks(storage, sanitizer)
 
-    posts_html = ""
-    for post in posts:
-        image_url = get_image_url(post.get("featured_image"))
-        excerpt = post.get("excerpt", "")[:200]
-        if not excerpt and post.get("content"):
-            import re
-            text = re.sub(r"<[^>]+>", "", post.get("content", ""))
-            excerpt = text[:200] + "..." if len(text) > 200 else text
-
-        posts_html += f'''
-        <article class="blog-post-card">
-            {f'<img src="{image_url}" alt="" class="post-thumbnail">' if image_url else ''}
-            <div class="post-content">
-                <h2><a href="/blog/{post.get("slug", "")}">{post.get("title", "")}</a></h2>
-                <p class="post-excerpt">{excerpt}</p>
-                <div class="post-meta">
-                    <span class="post-date">{jalali_date(post.get("published_at") or post.get("created_at") or "", current_lang)}</span>
-                </div>
-            </div>
-        </article>
-        '''
-
-    pagination_html = ""
-    if total_pages > 1:
-        pagination_html = '<div class="pagination">'
-        if page > 1:
-            pagination_html += f'<a href="/blog/category/{slug}?page={page - 1}">&laquo;</a>'
-        for p in range(1, total_pages + 1):
-            if p == page:
-                pagination_html += f'<span class="current">{p}</span>'
-            else:
-                pagination_html += f'<a href="/blog/category/{slug}?page={p}">{p}</a>'
-        if page < total_pages:
-            pagination_html += f'<a href="/blog/category/{slug}?page={page + 1}">&raquo;</a>'
-        pagination_html += '</div>'
+    posts_html = _post_cards_html(posts, uploads, current_lang)
+
+    pagination_html = _pagination_html(f"/blog/category/{slug}", page, total_pages)
 
     content_html = f'''
     <div class="blog-archive">
@@ -434,29 +667,18 @@ async def blog_category(
     </div>
     '''
 
-    from ..core.themes import CMSContext
-
-    context = CMSContext(
-        site_title=storage.get("config.site_title", "My Website"),
-        site_lang=storage.get("config.site_lang", "en"),
-        theme=storage.get("config.theme", "default"),
+    context = _build_context(
+        request,
+        storage,
+        session,
+        current_lang=current_lang,
         lang_direction=lang_direction,
-        current_language=current_lang,
-        available_languages=get_available_languages(),
         page_title=f'{t("frontend.blog.category")}: {category.get("name", slug)}',
         page_slug="blog",
         page_content=content_html,
         page_description=category.get("description", ""),
-        page_keywords="",
-        page_template=storage.get("config.default_template", "default"),
         menu_items=visible_menu,
         blocks=rendered_blocks,
-        is_admin=session and session.role.value == "admin" if session else False,
-        is_editor=session and session.role.value in ("admin", "editor") if session else False,
-        user=session.user_id if session else None,
-        user_display_name=storage.get(f"users.{session.user_id}.display_name") if session else None,
-        csrf_token=get_csrf_token(request),
-        _asset_prefix=f"/themes/{storage.get('config.theme', 'default').lower()}/static",
     )
 
     html = theme_manager.render_page(context)
@@ -488,59 +710,13 @@ async def blog_tag(
     # Get menu items (filtered by language)
     visible_menu = get_filtered_menu(storage, current_lang, session)
 
-    def get_image_url(uuid_str):
-        if not uuid_str:
-            return None
-        upload = uploads.get(uuid_str)
-        return f"/uploads/{uuid_str}" if upload else None
-
     total_pages = (total + per_page - 1) // per_page
 
-    blocks_data = storage.get("blocks", {})
-    rendered_blocks = {}
-    for name, block in blocks_data.items():
-        if block.get("enabled") is False:
-            rendered_blocks[name] = ""
-            continue
-        content = block.get("content", "")
-        fmt = block.get("content_format", "markdown")
-        rendered_blocks[name] = sanitizer.render_content(content, fmt)
+    rendered_blocks = get_rendered_blocks(storage, sanitizer)
 
-    posts_html = ""
-    for post in posts:
-        image_url = get_image_url(post.get("featured_image"))
-        excerpt = post.get("excerpt", "")[:200]
-        if not excerpt and post.get("content"):
-            import re
-            text = re.sub(r"<[^>]+>", "", post.get("content", ""))
-            excerpt = text[:200] + "..." if len(text) > 200 else text
-
-        posts_html += f'''
-        <article class="blog-post-card">
-            {f'<img src="{image_url}" alt="" class="post-thumbnail">' if image_url else ''}
-            <div class="post-content">
-                <h2><a href="/blog/{post.get("slug", "")}">{post.get("title", "")}</a></h2>
-                <p class="post-excerpt">{excerpt}</p>
-                <div class="post-meta">
-                    <span class="post-date">{jalali_date(post.get("published_at") or post.get("created_at") or "", current_lang)}</span>
-                </div>
-            </div>
-        </article>
-        '''
-
-    pagination_html = ""
-    if total_pages > 1:
-        pagination_html = '<div class="pagination">'
-        if page > 1:
-            pagination_html += f'<a href="/blog/tag/{tag}?page={page - 1}">&laquo;</a>'
-        for p in range(1, total_pages + 1):
-            if p == page:
-                pagination_html += f'<span class="current">{p}</span>'
-            else:
-                pagination_html += f'<a href="/blog/tag/{tag}?page={p}">{p}</a>'
-        if page < total_pages:
-            pagination_html += f'<a href="/blog/tag/{tag}?page={page + 1}">&raquo;</a>'
-        pagination_html += '</div>'
+    posts_html = _post_cards_html(posts, uploads, current_lang)
+
+    pagination_html = _pagination_html(f"/blog/tag/{tag}", page, total_pages)
 
     content_html = f'''
     <div class="blog-archive">
@@ -554,29 +730,18 @@ async def blog_tag(
     </div>
     '''
 
-    from ..core.themes import CMSContext
-
-    context = CMSContext(
-        site_title=storage.get("config.site_title", "My Website"),
-        site_lang=storage.get("config.site_lang", "en"),
-        theme=storage.get("config.theme", "default"),
+    context = _build_context(
+        request,
+        storage,
+        session,
+        current_lang=current_lang,
         lang_direction=lang_direction,
-        current_language=current_lang,
-        available_languages=get_available_languages(),
         page_title=f'{t("frontend.blog.tag")}: {tag}',
         page_slug="blog",
         page_content=content_html,
-        page_description="",
         page_keywords=tag,
-        page_template=storage.get("config.default_template", "default"),
         menu_items=visible_menu,
         blocks=rendered_blocks,
-        is_admin=session and session.role.value == "admin" if session else False,
-        is_editor=session and session.role.value in ("admin", "editor") if session else False,
-        user=session.user_id if session else None,
-        user_display_name=storage.get(f"users.{session.user_id}.display_name") if session else None,
-        csrf_token=get_csrf_token(request),
-        _asset_prefix=f"/themes/{storage.get('config.theme', 'default').lower()}/static",
     )
 
     html = theme_manager.render_page(context)
@@ -617,24 +782,10 @@ async def blog_post(
     # Get menu items (filtered by language)
     visible_menu = get_filtered_menu(storage, current_lang, session)
 
-    blocks_data = storage.get("blocks", {})
-    rendered_blocks = {}
-    for name, block in blocks_data.items():
-        if block.get("enabled") is False:
-            rendered_blocks[name] = ""
-            continue
-        content = block.get("content", "")
-        fmt = block.get("content_format", "markdown")
-        rendered_blocks[name] = sanitizer.render_content(content, fmt)
+    rendered_blocks = get_rendered_blocks(storage, sanitizer)
 
     # Get featured image
-    def get_image_url(uuid_str):
-        if not uuid_str:
-            return None
-        upload = uploads.get(uuid_str)
-        return f"/uploads/{uuid_str}" if upload else None
-
-    image_url = get_image_url(post.get("featured_image"))
+    image_url = _image_url(uploads, post.get("featured_image"))
 
     # Get category
     category = categories.get(post.get("category", ""), {})
@@ -658,32 +809,31 @@ async def blog_post(
     # Get tags
     tags_html = ""
     if post.get("tags"):
-        tags_html = '<div class="post-tags">'
-        for tag in post.get("tags", []):
-            tags_html += f'<a href="/blog/tag/{tag}" class="tag">{tag}</a>'
-        tags_html += '</div>'
+        tags_html = '<div class="post-tags">' + "".join(
+            f'<a href="/blog/tag/{tag}" class="tag">{tag}</a>' for tag in post.get("tags", [])
+        ) + '</div>'
 
     # Get comments
     comments = get_approved_comments(storage, slug)
     comments_html = ""
     if post.get("comments_enabled", True):
-        comments_html = f'<section class="comments-section"><h3>{t("frontend.blog.comments")} ({len(comments)})</h3>'
+        comment_parts = [f'<section class="comments-section"><h3>{t("frontend.blog.comments")} ({len(comments)})</h3>']
 
         if comments:
             for comment in comments:
-                comments_html += f'''
+                comment_parts.append(f'''
                 <div class="comment">
                     <div class="comment-author">{comment.get("author_name", "")}</div>
                     <div class="comment-date">{jalali_date(comment.get("created_at", ""), current_lang)}</div>
                     <div class="comment-content">{comment.get("content", "")}</div>
                 </div>
-                '''
+                ''')
         else:
-            comments_html += f'<p class="no-comments">{t("frontend.blog.no_comments")}</p>'
+            comment_parts.append(f'<p class="no-comments">{t("frontend.blog.no_comments")}</p>')
 
         # Comment form
         csrf_token = get_csrf_token(request)
-        comments_html += f'''
+        comment_parts.append(f'''
         <div class="comment-form">
             <h4>{t("frontend.blog.leave_comment")}</h4>
             <form method="post" action="/blog/{slug}/comment">
@@ -703,11 +853,12 @@ async def blog_post(
                 <button type="submit" class="btn">{t("frontend.blog.submit")}</button>
             </form>
         </div>
-        '''
-        comments_html += '</section>'
+        ''')
+        comment_parts.append('</section>')
+        comments_html = "".join(comment_parts)
 
     # Render post content
-    post_content = sanitizer.render_content(post.get("content", ""), post.get("content_format", "html"))
+    post_content = _render_post_content(sanitizer, post.get("content", ""), post.get("content_format", "html"))
 
     content_html = f'''
     <article class="blog-single-post">
@@ -729,29 +880,19 @@ async def blog_post(
     </article>
     '''
 
-    from ..core.themes import CMSContext
-
-    context = CMSContext(
-        site_title=storage.get("config.site_title", "My Website"),
-        site_lang=storage.get("config.site_lang", "en"),
-        theme=storage.get("config.theme", "default"),
+    context = _build_context(
+        request,
+        storage,
+        session,
+        current_lang=current_lang,
         lang_direction=lang_direction,
-        current_language=current_lang,
-        available_languages=get_available_languages(),
         page_title=post.get("title", ""),
         page_slug=f"blog/{slug}",
         page_content=content_html,
         page_description=post.get("excerpt", ""),
         page_keywords=", ".join(post.get("tags", [])),
-        page_template=storage.get("config.default_template", "default"),
         menu_items=visible_menu,
         blocks=rendered_blocks,
-        is_admin=session and session.role.value == "admin" if session else False,
-        is_editor=session and session.role.value in ("admin", "editor") if session else False,
-        user=session.user_id if session else None,
-        user_display_name=storage.get(f"users.{session.user_id}.display_name") if session else None,
-        csrf_token=get_csrf_token(request),
-        _asset_prefix=f"/themes/{storage.get('config.theme', 'default').lower()}/static",
     )
 
     html = theme_manager.render_page(context)
@@ -788,7 +929,6 @@ async def submit_comment(
         raise HTTPException(status_code=403, detail="Comments are disabled")
 
     # Basic validation
-    import re
     import bleach
 
     author_name = bleach.clean(author_name.strip(), tags=[], strip=True)[:100]
@@ -798,7 +938,7 @@ async def submit_comment(
     if not author_name or not author_email or not content:
         raise HTTPException(status_code=400, detail="All fields are required")
 
-    if not re.match(r"^[^@]+@[^@]+\.[^@]+$", author_email):
+    if not _COMMENT_EMAIL_RE.match(author_email):
         raise HTTPException(status_code=400, detail="Invalid email")
 
     # Create comment
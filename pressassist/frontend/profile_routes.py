@@ -14,8 +14,11 @@ from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import HTMLResponse, RedirectResponse
 
 from ..core.auth import AuthManager
-from ..core.i18n import i18n, t
+from ..core.i18n import i18n, t, t_url
+from ..core.language_middleware import get_language_from_request
 from ..core.models import ProfileVisibility, Role
+from ..core.user_index import save_user
+from .blog_routes import get_rendered_blocks
 
 router = APIRouter(tags=["profile"])
 
@@ -949,15 +952,7 @@ async def view_profile(request: Request, username: str):
     visible_menu = [item for item in menu_items if item.get("visibility") == "show" or session]
 
     # Get blocks
-    blocks_data = storage.get("blocks", {})
-    rendered_blocks = {}
-    for name, block in blocks_data.items():
-        if block.get("enabled") is False:
-            rendered_blocks[name] = ""
-            continue
-        content = block.get("content", "")
-        fmt = block.get("content_format", "markdown")
-        rendered_blocks[name] = sanitizer.render_content(content, fmt)
+    rendered_blocks = get_rendered_blocks(storage, sanitizer)
 
     # Profile data for template
     profile_data = {
@@ -1296,6 +1291,7 @@ async def update_profile(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    current_lang = get_language_from_request(request)
 
     # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
@@ -1315,6 +1311,8 @@ async def update_profile(
     if not user_data:
         return RedirectResponse(url="/login", status_code=303)
 
+    # Edit a copy, so save_user can drop the old index entries
+    user_data = dict(user_data)
     # Update fields
     user_data["email"] = email.strip().lower() if email else None
     user_data["display_name"] = display_name.strip() if display_name else None
@@ -1322,10 +1320,10 @@ async def update_profile(
     user_data["bio"] = bio.strip() if bio else None
     user_data["profile_visibility"] = visibility if visibility in ("public", "private") else "public"
 
-    storage.set(f"users.{username}", user_data)
+    save_user(storage, username, user_data)
 
     return RedirectResponse(
-        url="/me/profile?success=" + t("profile.profile_updated").replace(" ", "+"),
+        url="/me/profile?success=" + t_url("profile.profile_updated", current_lang),
         status_code=303
     )
 
@@ -1342,6 +1340,7 @@ async def update_password(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    current_lang = get_language_from_request(request)
 
     # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
@@ -1364,20 +1363,20 @@ async def update_password(
     # Verify current password
     if not auth.verify_password(current_password, user_data.get("password_hash", "")):
         return RedirectResponse(
-            url="/me/profile?error=" + t("profile.wrong_password").replace(" ", "+"),
+            url="/me/profile?error=" + t_url("profile.wrong_password", current_lang),
             status_code=303
         )
 
     # Validate new passwords
     if new_password != confirm_password:
         return RedirectResponse(
-            url="/me/profile?error=" + t("auth.passwords_mismatch").replace(" ", "+"),
+            url="/me/profile?error=" + t_url("auth.passwords_mismatch", current_lang),
             status_code=303
         )
 
     if len(new_password) < 12:
         return RedirectResponse(
-            url="/me/profile?error=" + t("auth.password_too_short").replace(" ", "+"),
+            url="/me/profile?error=" + t_url("auth.password_too_short", current_lang),
             status_code=303
         )
 
@@ -1386,7 +1385,7 @@ async def update_password(
     storage.set(f"users.{username}", user_data)
 
     return RedirectResponse(
-        url="/me/profile?success=" + t("profile.password_updated").replace(" ", "+"),
+        url="/me/profile?success=" + t_url("profile.password_updated", current_lang),
         status_code=303
     )
 
@@ -1401,6 +1400,7 @@ async def upload_avatar(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    current_lang = get_language_from_request(request)
 
     # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
@@ -1472,7 +1472,7 @@ async def upload_avatar(
     storage.set(f"users.{username}", user_data)
 
     return RedirectResponse(
-        url="/me/profile?success=" + t("profile.avatar_updated").replace(" ", "+"),
+        url="/me/profile?success=" + t_url("profile.avatar_updated", current_lang),
         status_code=303
     )
 
@@ -1487,6 +1487,7 @@ async def upload_cover(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    current_lang = get_language_from_request(request)
 
     # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
@@ -1558,7 +1559,7 @@ async def upload_cover(
     storage.set(f"users.{username}", user_data)
 
     return RedirectResponse(
-        url="/me/profile?success=" + t("profile.cover_updated").replace(" ", "+"),
+        url="/me/profile?success=" + t_url("profile.cover_updated", current_lang),
         status_code=303
     )
 
@@ -1572,6 +1573,7 @@ async def request_verification(
     imports = _get_common_imports()
     storage = imports["storage"]
     auth = imports["auth"]
+    current_lang = get_language_from_request(request)
 
     # Verify CSRF
     csrf_cookie = request.cookies.get("csrf_token", "")
@@ -1597,7 +1599,7 @@ async def request_verification(
 
     if user_data.get("verification_requested_at"):
         return RedirectResponse(
-            url="/me/profile?error=" + t("profile.verification_already_requested").replace(" ", "+"),
+            url="/me/profile?error=" + t_url("profile.verification_already_requested", current_lang),
             status_code=303
         )
 
@@ -1606,6 +1608,6 @@ async def request_verification(
     storage.set(f"users.{username}", user_data)
 
     return RedirectResponse(
-        url="/me/profile?success=" + t("profile.verification_requested").replace(" ", "+"),
+        url="/me/profile?success=" + t_url("profile.verification_requested", current_lang),
         status_code=303
     )
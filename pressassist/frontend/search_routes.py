@@ -9,17 +9,20 @@ from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/api/search", tags=["search"])
 
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 def strip_html_tags(text: str) -> str:
     """Remove HTML tags from text."""
     if not text:
         return ""
     # Remove HTML tags
-    clean = re.sub(r"<[^>]+>", " ", text)
+    clean = _HTML_TAG_RE.sub(" ", text)
     # Decode HTML entities
     clean = html.unescape(clean)
     # Normalize whitespace
-    clean = re.sub(r"\s+", " ", clean).strip()
+    clean = _WHITESPACE_RE.sub(" ", clean).strip()
     return clean
 
 
@@ -27,8 +27,10 @@ from .core.plugins import PluginManager
 from .core.sanitize import Sanitizer
 from .core.security_headers import SecurityHeadersMiddleware
 from .core.session_store import RateLimitStore, SessionStore
+from .core.session_store_sqlite import SQLiteRateLimitStore, SQLiteSessionStore
 from .core.storage import Storage
 from .core.themes import CMSContext, ThemeManager
+from .core.updater import close_client as close_updater_client
 from .admin.routes import router as admin_router
 from .admin.blog_routes import blog_router
 from .admin.user_routes import router as user_router
@@ -48,6 +50,7 @@ theme_manager: ThemeManager | None = None
 plugin_manager: PluginManager | None = None
 audit_logger: AuditLogger | None = None
 _cleanup_task: asyncio.Task | None = None
+_rate_limit_flush_task: asyncio.Task | None = None
 
 
 async def periodic_cleanup():
@@ -83,6 +86,25 @@ async def periodic_cleanup():
             logger.error(f"Error in periodic cleanup: {e}")
 
 
+async def periodic_rate_limit_flush(rate_limit_store: RateLimitStore):
+    """Background task writing buffered rate limit attempts to disk.
+
+    The store otherwise flushes only when this worker records or checks
+    an attempt, so failures buffered by an idle worker would never reach
+    the other workers.
+    """
+    while True:
+        try:
+            await asyncio.sleep(rate_limit_store.flush_interval)
+            await asyncio.to_thread(rate_limit_store.flush)
+
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            from .core.logging import logger
+            logger.error(f"Error flushing rate limits: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - initialize on startup."""
@@ -107,12 +129,21 @@ async def lifespan(app: FastAPI):
 
     # Initialize persistent stores for sessions and rate limiting
     # This enables multi-worker support
-    session_store = SessionStore(app_config.sessions_file)
-    rate_limit_store = RateLimitStore(
-        app_config.rate_limit_file,
-        max_attempts=app_config.rate_limit_attempts,
-        window_minutes=app_config.rate_limit_window_minutes,
-    )
+    if app_config.session_backend == "sqlite":
+        session_store = SQLiteSessionStore(app_config.session_db_file)
+        rate_limit_store = SQLiteRateLimitStore(
+            app_config.session_db_file,
+            max_attempts=app_config.rate_limit_attempts,
+            window_minutes=app_config.rate_limit_window_minutes,
+        )
+    else:
+        session_store = SessionStore(app_config.sessions_file)
+        rate_limit_store = RateLimitStore(
+            app_config.rate_limit_file,
+            max_attempts=app_config.rate_limit_attempts,
+            window_minutes=app_config.rate_limit_window_minutes,
+            recheck_interval=1.0,
+        )
 
     # Initialize auth with persistent stores
     auth = AuthManager(
@@ -133,6 +164,7 @@ async def lifespan(app: FastAPI):
         themes_dir=app_config.themes_dir,
         fallback_dir=Path(__file__).parent / "public" / "templates",
         active_theme=config.theme if storage.exists else "default",
+        bytecode_cache_dir=app_config.template_cache_dir,
     )
 
     # Initialize plugin manager
@@ -149,22 +181,28 @@ async def lifespan(app: FastAPI):
     audit_logger = AuditLogger(app_config.audit_log_path)
 
     # Start periodic cleanup task
-    global _cleanup_task
+    global _cleanup_task, _rate_limit_flush_task
     _cleanup_task = asyncio.create_task(periodic_cleanup())
 
+    # The file rate limit store buffers attempts; the SQLite one writes them directly
+    if isinstance(rate_limit_store, RateLimitStore):
+        _rate_limit_flush_task = asyncio.create_task(periodic_rate_limit_flush(rate_limit_store))
+
     yield
 
-    # Cancel cleanup task
-    if _cleanup_task:
-        _cleanup_task.cancel()
-        try:
-            await _cleanup_task
-        except asyncio.CancelledError:
-            pass
+    # Cancel background tasks
+    for task in (_cleanup_task, _rate_limit_flush_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
-    # Final cleanup on shutdown
+    # Final cleanup on shutdown (also flushes buffered rate limit attempts)
     auth.cleanup_expired_sessions()
     auth.cleanup_rate_limits()
+    await close_updater_client()
 
 
 # Create FastAPI app
@@ -360,7 +398,7 @@ async def render_page(request: Request, slug: str, blog_page: int = 1) -> HTMLRe
     rendered_content = sanitizer.render_content(page_content, content_format)
 
     # Get blog posts for this page with pagination
-    from .frontend.blog_routes import get_blog_posts_for_page
+    from .frontend.blog_routes import get_blog_posts_for_page, get_filtered_menu
     posts_per_page = page_data.get("posts_per_page", 10)
     blog_page = max(1, blog_page)  # Ensure page is at least 1
     offset = (blog_page - 1) * posts_per_page
@@ -379,25 +417,7 @@ async def render_page(request: Request, slug: str, blog_page: int = 1) -> HTMLRe
     rendered_content = hook_payload.get("content", rendered_content)
 
     # Get menu items (filtered by visibility and language)
-    menu_items = storage.get("menu_items", [])
-    visible_menu = []
-    for item in menu_items:
-        # Check visibility
-        if item.get("visibility") != "show" and not session:
-            continue
-        # Check menu item's own language setting
-        item_lang = item.get("language", "both")
-        if item_lang != "both" and item_lang != current_lang and not session:
-            continue
-        # Also check language of the linked page
-        page_slug = item.get("slug")
-        if page_slug:
-            linked_page = storage.get(f"pages.{page_slug}")
-            if linked_page:
-                page_lang = linked_page.get("language", "both")
-                if page_lang != "both" and page_lang != current_lang and not session:
-                    continue
-        visible_menu.append(item)
+    visible_menu = get_filtered_menu(storage, current_lang, session)
 
     # Get localized page content if available
     page_title = page_data.get("title", slug)
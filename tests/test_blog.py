@@ -0,0 +1,201 @@
+"""Tests for blog post listing."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pressassist.core.blog_models import lowercase_tags, published_timestamp
+from pressassist.core.sanitize import Sanitizer
+from pressassist.core.storage import Storage
+from pressassist.frontend import blog_routes
+from pressassist.frontend.blog_routes import (
+    get_all_published_posts,
+    get_blog_posts_for_page,
+    get_filtered_menu,
+    get_post_excerpt,
+    get_rendered_blocks,
+)
+
+
+def make_post(slug: str, published_at: str, **fields) -> dict:
+    """Build a published post."""
+    post = {
+        "slug": slug,
+        "status": "published",
+        "published_at": published_at,
+        "language": "both",
+        "category": None,
+        "tags": [],
+        "display_pages": [],
+    }
+    post.update(fields)
+    return post
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Initialized storage with a few blog posts."""
+    store = Storage(tmp_path / "db.json")
+    store.initialize("secret-login", "hash")
+    future = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    store.set("blog_posts", {
+        "old": make_post("old", "2024-01-01", category="news", tags=["Python"]),
+        "new": make_post("new", "2024-03-01T10:00:00Z", tags=["python", "web"], display_pages=["home"]),
+        "fa": make_post("fa", "2024-02-01T10:00:00", language="fa", category="news", display_pages=["home"]),
+        "draft": make_post("draft", "2024-04-01", status="draft"),
+        "scheduled": make_post("scheduled", future, display_pages=["home"]),
+    })
+    return store
+
+
+def slugs(result: tuple) -> list[str]:
+    """Get the slugs from a (posts, total) result."""
+    return [post["slug"] for post in result[0]]
+
+
+class TestPublishedPosts:
+    """Tests for published post queries."""
+
+    def test_newest_first_without_drafts_or_scheduled(self, storage):
+        """Test only visible posts are listed, newest first."""
+        posts, total = get_all_published_posts(storage)
+
+        assert [post["slug"] for post in posts] == ["new", "fa", "old"]
+        assert total == 3
+
+    def test_filters(self, storage):
+        """Test category, tag and language filters."""
+        assert slugs(get_all_published_posts(storage, category="news")) == ["fa", "old"]
+        assert slugs(get_all_published_posts(storage, tag="PYTHON")) == ["new", "old"]
+        assert slugs(get_all_published_posts(storage, category="news", tag="python")) == ["old"]
+        assert slugs(get_all_published_posts(storage, current_lang="en")) == ["new", "old"]
+        assert get_all_published_posts(storage, category="missing") == ([], 0)
+
+    def test_pagination(self, storage):
+        """Test limit and offset slice the list but not the total."""
+        posts, total = get_all_published_posts(storage, limit=1, offset=1)
+
+        assert [post["slug"] for post in posts] == ["fa"]
+        assert total == 3
+
+    def test_posts_for_page(self, storage):
+        """Test posts are listed on the pages they are displayed on."""
+        assert slugs(get_blog_posts_for_page(storage, "home")) == ["new", "fa"]
+        assert slugs(get_blog_posts_for_page(storage, "home", current_lang="en")) == ["new"]
+        assert get_blog_posts_for_page(storage, "about") == ([], 0)
+
+    def test_changes_are_picked_up(self, storage):
+        """Test saved post changes show up in the next query."""
+        assert slugs(get_all_published_posts(storage, current_lang="en")) == ["new", "old"]
+
+        storage.set("blog_posts.old.status", "draft")
+        storage.set("blog_posts.extra", make_post("extra", "2024-05-01"))
+
+        assert slugs(get_all_published_posts(storage, current_lang="en")) == ["extra", "new"]
+
+    def test_stored_timestamp_preferred(self, storage):
+        """Test published_ts decides visibility when a post has it."""
+        future_ts = int(datetime.now(timezone.utc).timestamp()) + 3600
+        storage.set("blog_posts.old.published_ts", future_ts)
+
+        assert slugs(get_all_published_posts(storage)) == ["new", "fa"]
+
+    def test_stored_lowercase_tags_used(self, storage):
+        """Test tags_lower is used for tag filters when a post has it."""
+        storage.set("blog_posts.old.tags_lower", ["legacy"])
+
+        assert slugs(get_all_published_posts(storage, tag="Legacy")) == ["old"]
+        assert slugs(get_all_published_posts(storage, tag="python")) == ["new"]
+
+    def test_scheduled_post_goes_live(self, storage, monkeypatch):
+        """Test a scheduled post is listed once its publish time has passed."""
+        scheduled_ts = int(datetime.fromisoformat(storage.get("blog_posts.scheduled.published_at")).timestamp())
+        assert slugs(get_all_published_posts(storage)) == ["new", "fa", "old"]
+        assert slugs(get_all_published_posts(storage)) == ["new", "fa", "old"]
+
+        monkeypatch.setattr(blog_routes.time, "time", lambda: scheduled_ts + 1)
+        assert slugs(get_all_published_posts(storage)) == ["scheduled", "new", "fa", "old"]
+
+    def test_lowercase_tags(self):
+        """Test tags are lowered and de-duplicated in order."""
+        assert lowercase_tags(["Web", "python", "WEB", "Python"]) == ["web", "python"]
+        assert lowercase_tags(None) == []
+
+
+class TestPublishedTimestamp:
+    """Tests for published_timestamp."""
+
+    def test_formats(self):
+        """Test aware, naive and date-only values are read as UTC."""
+        expected = int(datetime(2024, 3, 1, 10, tzinfo=timezone.utc).timestamp())
+
+        assert published_timestamp("2024-03-01T10:00:00Z") == expected
+        assert published_timestamp("2024-03-01T10:00:00+00:00") == expected
+        assert published_timestamp("2024-03-01T10:00") == expected
+        assert published_timestamp("2024-03-01") == expected - 10 * 3600
+
+    def test_missing_or_invalid(self):
+        """Test unusable values give None."""
+        assert published_timestamp(None) is None
+        assert published_timestamp("") is None
+        assert published_timestamp("soon") is None
+
+
+class TestPostExcerpt:
+    """Tests for get_post_excerpt."""
+
+    def test_explicit_excerpt(self):
+        """Test a post's own excerpt is used, cut to 200 characters."""
+        assert get_post_excerpt({"excerpt": "e" * 300, "content": "body"}) == "e" * 200
+
+    def test_derived_from_content(self):
+        """Test the excerpt falls back to the content without tags."""
+        assert get_post_excerpt({"content": "<p>Hello <b>world</b></p>"}) == "Hello world"
+        assert get_post_excerpt({"content": "x" * 250}) == "x" * 200 + "..."
+        assert get_post_excerpt({}) == ""
+
+
+class TestRenderedBlocks:
+    """Tests for get_rendered_blocks."""
+
+    def test_rendered_once_per_change(self, storage, monkeypatch):
+        """Test blocks are re-rendered only after the database changes."""
+        storage.set("blocks", {
+            "sidebar": {"content": "**hi**", "content_format": "markdown"},
+            "footer": {"content": "x", "enabled": False},
+        })
+        sanitizer = Sanitizer()
+        calls = []
+        render = sanitizer.render_content
+        monkeypatch.setattr(sanitizer, "render_content", lambda *args: calls.append(args) or render(*args))
+
+        first = get_rendered_blocks(storage, sanitizer)
+        first["sidebar"] = "changed by caller"
+        second = get_rendered_blocks(storage, sanitizer)
+
+        assert "<strong>hi</strong>" in second["sidebar"]
+        assert second["footer"] == ""
+        assert len(calls) == 1
+
+        storage.set("blocks.sidebar.content", "new")
+        assert "new" in get_rendered_blocks(storage, sanitizer)["sidebar"]
+        assert len(calls) == 2
+
+
+class TestFilteredMenu:
+    """Tests for get_filtered_menu."""
+
+    def test_filtered_and_refreshed(self, storage):
+        """Test hidden and other-language items are dropped until the menu changes."""
+        storage.set("menu_items", [
+            {"label": "Home", "visibility": "show", "language": "both"},
+            {"label": "Hidden", "visibility": "hide", "language": "both"},
+            {"label": "Farsi", "visibility": "show", "language": "fa"},
+        ])
+
+        assert [item["label"] for item in get_filtered_menu(storage, "en", None)] == ["Home"]
+        assert [item["label"] for item in get_filtered_menu(storage, "fa", None)] == ["Home", "Farsi"]
+        assert len(get_filtered_menu(storage, "en", object())) == 3
+
+        storage.set("menu_items", [{"label": "Blog", "visibility": "show"}])
+        assert [item["label"] for item in get_filtered_menu(storage, "en", None)] == ["Blog"]
@@ -0,0 +1,39 @@
+"""Tests for translations."""
+
+from urllib.parse import unquote_plus
+
+from pressassist.core.i18n import I18n
+
+
+class TestI18n:
+    """Tests for I18n."""
+
+    def test_t_url_encodes_translation(self):
+        """Test URL translations round-trip to the plain translation."""
+        i18n = I18n()
+
+        for lang in ("en", "fa"):
+            encoded = i18n.t_url("auth.invalid_credentials", lang)
+            assert " " not in encoded
+            assert unquote_plus(encoded) == i18n.get("auth.invalid_credentials", lang)
+
+    def test_t_url_uses_given_language(self):
+        """Test the given language is used, not the shared current one."""
+        i18n = I18n()
+        i18n.set_language("en")
+        english = i18n.t_url("auth.login", "en")
+
+        assert i18n.t_url("auth.login", "fa") != english
+        assert i18n.current_language == "en"
+        assert i18n.t_url("missing.key", "fa") == "missing.key"
+
+    def test_translator_leaves_current_language(self):
+        """Test a bound translator uses its language without switching the global one."""
+        i18n = I18n()
+        i18n.set_language("en")
+        persian = i18n.translator("fa")
+
+        assert persian("auth.login") != i18n.t("auth.login")
+        assert i18n.current_language == "en"
+        assert i18n.translator("fa") is persian
+        assert i18n.translator("xx")("auth.login") == i18n.t("auth.login")
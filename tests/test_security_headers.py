@@ -0,0 +1,112 @@
+"""Tests for security headers middleware."""
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from pressassist.core.security_headers import SecurityHeadersMiddleware
+
+
+def make_client(force_https: bool = True, base_url: str = "http://testserver") -> TestClient:
+    """Build a test client for an app wrapped in the middleware."""
+    app = FastAPI()
+
+    @app.get("/own-headers")
+    async def own_headers():
+        return PlainTextResponse("ok", headers={
+            "X-Content-Type-Options": "nosniff",
+            "Content-Security-Policy": "default-src 'none'",
+            "X-Custom": "kept",
+        })
+
+    @app.get("/{path:path}")
+    async def catch_all(path: str):
+        return PlainTextResponse("ok")
+
+    app.add_middleware(SecurityHeadersMiddleware, force_https=force_https)
+    return TestClient(app, base_url=base_url)
+
+
+class TestStaticHeaders:
+    """Tests for headers added to every response."""
+
+    def test_static_headers_present(self):
+        """Test invariant headers are set once."""
+        response = make_client().get("/")
+
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["x-frame-options"] == "SAMEORIGIN"
+        assert response.headers["x-xss-protection"] == "1; mode=block"
+        assert response.headers["referrer-policy"] == "strict-origin-when-cross-origin"
+        assert "camera=()" in response.headers["permissions-policy"]
+        assert len(response.headers.get_list("x-frame-options")) == 1
+
+    def test_route_headers_replaced(self):
+        """Test headers the route already set are sent once, other headers kept."""
+        response = make_client().get("/own-headers")
+
+        assert response.headers.get_list("x-content-type-options") == ["nosniff"]
+        assert response.headers["x-custom"] == "kept"
+
+    def test_hsts_when_forced(self):
+        """Test HSTS is added when force_https is enabled."""
+        response = make_client(force_https=True).get("/")
+
+        assert response.headers["strict-transport-security"] == (
+            "max-age=31536000; includeSubDomains"
+        )
+
+    def test_no_hsts_when_not_forced(self):
+        """Test HSTS is omitted when force_https is disabled."""
+        response = make_client(force_https=False).get("/")
+
+        assert "strict-transport-security" not in response.headers
+
+
+class TestContentSecurityPolicy:
+    """Tests for per-route CSP selection."""
+
+    def test_default_csp(self):
+        """Test plain pages get the strict CSP."""
+        csp = make_client().get("/about").headers["content-security-policy"]
+
+        assert "script-src 'self';" in csp
+        assert "upgrade-insecure-requests" not in csp
+
+    def test_blog_csp_allows_embeds(self):
+        """Test blog and page routes allow media embeds."""
+        client = make_client()
+
+        for path in ("/blog/post", "/fa/blog", "/page/about"):
+            csp = client.get(path).headers["content-security-policy"]
+            assert "https://www.youtube.com" in csp
+
+    def test_admin_csp_and_cache_control(self):
+        """Test admin routes get the admin CSP and no-store caching."""
+        response = make_client().get("/admin/pages")
+
+        assert "img-src 'self' data: blob:" in response.headers["content-security-policy"]
+        assert response.headers["cache-control"] == (
+            "no-store, no-cache, must-revalidate, private"
+        )
+        assert response.headers["pragma"] == "no-cache"
+
+    def test_admin_takes_precedence_over_blog(self):
+        """Test a path matching both admin and blog uses the admin CSP."""
+        response = make_client().get("/blog/admin")
+
+        assert "img-src 'self' data: blob:" in response.headers["content-security-policy"]
+
+    def test_route_csp_replaced(self):
+        """Test a CSP set by the route is replaced, not sent alongside."""
+        client = make_client()
+        expected = client.get("/").headers["content-security-policy"]
+
+        assert client.get("/own-headers").headers.get_list("content-security-policy") == [expected]
+
+    def test_https_adds_upgrade(self):
+        """Test HTTPS requests get upgrade-insecure-requests."""
+        client = make_client(base_url="https://testserver")
+        csp = client.get("/").headers["content-security-policy"]
+
+        assert csp.endswith("upgrade-insecure-requests")
@@ -0,0 +1,337 @@
+"""Tests for file-based session and rate limit stores."""
+
+import json
+import secrets
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pressassist.core.models import Role, Session
+from pressassist.core.session_store import RateLimitStore, SessionStore
+from pressassist.core.session_store_sqlite import SQLiteRateLimitStore, SQLiteSessionStore
+
+
+def make_session(user_id: str = "admin", expires_in: timedelta = timedelta(hours=1)) -> Session:
+    """Build a session for tests."""
+    now = datetime.now(timezone.utc)
+    return Session(
+        session_id=secrets.token_urlsafe(16),
+        user_id=user_id,
+        role=Role.ADMIN,
+        ip="127.0.0.1",
+        user_agent="TestAgent",
+        csrf_token=secrets.token_urlsafe(16),
+        created_at=now,
+        expires_at=now + expires_in,
+    )
+
+
+@pytest.fixture
+def session_store(tmp_path):
+    """Session store backed by a temporary file."""
+    return SessionStore(tmp_path / "sessions.json")
+
+
+@pytest.fixture
+def rate_limit_store(tmp_path):
+    """Rate limit store backed by a temporary file."""
+    return RateLimitStore(tmp_path / "rate_limits.json", max_attempts=3)
+
+
+class TestSessionStore:
+    """Tests for SessionStore."""
+
+    def test_save_and_get_session(self, session_store):
+        """Test a saved session can be read back."""
+        session = make_session()
+        session_store.save_session(session)
+
+        loaded = session_store.get_session(session.session_id)
+        assert loaded is not None
+        assert loaded.user_id == "admin"
+        assert loaded.role == Role.ADMIN
+        assert loaded.csrf_token == session.csrf_token
+
+    def test_sessions_persist_across_instances(self, tmp_path):
+        """Test sessions are visible to another store on the same file."""
+        session = make_session()
+        SessionStore(tmp_path / "sessions.json").save_session(session)
+
+        other = SessionStore(tmp_path / "sessions.json")
+        assert other.get_session(session.session_id) is not None
+
+    def test_read_cache_sees_other_writers(self, tmp_path):
+        """Test a cached snapshot is refreshed after another store writes."""
+        first = SessionStore(tmp_path / "sessions.json")
+        second = SessionStore(tmp_path / "sessions.json")
+        assert first.get_session_count() == 0
+
+        session = make_session()
+        second.save_session(session)
+        assert first.get_session(session.session_id) is not None
+
+        second.delete_session(session.session_id)
+        assert first.get_session(session.session_id) is None
+
+    def test_expired_session_removed(self, session_store):
+        """Test expired sessions are not returned."""
+        session = make_session(expires_in=timedelta(seconds=-1))
+        session_store.save_session(session)
+
+        assert session_store.get_session(session.session_id) is None
+        assert session_store.get_session_count() == 0
+
+    def test_delete_session(self, session_store):
+        """Test deleting a session."""
+        session = make_session()
+        session_store.save_session(session)
+
+        assert session_store.delete_session(session.session_id) is True
+        assert session_store.delete_session(session.session_id) is False
+        assert session_store.get_session(session.session_id) is None
+
+    def test_delete_user_sessions(self, session_store):
+        """Test deleting all sessions of one user."""
+        for _ in range(3):
+            session_store.save_session(make_session("admin"))
+        session_store.save_session(make_session("editor"))
+
+        assert session_store.delete_user_sessions("admin") == 3
+        assert session_store.get_session_count("admin") == 0
+        assert session_store.get_session_count("editor") == 1
+        assert session_store.get_session_count() == 1
+
+    def test_cleanup_expired(self, session_store):
+        """Test cleanup removes only expired sessions."""
+        session_store.save_session(make_session(expires_in=timedelta(seconds=-1)))
+        session_store.save_session(make_session(expires_in=timedelta(seconds=-1)))
+        valid = make_session()
+        session_store.save_session(valid)
+
+        assert session_store.cleanup_expired() == 2
+        assert session_store.get_session(valid.session_id) is not None
+
+    def test_batch_writes_once(self, session_store):
+        """Test batched changes are applied together."""
+        keep = make_session("admin")
+        drop = make_session("admin")
+        session_store.save_session(drop)
+
+        with session_store.batch() as batch:
+            batch.save(keep)
+            batch.save(make_session("editor"))
+            assert batch.delete(drop.session_id) is True
+            assert batch.delete_user("editor") == 1
+
+        assert session_store.get_session(keep.session_id) is not None
+        assert session_store.get_session(drop.session_id) is None
+        assert session_store.get_session_count() == 1
+
+    def test_batch_discarded_on_error(self, session_store):
+        """Test an exception inside a batch writes nothing."""
+        session = make_session()
+
+        with pytest.raises(RuntimeError):
+            with session_store.batch() as batch:
+                batch.save(session)
+                raise RuntimeError("abort")
+
+        assert session_store.get_session(session.session_id) is None
+
+    def test_migrates_flat_layout(self, tmp_path):
+        """Test a file in the old flat layout is read and upgraded."""
+        path = tmp_path / "sessions.json"
+        session = make_session("editor")
+        path.write_text(
+            json.dumps({
+                session.session_id: {
+                    "session_id": session.session_id,
+                    "user_id": "editor",
+                    "role": "editor",
+                    "ip": session.ip,
+                    "user_agent": session.user_agent,
+                    "csrf_token": session.csrf_token,
+                    "created_at": session.created_at.isoformat(),
+                    "expires_at": session.expires_at.isoformat(),
+                }
+            }),
+            encoding="utf-8",
+        )
+        store = SessionStore(path)
+
+        assert store.get_session(session.session_id) is not None
+        assert store.get_session_count("editor") == 1
+
+        store.save_session(make_session("admin"))
+        on_disk = json.loads(path.read_text(encoding="utf-8"))
+        assert set(on_disk) == {"sessions", "by_user"}
+        assert on_disk["by_user"]["editor"] == [session.session_id]
+
+    def test_corrupt_file_treated_as_empty(self, tmp_path):
+        """Test an unreadable file does not break the store."""
+        path = tmp_path / "sessions.json"
+        path.write_text("{not json", encoding="utf-8")
+        store = SessionStore(path)
+
+        session = make_session()
+        store.save_session(session)
+        assert store.get_session(session.session_id) is not None
+
+
+class TestRateLimitStore:
+    """Tests for RateLimitStore."""
+
+    def test_under_limit(self, rate_limit_store):
+        """Test failed attempts below the limit are allowed."""
+        for _ in range(2):
+            rate_limit_store.record_attempt("10.0.0.1", False)
+
+        assert rate_limit_store.check_rate_limit("10.0.0.1") is True
+        assert rate_limit_store.get_failed_count("10.0.0.1") == 2
+
+    def test_limit_exceeded(self, rate_limit_store):
+        """Test reaching the limit blocks the IP only."""
+        for _ in range(3):
+            rate_limit_store.record_attempt("10.0.0.1", False)
+
+        assert rate_limit_store.check_rate_limit("10.0.0.1") is False
+        assert rate_limit_store.check_rate_limit("10.0.0.2") is True
+
+    def test_successful_attempts_not_counted(self, rate_limit_store):
+        """Test successful attempts do not count toward the limit."""
+        for _ in range(5):
+            rate_limit_store.record_attempt("10.0.0.1", True)
+
+        assert rate_limit_store.check_rate_limit("10.0.0.1") is True
+        assert rate_limit_store.get_failed_count("10.0.0.1") == 0
+
+    def test_checks_track_new_attempts(self, tmp_path):
+        """Test attempts recorded between checks are counted."""
+        store = RateLimitStore(tmp_path / "rate_limits.json", max_attempts=2, flush_interval=3600)
+
+        assert store.check_rate_limit("10.0.0.1") is True
+        store.record_attempt("10.0.0.1", False)
+        store.record_attempt("10.0.0.1", True)
+        assert store.get_failed_count("10.0.0.1") == 1
+        store.record_attempt("10.0.0.1", False)
+        assert store.check_rate_limit("10.0.0.1") is False
+
+        store.flush()
+        assert store.get_failed_count("10.0.0.1") == 2
+
+    def test_attempts_buffered_until_flush(self, tmp_path):
+        """Test buffered attempts reach disk in one batch."""
+        path = tmp_path / "rate_limits.json"
+        store = RateLimitStore(path, max_attempts=3, flush_interval=3600)
+        other = RateLimitStore(path, max_attempts=3)
+
+        for _ in range(3):
+            store.record_attempt("10.0.0.1", False)
+
+        assert store.check_rate_limit("10.0.0.1") is False
+        assert other.get_failed_count("10.0.0.1") == 0
+
+        store.flush()
+        assert other.get_failed_count("10.0.0.1") == 3
+
+    def test_recheck_interval(self, tmp_path):
+        """Test other workers' flushes are picked up once the interval passes."""
+        path = tmp_path / "rate_limits.json"
+        store = RateLimitStore(path, max_attempts=3, recheck_interval=3600)
+        other = RateLimitStore(path, max_attempts=3, max_pending=1)
+
+        assert store.get_failed_count("10.0.0.1") == 0
+        other.record_attempt("10.0.0.1", False)
+        assert store.get_failed_count("10.0.0.1") == 0
+
+        store.recheck_interval = 0.0
+        assert store.get_failed_count("10.0.0.1") == 1
+
+    def test_flush_when_batch_full(self, tmp_path):
+        """Test reaching max_pending writes the batch."""
+        path = tmp_path / "rate_limits.json"
+        store = RateLimitStore(path, flush_interval=3600, max_pending=2)
+
+        store.record_attempt("10.0.0.1", False)
+        store.record_attempt("10.0.0.1", False)
+
+        assert RateLimitStore(path).get_failed_count("10.0.0.1") == 2
+
+    def test_attempts_store_epoch_seconds(self, tmp_path):
+        """Test attempts carry a float ts next to the ISO timestamp."""
+        path = tmp_path / "rate_limits.json"
+        store = RateLimitStore(path, max_pending=1)
+        store.record_attempt("10.0.0.1", False)
+
+        attempt = json.loads(path.read_text(encoding="utf-8"))["10.0.0.1"][0]
+        assert isinstance(attempt["ts"], float)
+        assert datetime.fromisoformat(attempt["timestamp"]).timestamp() == pytest.approx(attempt["ts"])
+
+    def test_cleanup_old_attempts(self, tmp_path):
+        """Test attempts outside the window are removed."""
+        path = tmp_path / "rate_limits.json"
+        old = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        path.write_text(
+            json.dumps({"10.0.0.9": [{"timestamp": old, "success": False}]}),
+            encoding="utf-8",
+        )
+        store = RateLimitStore(path, max_attempts=3)
+        store.record_attempt("10.0.0.1", False)
+
+        assert store.get_failed_count("10.0.0.9") == 0
+        assert store.cleanup_old_attempts() == 1
+        assert store.get_failed_count("10.0.0.1") == 1
+
+
+class TestSQLiteStores:
+    """Tests for the SQLite-backed stores."""
+
+    def test_session_roundtrip(self, tmp_path):
+        """Test saving, reading and deleting sessions."""
+        store = SQLiteSessionStore(tmp_path / "sessions.db")
+        session = make_session()
+        store.save_session(session)
+
+        loaded = store.get_session(session.session_id)
+        assert loaded is not None
+        assert loaded.expires_at == session.expires_at
+        assert store.delete_session(session.session_id) is True
+        assert store.get_session(session.session_id) is None
+
+    def test_delete_user_sessions_and_cleanup(self, tmp_path):
+        """Test per-user deletion and expiry cleanup."""
+        store = SQLiteSessionStore(tmp_path / "sessions.db")
+        for _ in range(2):
+            store.save_session(make_session("admin"))
+        store.save_session(make_session("editor", expires_in=timedelta(seconds=-1)))
+
+        assert store.get_session_count() == 3
+        assert store.delete_user_sessions("admin") == 2
+        assert store.cleanup_expired() == 1
+        assert store.get_session_count() == 0
+
+    def test_batch(self, tmp_path):
+        """Test batched changes share one transaction."""
+        store = SQLiteSessionStore(tmp_path / "sessions.db")
+        first = make_session("admin")
+        second = make_session("admin")
+
+        with store.batch() as batch:
+            batch.save(first)
+            batch.save(second)
+            assert batch.delete(first.session_id) is True
+
+        assert store.get_session(second.session_id) is not None
+        assert store.get_session_count("admin") == 1
+
+    def test_rate_limit(self, tmp_path):
+        """Test failed attempts are counted per IP."""
+        store = SQLiteRateLimitStore(tmp_path / "sessions.db", max_attempts=2)
+        store.record_attempt("10.0.0.1", True)
+        store.record_attempt("10.0.0.1", False)
+
+        assert store.check_rate_limit("10.0.0.1") is True
+        store.record_attempt("10.0.0.1", False)
+        assert store.check_rate_limit("10.0.0.1") is False
+        assert store.check_rate_limit("10.0.0.2") is True
+        assert store.cleanup_old_attempts() == 0
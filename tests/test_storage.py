@@ -0,0 +1,181 @@
+"""Tests for JSON flat-file storage."""
+
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from pressassist.core.storage import Storage, StorageError
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Initialized storage backed by a temporary file."""
+    store = Storage(tmp_path / "db.json")
+    store.initialize("secret-login", "hash")
+    return store
+
+
+class TestStorage:
+    """Tests for Storage."""
+
+    def test_initialize_and_load(self, storage):
+        """Test a fresh database can be loaded by another instance."""
+        data = Storage(storage.db_path).load()
+
+        assert data["config"]["login_slug"] == "secret-login"
+        assert set(data["pages"]) == {"home", "about", "404"}
+
+    def test_first_save_creates_file(self, tmp_path):
+        """Test saving a new database writes the file without leftovers."""
+        path = tmp_path / "data" / "db.json"
+        Storage(path).save({"config": {}})
+
+        assert Storage(path).load()["config"]["last_modified"]
+        assert path.stat().st_mode & 0o777 == 0o600
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_file_is_indented_utf8(self, storage):
+        """Test non-ASCII text is written unescaped and indented."""
+        storage.set("config.site_title", "وبسایت من")
+
+        raw = storage.db_path.read_text(encoding="utf-8")
+        assert "وبسایت من" in raw
+        assert '\n  "config": {' in raw
+
+    def test_non_json_values_stored_as_text(self, storage):
+        """Test values without a JSON type fall back to str()."""
+        when = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        storage.set("config.launched", when)
+
+        assert Storage(storage.db_path).get("config.launched") == str(when)
+
+    def test_get_set_delete(self, storage):
+        """Test dot-path access."""
+        storage.set("config.extra.nested", 1)
+
+        assert storage.get("config.extra.nested") == 1
+        assert storage.get("config.missing", "default") == "default"
+        assert storage.delete("config.extra.nested") is True
+        assert storage.delete("config.extra.nested") is False
+        assert storage.delete("missing.parent.key") is False
+
+    def test_update_merges_fields(self, storage):
+        """Test update() changes only the given keys of an existing record."""
+        assert storage.update("pages.home", {"title": "Start"}) is True
+        assert storage.update("pages.missing", {"title": "x"}) is False
+        assert storage.update("config.site_title", {"x": 1}) is False
+
+        page = Storage(storage.db_path).get("pages.home")
+        assert page["title"] == "Start"
+        assert page["slug"] == "home"
+
+    def test_has(self, storage):
+        """Test has() reports stored paths, including ones holding None."""
+        storage.set("config.logo", None)
+
+        assert storage.has("pages.home") is True
+        assert storage.has("config.logo") is True
+        assert storage.has("pages.missing") is False
+        assert storage.has("config.site_title.nested") is False
+        assert storage.exists is True
+
+    def test_generation_bumped_on_change(self, storage):
+        """Test generation changes on save but not on reads."""
+        before = storage.generation
+        storage.get("config.site_title")
+        assert storage.generation == before
+
+        storage.set("config.site_title", "New")
+        assert storage.generation > before
+
+    def test_set_creates_missing_parents(self, storage):
+        """Test set() creates intermediate dicts without touching siblings."""
+        storage.set("plugins.seo.settings.enabled", True)
+        storage.set("plugins.seo.settings.title", "SEO")
+
+        assert storage.get("plugins.seo.settings") == {"enabled": True, "title": "SEO"}
+        assert storage.get("config.site_title") == "My Website"
+
+    def test_load_large_database(self, storage):
+        """Test a database above the memory-map threshold loads intact."""
+        content = "x" * 1024
+        for i in range(400):
+            storage._data["pages"][f"page-{i}"] = {"slug": f"page-{i}", "content": content}
+        storage.save()
+        assert storage.db_path.stat().st_size >= 256 * 1024
+
+        data = Storage(storage.db_path).load()
+        assert data["pages"]["page-399"]["content"] == content
+
+    def test_load_reuses_unchanged_file(self, storage):
+        """Test load() returns the cached data while the file is unchanged."""
+        data = storage.load()
+
+        assert storage.load() is data
+        storage.set("config.site_title", "Saved")
+        assert storage.load() is data
+
+    def test_load_sees_other_writers(self, storage):
+        """Test load() re-reads the file after another instance saves."""
+        storage.load()
+        Storage(storage.db_path).set("config.site_title", "Elsewhere")
+
+        assert storage.load()["config"]["site_title"] == "Elsewhere"
+
+    def test_batch_saves_once(self, storage, monkeypatch):
+        """Test changes inside a batch are written in a single save."""
+        saves = []
+        original_save = storage.save
+
+        def counting_save(data=None):
+            saves.append(1)
+            original_save(data)
+
+        monkeypatch.setattr(storage, "save", counting_save)
+
+        with storage.batch():
+            storage.set("config.site_title", "Batched")
+            storage.set("config.site_lang", "fa")
+            storage.delete("pages.about")
+            assert saves == []
+
+        assert saves == [1]
+        data = Storage(storage.db_path).load()
+        assert data["config"]["site_title"] == "Batched"
+        assert "about" not in data["pages"]
+
+    def test_batch_discarded_on_error(self, storage):
+        """Test an exception inside a batch writes nothing."""
+        with pytest.raises(RuntimeError):
+            with storage.batch():
+                storage.set("config.site_title", "Lost")
+                raise RuntimeError("abort")
+
+        assert storage.get("config.site_title") == "My Website"
+        assert Storage(storage.db_path).get("config.site_title") == "My Website"
+
+    def test_invalid_json_raises(self, tmp_path):
+        """Test a corrupt database raises StorageError."""
+        path = tmp_path / "db.json"
+        path.write_text("{not json", encoding="utf-8")
+
+        with pytest.raises(StorageError):
+            Storage(path).load()
+
+    def test_backup_and_restore(self, storage, tmp_path):
+        """Test a backup restores the saved contents."""
+        backup_path = storage.backup(tmp_path / "backups")
+        storage.set("config.site_title", "Changed")
+
+        storage.restore(backup_path)
+        assert storage.get("config.site_title") == "My Website"
+        assert json.loads(backup_path.read_text(encoding="utf-8"))["config"]
+
+    def test_restore_rejects_incomplete_backup(self, storage, tmp_path):
+        """Test a backup missing required keys is refused."""
+        backup_path = tmp_path / "bad.json"
+        backup_path.write_text('{"config": {}}', encoding="utf-8")
+
+        with pytest.raises(StorageError):
+            storage.restore(backup_path)
@@ -0,0 +1,279 @@
+"""Tests for theme loading and management."""
+
+import json
+import os
+
+import pytest
+
+from pressassist.core import themes
+from pressassist.core.themes import CMSContext, ThemeManager, jalali_date, to_persian_numerals
+
+
+def make_theme(themes_dir, dir_name, name=None, templates=None):
+    """Create a theme directory with optional theme.json and templates."""
+    theme_dir = themes_dir / dir_name
+    (theme_dir / "templates").mkdir(parents=True)
+    if name is not None:
+        (theme_dir / "theme.json").write_text(
+            json.dumps({"name": name, "version": "2.0.0"}), encoding="utf-8"
+        )
+    for filename, source in (templates or {"base.html": "{{ page.title }}"}).items():
+        (theme_dir / "templates" / filename).write_text(source, encoding="utf-8")
+    return theme_dir
+
+
+@pytest.fixture
+def themes_dir(tmp_path):
+    """Themes directory with a default and a named theme."""
+    path = tmp_path / "themes"
+    make_theme(path, "default", "Default")
+    make_theme(path, "night", "Night Owl")
+    return path
+
+
+class TestThemeResolution:
+    """Tests for resolving and listing themes."""
+
+    def test_resolve_by_directory_and_display_name(self, themes_dir):
+        """Test themes resolve by directory name or theme.json name."""
+        manager = ThemeManager(themes_dir)
+
+        manager.set_active_theme("NIGHT")
+        assert manager.active_theme == "night"
+        manager.set_active_theme("night owl")
+        assert manager.active_theme == "night"
+        manager.set_active_theme("missing")
+        assert manager.active_theme == "default"
+
+    def test_new_theme_found_after_install(self, themes_dir):
+        """Test a theme added after the first lookup can be resolved."""
+        manager = ThemeManager(themes_dir)
+        manager.set_active_theme("Night Owl")
+
+        make_theme(themes_dir, "sunrise", "Early Bird")
+        manager.refresh_themes()
+        manager.set_active_theme("early bird")
+        assert manager.active_theme == "sunrise"
+
+    def test_theme_info(self, themes_dir):
+        """Test theme metadata is read from theme.json."""
+        manager = ThemeManager(themes_dir, active_theme="night")
+
+        info = manager.get_theme_info()
+        assert info.name == "Night Owl"
+        assert info.version == "2.0.0"
+
+    def test_list_themes(self, themes_dir):
+        """Test all themes with templates are listed."""
+        make_theme(themes_dir, "bare")
+        (themes_dir / "not-a-theme").mkdir()
+
+        names = sorted(info.name for info in ThemeManager(themes_dir).list_themes())
+        assert names == ["Default", "Night Owl", "bare"]
+
+    def test_theme_json_changes_are_seen(self, themes_dir):
+        """Test an edited theme.json is re-read."""
+        manager = ThemeManager(themes_dir)
+        assert {t.name for t in manager.list_themes()} == {"Default", "Night Owl"}
+
+        (themes_dir / "night" / "theme.json").write_text(
+            json.dumps({"name": "Night Owl Renamed", "version": "2.1.0"}),
+            encoding="utf-8",
+        )
+        assert "Night Owl Renamed" in {t.name for t in manager.list_themes()}
+
+    def test_theme_info_reused_while_unchanged(self, themes_dir):
+        """Test unchanged themes return the same ThemeInfo until theme.json is edited."""
+        manager = ThemeManager(themes_dir, active_theme="night")
+        first = {t.name: t for t in manager.list_themes()}
+
+        assert manager.get_theme_info() is first["Night Owl"]
+        assert all(t is first[t.name] for t in manager.list_themes())
+
+        (themes_dir / "night" / "theme.json").write_text(
+            json.dumps({"name": "Night Owl", "version": "3.0.10"}), encoding="utf-8"
+        )
+        assert manager.get_theme_info().version == "3.0.10"
+
+    def test_invalid_theme_json(self, themes_dir):
+        """Test an unreadable theme.json falls back to the directory name."""
+        (themes_dir / "night" / "theme.json").write_text("{broken", encoding="utf-8")
+
+        info = ThemeManager(themes_dir, active_theme="night").get_theme_info()
+        assert info.name == "night"
+
+
+class TestRendering:
+    """Tests for template selection and rendering."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Theme manager with page, dark and slug-specific templates."""
+        themes_dir = tmp_path / "themes"
+        make_theme(themes_dir, "default", "Default", templates={
+            "base.html": "base:{{ page.title }}",
+            "page.html": "page:{{ page.title }}",
+            "page-dark.html": "dark:{{ page.title }}",
+            "about.html": "about:{{ page.title }}",
+        })
+        return ThemeManager(themes_dir)
+
+    def test_context_is_slotted(self):
+        """Test CMSContext rejects attributes that are not fields."""
+        context = CMSContext(page_title="T")
+
+        assert not hasattr(context, "__dict__")
+        with pytest.raises(AttributeError):
+            context.page_titel = "typo"
+
+    def test_render_page_template_order(self, manager):
+        """Test slug, selected and default page templates are chosen in order."""
+        assert manager.render_page(CMSContext(page_slug="about", page_title="A")) == "about:A"
+        assert manager.render_page(
+            CMSContext(page_slug="home", page_title="H", page_template="dark")
+        ) == "dark:H"
+        assert manager.render_page(
+            CMSContext(page_slug="home", page_title="H", page_template="bogus")
+        ) == "page:H"
+
+    def test_render_page_reuses_resolution(self, manager, monkeypatch):
+        """Test the fallback chain is resolved once per page, not per render."""
+        env = manager.get_env()
+        calls = []
+        select_template = env.select_template
+
+        def counting_select(names, *args, **kwargs):
+            calls.append(list(names))
+            return select_template(names, *args, **kwargs)
+
+        monkeypatch.setattr(env, "select_template", counting_select)
+
+        for title in ("One", "Two"):
+            html = manager.render_page(CMSContext(page_slug="home", page_title=title))
+            assert html == f"page:{title}"
+        assert calls == [["home.html", "page.html", "base.html"]]
+
+        manager.set_active_theme("default")
+        assert manager.render_page(CMSContext(page_slug="home", page_title="Three")) == "page:Three"
+
+    def test_render_passes_extra_variables(self, manager):
+        """Test extra keyword arguments reach the template next to the context."""
+        (manager.templates_path / "profile.html").write_text(
+            "{{ profile.name }}@{{ site.title }}", encoding="utf-8"
+        )
+
+        html = manager.render("profile.html", CMSContext(site_title="Site"), profile={"name": "ali"})
+        assert html == "ali@Site"
+
+    def test_site_variables_follow_context(self, manager):
+        """Test the shared site mapping changes when the site settings do."""
+        (manager.templates_path / "site.html").write_text(
+            "{{ site.title }}/{{ site.lang }}/{{ site['theme'] }}", encoding="utf-8"
+        )
+
+        assert manager.render("site.html", CMSContext(site_title="One")) == "One/en/default"
+        assert manager.render("site.html", CMSContext(site_title="One")) == "One/en/default"
+        assert manager.render(
+            "site.html", CMSContext(site_title="Two", site_lang="fa")
+        ) == "Two/fa/default"
+
+    def test_render_markdown_filter(self, manager):
+        """Test the markdown filter renders and sanitizes content."""
+        (manager.templates_path / "md.html").write_text(
+            "{{ body | render_markdown | safe }}", encoding="utf-8"
+        )
+
+        for _ in range(2):
+            html = manager.render("md.html", CMSContext(), body="**hi** <script>x</script>")
+            assert "<strong>hi</strong>" in html
+            assert "<script>" not in html
+
+    def test_bytecode_cache(self, tmp_path, manager):
+        """Test compiled templates are written to the bytecode cache."""
+        cache_dir = tmp_path / "cache" / "templates"
+        cached = ThemeManager(manager.themes_dir, bytecode_cache_dir=cache_dir)
+
+        assert cached.render_page(CMSContext(page_slug="home", page_title="H")) == "page:H"
+        assert any(cache_dir.iterdir())
+
+    def test_precompiled_templates_used(self, manager):
+        """Test templates load from the precompiled archive when it is fresh."""
+        archive = manager.precompile()
+        assert archive == manager.compiled_templates_path
+
+        # Source is gone, but the compiled module still renders
+        (manager.templates_path / "about.html").unlink()
+        fresh = ThemeManager(manager.themes_dir)
+        assert fresh.render_page(CMSContext(page_slug="about", page_title="A")) == "about:A"
+
+    def test_stale_precompiled_templates_ignored(self, manager):
+        """Test an archive older than the templates is not used."""
+        archive = manager.precompile()
+        page = manager.templates_path / "page.html"
+        page.write_text("edited:{{ page.title }}", encoding="utf-8")
+        newer = archive.stat().st_mtime + 10
+        os.utime(page, (newer, newer))
+
+        fresh = ThemeManager(manager.themes_dir)
+        assert fresh.render_page(CMSContext(page_slug="home", page_title="H")) == "edited:H"
+
+    def test_template_edit_after_precompile_seen(self, manager, monkeypatch):
+        """Test a template edited after the archive was loaded is rendered."""
+        monkeypatch.setattr(themes, "_COMPILED_RECHECK_INTERVAL", 0)
+        archive = manager.precompile()
+        context = CMSContext(page_slug="home", page_title="H")
+        assert manager.render_page(context) == "page:H"
+
+        page = manager.templates_path / "page.html"
+        page.write_text("edited:{{ page.title }}", encoding="utf-8")
+        newer = archive.stat().st_mtime + 10
+        os.utime(page, (newer, newer))
+
+        assert manager.render_page(context) == "edited:H"
+
+    def test_render_404_fallback(self, manager, monkeypatch):
+        """Test themes without 404.html render the page template, resolved once."""
+        env = manager.get_env()
+        calls = []
+        select_template = env.select_template
+
+        def counting_select(names, *args, **kwargs):
+            calls.append(list(names))
+            return select_template(names, *args, **kwargs)
+
+        monkeypatch.setattr(env, "select_template", counting_select)
+
+        for _ in range(2):
+            assert manager.render_404(CMSContext(page_title="Missing")) == "page:Missing"
+        assert calls == [["404.html", "page.html", "base.html"]]
+
+        (manager.templates_path / "404.html").write_text("404:{{ page.title }}", encoding="utf-8")
+        manager.set_active_theme("default")
+        assert manager.render_404(CMSContext(page_title="Missing")) == "404:Missing"
+
+    def test_render_page_falls_back_to_base(self, manager):
+        """Test base.html is used when no page template exists."""
+        (manager.templates_path / "page.html").unlink()
+        manager.set_active_theme("default")
+
+        assert manager.render_page(CMSContext(page_slug="home", page_title="H")) == "base:H"
+
+
+class TestDateHelpers:
+    """Tests for numeral and date template helpers."""
+
+    def test_to_persian_numerals(self):
+        """Test ASCII and Arabic-Indic digits become Persian digits."""
+        assert to_persian_numerals("2026-01-05") == "۲۰۲۶-۰۱-۰۵"
+        assert to_persian_numerals(1404) == "۱۴۰۴"
+        assert to_persian_numerals("٣ abc") == "۳ abc"
+
+    def test_jalali_date(self):
+        """Test dates are shown in Jalali for Persian and ISO otherwise."""
+        assert jalali_date("2026-01-05T12:00:00+00:00", "fa") == "۱۵ دی ۱۴۰۴"
+        assert jalali_date("2026-01-05T12:00:00Z") == "2026-01-05"
+        assert jalali_date("2026-01-05", "fa") == "۱۵ دی ۱۴۰۴"
+        assert jalali_date("2026-01-05T23:30:00.123456-05:00") == "2026-01-05"
+        assert jalali_date("2026-13-01", "fa") == "2026-13-01"
+        assert jalali_date("") == ""
+        assert jalali_date("not a date at all") == "not a date"
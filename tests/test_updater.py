@@ -0,0 +1,240 @@
+"""Tests for the auto-update module."""
+
+import io
+import zipfile
+
+import httpx
+import pytest
+
+from pressassist.core import updater
+
+COMMIT = {
+    "sha": "abc123",
+    "commit": {
+        "committer": {"date": "2026-01-05T10:30:00Z"},
+        "message": "Fix things\n\nLonger description",
+    },
+}
+
+
+def make_archive(files: dict[str, str]) -> bytes:
+    """Build a GitHub-style branch archive with a single top-level folder."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(f"pycms-main/{name}", content)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def github(monkeypatch):
+    """Route updater HTTP calls to a fake GitHub and record the requests."""
+    state = {
+        "archive": make_archive({"app.py": "new"}),
+        "commit": COMMIT,
+        "etag": '"v1"',
+        "requests": [],
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(request)
+        if request.url.path.endswith("/commits/main"):
+            if request.headers.get("if-none-match") == state["etag"]:
+                return httpx.Response(304)
+            return httpx.Response(200, json=state["commit"], headers={"ETag": state["etag"]})
+        if request.url.path.endswith(".zip"):
+            return httpx.Response(200, content=state["archive"])
+        return httpx.Response(404)
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(*args, **kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return real_client(*args, **kwargs)
+
+    monkeypatch.setattr(updater.httpx, "AsyncClient", client_factory)
+    monkeypatch.setattr(updater, "_client", None)
+    monkeypatch.setattr(updater, "_commit_cache", None)
+    return state
+
+
+class TestCheckForUpdates:
+    """Tests for check_for_updates."""
+
+    async def test_update_available(self, github):
+        """Test a different remote commit is reported as an update."""
+        result = await updater.check_for_updates("old")
+
+        assert result["update_available"] is True
+        assert result["latest_commit"] == "abc123"
+        assert result["commit_message"] == "Fix things"
+        assert result["error"] is None
+
+    async def test_up_to_date(self, github):
+        """Test the installed commit is not reported as an update."""
+        result = await updater.check_for_updates("abc123")
+
+        assert result["update_available"] is False
+
+    async def test_unchanged_commit_uses_etag(self, github):
+        """Test a repeated check sends If-None-Match and reuses the cached commit."""
+        first = await updater.check_for_updates("old")
+        second = await updater.check_for_updates("abc123")
+
+        assert "if-none-match" not in github["requests"][0].headers
+        assert github["requests"][1].headers["if-none-match"] == '"v1"'
+        assert second["latest_commit"] == first["latest_commit"] == "abc123"
+        assert second["commit_message"] == "Fix things"
+        assert second["current_commit"] == "abc123"
+        assert second["update_available"] is False
+
+    async def test_changed_commit_refreshes_cache(self, github):
+        """Test a new ETag replaces the cached commit."""
+        await updater.check_for_updates("abc123")
+        github["commit"] = {**COMMIT, "sha": "def456"}
+        github["etag"] = '"v2"'
+
+        result = await updater.check_for_updates("abc123")
+        assert result["latest_commit"] == "def456"
+        assert result["update_available"] is True
+
+    async def test_client_reused(self, github):
+        """Test consecutive checks share one HTTP client until it is closed."""
+        await updater.check_for_updates("old")
+        client = updater.get_client()
+        await updater.check_for_updates("old")
+
+        assert updater.get_client() is client
+        await updater.close_client()
+        assert client.is_closed
+        assert updater.get_client() is not client
+
+
+class TestDownloadAndApplyUpdate:
+    """Tests for download_and_apply_update."""
+
+    async def test_applies_files_and_preserves_data(self, github, tmp_path):
+        """Test new files are copied while preserved paths are untouched."""
+        github["archive"] = make_archive({
+            "app.py": "new",
+            "pkg/module.py": "code",
+            "data/db.json": "remote",
+        })
+        (tmp_path / "app.py").write_text("old")
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "db.json").write_text("local")
+
+        result = await updater.download_and_apply_update(tmp_path)
+
+        assert result["success"] is True
+        assert result["new_commit"] == "abc123"
+        assert (tmp_path / "app.py").read_text() == "new"
+        assert (tmp_path / "pkg" / "module.py").read_text() == "code"
+        assert (tmp_path / "data" / "db.json").read_text() == "local"
+
+    async def test_checked_commit_skips_lookup(self, github, tmp_path):
+        """Test the commit found by check_for_updates is downloaded without another API call."""
+        await updater.check_for_updates(None)
+        github["requests"].clear()
+
+        result = await updater.download_and_apply_update(tmp_path, new_commit="abc123")
+
+        assert result["success"] is True
+        assert result["new_commit"] == "abc123"
+        assert [r.url.path for r in github["requests"]] == ["/ahmadbatebi/pycms/archive/abc123.zip"]
+
+    async def test_unchecked_commit_replaced_by_main(self, github, tmp_path):
+        """Test a commit the last check did not report is not downloaded."""
+        await updater.check_for_updates(None)
+        github["commit"] = {**COMMIT, "sha": "def456"}
+        sha = "0123456789abcdef0123456789abcdef01234567"
+
+        for result in (
+            await updater.download_and_apply_update(tmp_path, new_commit=sha),
+            await updater.download_and_apply_update(tmp_path, new_commit="main/../x"),
+        ):
+            assert result["success"] is True
+            assert result["new_commit"] == "def456"
+
+        assert all(not r.url.path.endswith(f"{sha}.zip") for r in github["requests"])
+
+    async def test_large_archive_streamed(self, github, tmp_path):
+        """Test an archive spanning many download chunks arrives intact."""
+        payload = "x" * (updater.DOWNLOAD_CHUNK_SIZE * 3 + 17)
+        github["archive"] = make_archive({"big.txt": payload})
+
+        result = await updater.download_and_apply_update(tmp_path)
+
+        assert result["success"] is True
+        assert (tmp_path / "big.txt").read_text() == payload
+
+    async def test_preserved_paths_not_extracted(self, github, tmp_path, monkeypatch):
+        """Test archive members under preserved paths are never inflated."""
+        github["archive"] = make_archive({"app.py": "new", "uploads/a.png": "img"})
+        extracted = []
+        real_extract = updater._sync_extract_update
+
+        def recording_extract(zip_path, extract_dir):
+            source_dir = real_extract(zip_path, extract_dir)
+            extracted.extend(p.name for p in source_dir.iterdir())
+            return source_dir
+
+        monkeypatch.setattr(updater, "_sync_extract_update", recording_extract)
+
+        result = await updater.download_and_apply_update(tmp_path)
+        assert result["success"] is True
+        assert extracted == ["app.py"]
+
+    async def test_unsafe_archive_rejected(self, github, tmp_path):
+        """Test members escaping the archive root abort the update."""
+        github["archive"] = make_archive({"../escape.py": "x"})
+
+        result = await updater.download_and_apply_update(tmp_path / "site")
+        assert result["success"] is False
+        assert "Invalid update archive" in result["error"]
+        assert not (tmp_path / "escape.py").exists()
+
+    async def test_backup_failure_aborts(self, github, tmp_path):
+        """Test a failing backup stops the update before downloading."""
+        def failing_backup():
+            raise RuntimeError("disk full")
+
+        result = await updater.download_and_apply_update(tmp_path, failing_backup)
+
+        assert result["success"] is False
+        assert "disk full" in result["error"]
+        assert github["requests"] == []
+
+
+class TestApplyUpdateFiles:
+    """Tests for copying an extracted update into the installation."""
+
+    def test_same_filesystem_hardlinks(self, tmp_path):
+        """Test new files are hard-linked and existing files are replaced."""
+        source = tmp_path / "update"
+        (source / "pkg").mkdir(parents=True)
+        (source / "pkg" / "module.py").write_text("new module")
+        (source / "app.py").write_text("new app")
+        target = tmp_path / "site"
+        target.mkdir()
+        (target / "app.py").write_text("old app")
+
+        updater._sync_apply_update_files(source, target)
+
+        assert (target / "pkg" / "module.py").stat().st_ino == (source / "pkg" / "module.py").stat().st_ino
+        assert (target / "app.py").read_text() == "new app"
+
+
+class TestFormatCommitDate:
+    """Tests for format_commit_date."""
+
+    def test_formats(self):
+        """Test GitHub and other ISO dates are shortened, invalid ones kept."""
+        assert updater.format_commit_date("2026-01-05T10:30:00Z") == "2026-01-05 10:30"
+        assert updater.format_commit_date("2026-01-05T10:30:00+03:30") == "2026-01-05 10:30"
+        assert updater.format_commit_date("2026-13-05T10:30:00Z") == "2026-13-05T10:30:00Z"
+        assert updater.format_commit_date("unknown") == "unknown"
+
+    def test_non_string_returned_unchanged(self):
+        """Test a missing date from a failed check is passed through."""
+        assert updater.format_commit_date(None) is None
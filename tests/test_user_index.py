@@ -0,0 +1,105 @@
+"""Tests for the user email and reset-token indices."""
+
+import pytest
+
+from pressassist.core.storage import Storage
+from pressassist.core.user_index import (
+    delete_user,
+    find_user_by_email,
+    find_user_by_reset_token,
+    save_user,
+)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Initialized storage with one indexed user."""
+    store = Storage(tmp_path / "db.json")
+    store.initialize("secret-login", "hash")
+    save_user(store, "ali", {"username": "ali", "email": "ali@example.com", "reset_token": None})
+    return store
+
+
+class TestUserIndex:
+    """Tests for user index lookups and maintenance."""
+
+    def test_find_by_email(self, storage):
+        """Test users are found by email and unknown emails are not."""
+        username, user_data = find_user_by_email(storage, "ali@example.com")
+
+        assert username == "ali"
+        assert user_data["username"] == "ali"
+        assert find_user_by_email(storage, "nobody@example.com") == (None, None)
+        assert find_user_by_email(storage, "") == (None, None)
+
+    def test_index_persisted(self, storage):
+        """Test the index is saved with the users it describes."""
+        reloaded = Storage(storage.db_path)
+
+        assert reloaded.get("indices.users_by_email") == {"ali@example.com": "ali"}
+
+    def test_email_change_moves_entry(self, storage):
+        """Test saving a user with a new email replaces the old entry."""
+        user_data = dict(storage.get("users.ali"))
+        user_data["email"] = "new@example.com"
+        save_user(storage, "ali", user_data)
+
+        assert storage.get("indices.users_by_email") == {"new@example.com": "ali"}
+        assert find_user_by_email(storage, "ali@example.com") == (None, None)
+        assert find_user_by_email(storage, "new@example.com")[0] == "ali"
+
+    def test_reset_token_set_and_cleared(self, storage):
+        """Test reset tokens are indexed while set."""
+        user_data = dict(storage.get("users.ali"))
+        user_data["reset_token"] = "tok123"
+        save_user(storage, "ali", user_data)
+        assert find_user_by_reset_token(storage, "tok123")[0] == "ali"
+        assert "tok123" not in storage.get("indices.users_by_reset_token_hash")
+
+        user_data = dict(user_data)
+        user_data["reset_token"] = None
+        save_user(storage, "ali", user_data)
+        assert storage.get("indices.users_by_reset_token_hash") == {}
+        assert find_user_by_reset_token(storage, "tok123") == (None, None)
+
+    def test_delete_user(self, storage):
+        """Test deleting a user removes them and their entries."""
+        assert delete_user(storage, "ali") is True
+        assert delete_user(storage, "ali") is False
+
+        assert storage.get("users.ali") is None
+        assert storage.get("indices.users_by_email") == {}
+
+    def test_rebuilt_for_old_database(self, storage):
+        """Test a database without indices gets them on first lookup."""
+        storage.delete("indices")
+
+        assert find_user_by_email(storage, "ali@example.com")[0] == "ali"
+        assert Storage(storage.db_path).get("indices.users_by_email") == {"ali@example.com": "ali"}
+
+    def test_raw_token_index_replaced(self, storage):
+        """Test an index keyed by raw reset tokens is rebuilt and removed."""
+        storage.set("indices", {"users_by_email": {}, "users_by_reset_token": {"tok": "ali"}})
+
+        assert find_user_by_reset_token(storage, "tok") == (None, None)
+        assert "users_by_reset_token" not in storage.get("indices")
+
+    def test_other_users_entries_untouched(self, storage):
+        """Test saving a user leaves entries that now belong to someone else."""
+        save_user(storage, "sara", {"username": "sara", "email": "ali@example.com"})
+        user_data = dict(storage.get("users.ali"))
+        user_data["email"] = "new@example.com"
+        save_user(storage, "ali", user_data)
+
+        assert storage.get("indices.users_by_email") == {
+            "ali@example.com": "sara",
+            "new@example.com": "ali",
+        }
+
+    def test_stale_entry_repaired(self, storage):
+        """Test an entry that disagrees with the user record is not trusted."""
+        # Written without save_user, so the index still has the old email
+        storage.set("users.ali.email", "moved@example.com")
+
+        assert find_user_by_email(storage, "ali@example.com") == (None, None)
+        assert find_user_by_email(storage, "moved@example.com")[0] == "ali"